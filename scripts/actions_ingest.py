@@ -55,11 +55,145 @@ def init_db(db_path: Path) -> sqlite3.Connection:
             ("next_action", "TEXT"),
             ("notes", "TEXT"),
             ("source", "TEXT"),
+            ("status_rank", "INTEGER"),
         ],
     )
+    ensure_search_index(conn)
+    ensure_tag_index(conn)
+    ensure_status_order(conn)
     return conn
 
 
+STATUS_RANK_SQL = """
+    CASE {col}
+        WHEN 'Not Started' THEN 1
+        WHEN 'In-Progress' THEN 2
+        WHEN 'Completed' THEN 3
+        ELSE 4
+    END
+"""
+
+
+def ensure_status_order(conn: sqlite3.Connection) -> None:
+    """Persist the UI's sort key (status_rank) and index the full ORDER BY.
+
+    The task list sorts by (status_rank, due_date, id). Missing due dates are
+    stored as '' rather than NULL so that a row-value seek such as
+    (status_rank, due_date, id) > (?, ?, ?) can run straight off the index.
+    """
+    rank = STATUS_RANK_SQL.format(col="new.status")
+    conn.executescript(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_status_rank_insert AFTER INSERT ON tasks BEGIN
+            UPDATE tasks SET status_rank = {rank}, due_date = COALESCE(new.due_date, '') WHERE id = new.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_status_rank_update AFTER UPDATE OF status, due_date ON tasks BEGIN
+            UPDATE tasks SET status_rank = {rank}, due_date = COALESCE(new.due_date, '') WHERE id = new.id;
+        END;
+        UPDATE tasks SET status_rank = {STATUS_RANK_SQL.format(col="status")}, due_date = COALESCE(due_date, '')
+        WHERE status_rank IS NULL OR due_date IS NULL;
+        CREATE INDEX IF NOT EXISTS idx_tasks_order ON tasks(status_rank, due_date, id);
+        """
+    )
+    conn.commit()
+
+
+def ensure_search_index(conn: sqlite3.Connection) -> None:
+    """FTS5 index over the searchable task text, kept in sync by triggers.
+
+    External-content table: the text lives only in `tasks`, the index holds
+    tokens. The triggers cover ingest and the web UI alike, so nothing else
+    has to remember to update it. Built from existing rows on first creation.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'").fetchone()
+    conn.executescript(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title, notes, next_action, tags,
+            content='tasks', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        );
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, title, notes, next_action, tags)
+            VALUES (new.id, new.title, new.notes, new.next_action, new.tags);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, notes, next_action, tags)
+            VALUES ('delete', old.id, old.title, old.notes, old.next_action, old.tags);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, notes, next_action, tags ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, notes, next_action, tags)
+            VALUES ('delete', old.id, old.title, old.notes, old.next_action, old.tags);
+            INSERT INTO tasks_fts(rowid, title, notes, next_action, tags)
+            VALUES (new.id, new.title, new.notes, new.next_action, new.tags);
+        END;
+        """
+    )
+    if not exists:
+        conn.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+    conn.commit()
+
+
+# Splits a comma-separated tags string into rows inside SQL. json_quote escapes
+# the value, and a comma inside a JSON string is never part of an escape, so
+# swapping it for '","' yields a valid JSON array of the individual tags.
+_SPLIT_TAGS = "json_each('[' || replace(json_quote({col}), ',', '\",\"') || ']')"
+
+
+def ensure_tag_index(conn: sqlite3.Connection) -> None:
+    """Normalized task_tags(task_id, tag) plus a tag_counts table, both trigger-maintained.
+
+    Tags compare case-insensitively; tag_counts keeps one row per tag with the
+    number of tasks carrying it, so listing tags never scans tasks.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_tags'").fetchone()
+    split_new = _SPLIT_TAGS.format(col="new.tags")
+    conn.executescript(
+        f"""
+        CREATE TABLE IF NOT EXISTS task_tags (
+            task_id INTEGER NOT NULL,
+            tag TEXT NOT NULL COLLATE NOCASE,
+            PRIMARY KEY (task_id, tag)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags(tag, task_id);
+        CREATE TABLE IF NOT EXISTS tag_counts (
+            tag TEXT PRIMARY KEY COLLATE NOCASE,
+            count INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TRIGGER IF NOT EXISTS task_tags_count_insert AFTER INSERT ON task_tags BEGIN
+            INSERT INTO tag_counts(tag, count) VALUES (new.tag, 1)
+            ON CONFLICT(tag) DO UPDATE SET count = count + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS task_tags_count_delete AFTER DELETE ON task_tags BEGIN
+            UPDATE tag_counts SET count = count - 1 WHERE tag = old.tag;
+            DELETE FROM tag_counts WHERE tag = old.tag AND count <= 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_tags_insert AFTER INSERT ON tasks BEGIN
+            INSERT OR IGNORE INTO task_tags(task_id, tag)
+            SELECT new.id, trim(value) FROM {split_new} WHERE trim(value) <> '';
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_tags_update AFTER UPDATE OF tags ON tasks BEGIN
+            DELETE FROM task_tags WHERE task_id = old.id;
+            INSERT OR IGNORE INTO task_tags(task_id, tag)
+            SELECT new.id, trim(value) FROM {split_new} WHERE trim(value) <> '';
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_tags_delete AFTER DELETE ON tasks BEGIN
+            DELETE FROM task_tags WHERE task_id = old.id;
+        END;
+        """
+    )
+    if not exists:
+        conn.execute(
+            f"""
+            INSERT OR IGNORE INTO task_tags(task_id, tag)
+            SELECT tasks.id, trim(value) FROM tasks, {_SPLIT_TAGS.format(col="tasks.tags")}
+            WHERE trim(value) <> ''
+            """
+        )
+    conn.commit()
+
+
 def normalize_header(h: str) -> str:
     return "".join(ch.lower() if ch.isalnum() else "_" for ch in h).strip("_")
 
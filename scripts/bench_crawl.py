@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Benchmark crawl_repo.py on a synthetic tree (default 100k files).
+
+The tree mixes source files of varied size with vendored directories
+(node_modules, .git) that the walker should prune without entering. It reports:
+- walk time: the old rglob + per-file exclude check vs walk_files (scandir, pruning)
+- full crawl time into a fresh DB for each --workers value
+- an incremental re-crawl with nothing changed
+
+    python scripts/bench_crawl.py --files 100000 --workers 1,4,8
+"""
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from crawl_repo import DEFAULT_EXCLUDES, DEFAULT_EXT_EXCLUDES, DEFAULT_NAME_EXCLUDES, walk_files
+
+SCRIPT = Path(__file__).resolve().parent / "crawl_repo.py"
+WORDS = ["def", "return", "self", "value", "config", "payroll", "import", "class", "task", "index"]
+
+
+def build_tree(root: Path, files: int, vendored: int) -> None:
+    rng = random.Random(7)
+    per_dir = 200
+    for i in range(files):
+        d = root / f"pkg{i // (per_dir * 20)}" / f"mod{(i // per_dir) % 20}"
+        if i % per_dir == 0:
+            d.mkdir(parents=True, exist_ok=True)
+        lines = rng.randint(5, 300)
+        body = "\n".join(" ".join(rng.choices(WORDS, k=8)) for _ in range(lines))
+        (d / f"f{i}.py").write_text(body)
+    # Vendored noise the old walker descends into and then rejects file by file.
+    for name in ("node_modules", ".git"):
+        for i in range(vendored):
+            d = root / name / f"v{i // per_dir}"
+            if i % per_dir == 0:
+                d.mkdir(parents=True, exist_ok=True)
+            (d / f"x{i}.js").write_text("module.exports = 1;\n")
+
+
+def legacy_walk(root: Path) -> int:
+    excludes = set(DEFAULT_EXCLUDES)
+    n = 0
+    for path in root.rglob("*"):
+        if path.is_dir():
+            continue
+        rel = path.relative_to(root)
+        if set(rel.parts) & excludes or path.suffix.lower() in DEFAULT_EXT_EXCLUDES or path.name in DEFAULT_NAME_EXCLUDES:
+            continue
+        path.stat()
+        n += 1
+    return n
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def crawl(root: Path, db: Path, workers: int, incremental: bool = False) -> str:
+    cmd = [sys.executable, str(SCRIPT), "--root", str(root), "--db", str(db), "--workers", str(workers)]
+    if incremental:
+        cmd.append("--incremental")
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    return next(line for line in out.splitlines() if line.startswith("Elapsed:"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--vendored", type=int, default=20_000, help="Files under node_modules/.git")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}")
+    parser.add_argument("--dir", default="", help="Reuse/keep the tree here instead of a temp dir")
+    args = parser.parse_args()
+
+    base = Path(args.dir) if args.dir else Path(tempfile.mkdtemp(prefix="crawl_bench_"))
+    root = base / "tree"
+    try:
+        if not root.exists():
+            print(f"building {args.files} files (+{args.vendored * 2} vendored) under {root} ...")
+            _, secs = timed(lambda: build_tree(root, args.files, args.vendored))
+            print(f"  built in {secs:.1f}s")
+
+        n_old, old_secs = timed(lambda: legacy_walk(root))
+        counts = {"excluded": 0}
+        n_new, new_secs = timed(lambda: sum(1 for _ in walk_files(root, DEFAULT_EXCLUDES, DEFAULT_EXT_EXCLUDES, DEFAULT_NAME_EXCLUDES, counts)))
+        print(f"walk  rglob+exclude: {n_old} files {old_secs:.2f}s | scandir+prune: {n_new} files {new_secs:.2f}s")
+
+        for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+            db = base / f"bench_w{workers}.sqlite"
+            for path in base.glob(f"{db.name}*"):
+                path.unlink()
+            print(f"crawl workers={workers:<3} {crawl(root, db, workers)}")
+        print(f"re-crawl --incremental (no changes) {crawl(root, db, workers, incremental=True)}")
+    finally:
+        if not args.dir:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Compare Firestore document reads per /api/tasks page: full-collection scan
+(the old behaviour) vs the pushed-down query in webui/server.py.
+
+Runs against the local emulator only; it seeds and then deletes a
+`tasks` collection there:
+    gcloud emulators firestore start --host-port=127.0.0.1:8686 &
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8686 python scripts/bench_firestore_tasks.py --docs 2000
+
+The emulator does not enforce composite indexes; deploy webui/firestore.indexes.json
+before running the new queries against a real project.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+if not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+    raise SystemExit("Set FIRESTORE_EMULATOR_HOST; this benchmark writes to the tasks collection.")
+os.environ["FIRESTORE_ENABLED"] = "1"
+os.environ.setdefault("FIRESTORE_PROJECT_ID", "agentops-bench")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "webui"))
+import server  # noqa: E402
+from google.cloud.firestore_v1.query import Query  # noqa: E402
+
+STATUSES = ["Not Started", "In-Progress", "Completed", "Blocked"]
+TAGS = ["ops", "finance", "estimator", "payroll", "slack", "infra", "hiring", "sales"]
+READS = {"n": 0}
+
+_stream = Query.stream
+
+
+def _counting_stream(self, *args, **kwargs):
+    for snapshot in _stream(self, *args, **kwargs):
+        READS["n"] += 1
+        yield snapshot
+
+
+Query.stream = _counting_stream
+
+
+def seed(client, docs: int) -> None:
+    rng = random.Random(7)
+    batch = client.batch()
+    for i in range(docs):
+        fields = {
+            "title": f"Task {i} {rng.choice(TAGS)} follow-up",
+            "tags": ", ".join(rng.sample(TAGS, rng.randint(0, 3))),
+            "status": rng.choice(STATUSES),
+            "due_date": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if rng.random() < 0.8 else "",
+            "notes": f"Notes for task {i}",
+        }
+        fields.update(server.firestore_sort_fields(fields))
+        batch.set(client.collection("tasks").document(), fields)
+        if (i + 1) % 400 == 0:
+            batch.commit()
+            batch = client.batch()
+    batch.commit()
+
+
+def clear(client) -> None:
+    batch = client.batch()
+    for n, doc in enumerate(client.collection("tasks").stream(), start=1):
+        batch.delete(doc.reference)
+        if n % 400 == 0:
+            batch.commit()
+            batch = client.batch()
+    batch.commit()
+
+
+def legacy_list(client, status: str, tag: str, limit: int) -> list:
+    items = []
+    for doc in client.collection("tasks").stream():
+        data = doc.to_dict() or {}
+        data["id"] = doc.id
+        items.append(data)
+    if status:
+        items = [item for item in items if (item.get("status") or "") == status]
+    if tag:
+        items = [item for item in items if tag in str(item.get("tags") or "").lower()]
+    items.sort(key=lambda item: (server.STATUS_RANK.get(item.get("status"), 4), item.get("due_date") or ""))
+    return items[:limit]
+
+
+def measure(fn) -> tuple:
+    READS["n"] = 0
+    start = time.perf_counter()
+    fn()
+    return READS["n"], (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="Leave the seeded documents in the emulator")
+    args = parser.parse_args()
+
+    client = server.firestore_client()
+    clear(client)
+    seed(client, args.docs)
+    handler = server.TaskServer.__new__(server.TaskServer)
+    cases = [("all", "", ""), ("status", "Completed", ""), ("tag", "", "ops"), ("status+tag", "In-Progress", "ops")]
+
+    print(f"{'case':<11} {'old_reads':>9} {'old_ms':>8} {'new_reads':>9} {'new_ms':>8} {'page2_reads':>11}  (docs={args.docs}, limit={args.limit})")
+    for name, status, tag in cases:
+        old_reads, old_ms = measure(lambda: legacy_list(client, status, tag, args.limit))
+        qs = f"limit={args.limit}&status={status}&tag={tag}"
+        page = {}
+        new_reads, new_ms = measure(lambda: page.update(result=handler._firestore_list_tasks(qs)))
+        _, next_cursor = page["result"]
+        page2_reads = 0
+        if next_cursor:
+            page2_reads, _ = measure(lambda: handler._firestore_list_tasks(f"{qs}&after={next_cursor}"))
+        print(f"{name:<11} {old_reads:>9} {old_ms:>8.1f} {new_reads:>9} {new_ms:>8.1f} {page2_reads:>11}")
+
+    if not args.keep:
+        clear(client)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Load-test the shared model client, usually against the local stub:
+
+    python scripts/stub_model_server.py --port 8099 --latency 0.05 &
+    MODEL_BASE_URL=http://127.0.0.1:8099/v1 python scripts/bench_model_client.py --requests 200 --concurrency 16
+
+Runs the same workload through the sync path (thread pool) and the async
+path (asyncio.gather) and reports latency percentiles and throughput.
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import model_client
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def report(label: str, latencies, wall: float) -> None:
+    print(
+        f"{label:<6} n={len(latencies)} wall={wall:.2f}s throughput={len(latencies) / wall:.1f}/s "
+        f"p50={percentile(latencies, 50):.0f}ms p99={percentile(latencies, 99):.0f}ms"
+    )
+
+
+def one_sync(model: str, i: int) -> int:
+    _, record = model_client.create_response(model=model, input=[{"role": "user", "content": f"ping {i}"}], caller="bench")
+    return record.latency_ms
+
+
+async def run_async(model: str, requests: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> int:
+        async with sem:
+            _, record = await model_client.acreate_response(
+                model=model, input=[{"role": "user", "content": f"ping {i}"}], caller="bench"
+            )
+            return record.latency_ms
+
+    return await asyncio.gather(*(one(i) for i in range(requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    reason = model_client.missing_reason()
+    if reason:
+        raise SystemExit(reason)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as ex:
+        start = time.monotonic()
+        latencies = list(ex.map(lambda i: one_sync(args.model, i), range(args.requests)))
+        report("sync", latencies, time.monotonic() - start)
+
+    start = time.monotonic()
+    latencies = asyncio.run(run_async(args.model, args.requests, args.concurrency))
+    report("async", latencies, time.monotonic() - start)
+    print(model_client.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Benchmark per-call OpenClaw spawning against the warm worker pool.
+
+Uses scripts/fake_openclaw_agent.py by default so it runs offline:
+    python scripts/bench_openclaw.py --requests 40 --concurrency 4 --pool-size 4
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from openclaw_pool import OpenClawPool
+
+FAKE_AGENT = Path(__file__).resolve().parent / "fake_openclaw_agent.py"
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_spawn(cmd, message: str, timeout: float) -> float:
+    start = time.monotonic()
+    subprocess.run(cmd + ["--message", message, "--thinking", "low"], capture_output=True, text=True, timeout=timeout)
+    return time.monotonic() - start
+
+
+def run_pool(pool: OpenClawPool, message: str) -> float:
+    start = time.monotonic()
+    pool.request(message)
+    return time.monotonic() - start
+
+
+def report(label: str, latencies, wall: float) -> None:
+    print(
+        f"{label:<6} n={len(latencies)} wall={wall:.2f}s "
+        f"throughput={len(latencies) / wall:.1f}/s "
+        f"p50={percentile(latencies, 50) * 1000:.0f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.0f}ms "
+        f"mean={statistics.mean(latencies) * 1000:.0f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--spawn-cmd", default="", help="One-shot agent command (default: fake agent)")
+    parser.add_argument("--worker-cmd", default="", help="Pool worker command (default: fake agent --serve)")
+    args = parser.parse_args()
+
+    spawn_cmd = args.spawn_cmd.split() if args.spawn_cmd else [sys.executable, str(FAKE_AGENT), "agent", "--agent", "bench"]
+    worker_cmd = args.worker_cmd.split() if args.worker_cmd else [sys.executable, str(FAKE_AGENT), "--serve"]
+    messages = [f"benchmark message {i}" for i in range(args.requests)]
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as ex:
+        start = time.monotonic()
+        spawn = list(ex.map(lambda m: run_spawn(spawn_cmd, m, args.timeout), messages))
+        report("spawn", spawn, time.monotonic() - start)
+
+    pool = OpenClawPool(worker_cmd, size=args.pool_size, timeout=args.timeout)
+    pool.start()
+    # One warm-up round so every worker has finished booting.
+    with ThreadPoolExecutor(max_workers=args.pool_size) as ex:
+        list(ex.map(lambda m: run_pool(pool, m), ["warmup"] * args.pool_size))
+    with ThreadPoolExecutor(max_workers=args.concurrency) as ex:
+        start = time.monotonic()
+        pooled = list(ex.map(lambda m: run_pool(pool, m), messages))
+        report("pool", pooled, time.monotonic() - start)
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
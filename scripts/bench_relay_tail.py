@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark relay context reads as a conversation log grows.
+
+Compares the old full-file read against the reverse block reader and the
+offset-index lookup for logs of 1k..1M records:
+    python scripts/bench_relay_tail.py --sizes 1000,10000,100000,1000000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("RELAY_DATA_DIR", tempfile.mkdtemp(prefix="relay_bench_"))
+os.environ["RELAY_BACKEND"] = "jsonl"
+
+import relay_server  # noqa: E402
+
+
+def full_read_tail(path: Path, limit: int) -> list:
+    lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+    return [json.loads(line) for line in lines[-limit:]]
+
+
+def grow_log(key: str, target: int, have: int) -> None:
+    path = relay_server.STORE.log_path(key)
+    with path.open("a", encoding="utf-8") as f:
+        for i in range(have, target):
+            record = {"ts": relay_server._now(), "role": "user" if i % 2 else "assistant", "user_id": "U1", "text": f"message {i} " + "x" * 80}
+            f.write(json.dumps(record) + "\n")
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--limit", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    key = "dm_bench"
+    have = 0
+    print(f"{'records':>9} {'full_read':>10} {'tail_seek':>10} {'index_nth':>10}  (median ms, limit={args.limit})")
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        grow_log(key, size, have)
+        have = size
+        relay_server.STORE.sync_index(key)  # one-off build, like the first request after upgrade
+        path = relay_server.STORE.log_path(key)
+        full = timed(lambda: full_read_tail(path, args.limit), args.repeat)
+        tail = timed(lambda: relay_server._read_tail(key, args.limit), args.repeat)
+        nth = timed(lambda: relay_server._read_record(key, size // 2), args.repeat)
+        print(f"{size:>9} {full:>10.2f} {tail:>10.2f} {nth:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Load-test the task UI's /api/tasks endpoint at several concurrency levels.
+
+Against a running server:
+    python scripts/bench_webui.py --url http://127.0.0.1:8090 --clients 1,16,64
+
+Or let the harness seed a synthetic DB and start webui/server.py itself
+(threaded vs single-threaded is AGENT_OPS_THREADED):
+    python scripts/bench_webui.py --spawn --rows 5000
+    AGENT_OPS_THREADED=0 python scripts/bench_webui.py --spawn --rows 5000
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from actions_ingest import init_db
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+STATUSES = ["Not Started", "In-Progress", "Completed", "Blocked"]
+TAGS = ["ops", "finance", "estimator", "payroll", "slack", "infra", "hiring", "sales"]
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def seed_db(path: Path, rows: int) -> None:
+    conn = init_db(path)
+    rng = random.Random(7)
+    conn.executemany(
+        """
+        INSERT INTO tasks
+        (raw_id, source_sheet, title, tags, due_date, status, status_color, category, priority, next_action, notes, source, created_at, updated_at)
+        VALUES (NULL, 'All_Tasks', ?, ?, ?, ?, NULL, 'All_Tasks', ?, ?, ?, 'bench', strftime('%s','now'), strftime('%s','now'))
+        """,
+        [
+            (
+                f"Task {i} {rng.choice(TAGS)} follow-up",
+                ", ".join(rng.sample(TAGS, rng.randint(0, 3))),
+                f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if rng.random() < 0.8 else "",
+                rng.choice(STATUSES),
+                rng.choice(["High", "Medium", "Low", ""]),
+                f"Call vendor about item {i}",
+                f"Notes for task {i}: " + " ".join(rng.sample(TAGS, 4)),
+            )
+            for i in range(rows)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def wait_ready(url: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{url}/api/health", timeout=1).read()
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise SystemExit(f"server at {url} did not come up")
+
+
+def fetch(url: str):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            resp.read()
+    except Exception:
+        return None
+    return (time.perf_counter() - start) * 1000
+
+
+def run_level(url: str, clients: int, requests: int) -> None:
+    with ThreadPoolExecutor(max_workers=clients) as ex:
+        start = time.monotonic()
+        results = list(ex.map(lambda _: fetch(url), range(requests)))
+        wall = time.monotonic() - start
+    latencies = [r for r in results if r is not None]
+    print(
+        f"clients={clients:<3} n={len(latencies)} errors={len(results) - len(latencies)} "
+        f"throughput={len(latencies) / wall:.1f}/s "
+        f"p50={percentile(latencies, 50):.1f}ms p99={percentile(latencies, 99):.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8090")
+    parser.add_argument("--path", default="/api/tasks?limit=50", help="Endpoint (and query) to hit")
+    parser.add_argument("--clients", default="1,16,64")
+    parser.add_argument("--requests", type=int, default=400, help="Requests per concurrency level")
+    parser.add_argument("--spawn", action="store_true", help="Seed a temp DB and start webui/server.py")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8097)
+    args = parser.parse_args()
+
+    proc = None
+    url = args.url.rstrip("/")
+    if args.spawn:
+        db_path = Path(tempfile.mkdtemp(prefix="webui_bench_")) / "actions.sqlite"
+        seed_db(db_path, args.rows)
+        env = {**os.environ, "AGENT_OPS_DB": str(db_path), "AGENT_OPS_HOST": "127.0.0.1", "AGENT_OPS_PORT": str(args.port)}
+        env.pop("PORT", None)
+        proc = subprocess.Popen(
+            [sys.executable, str(REPO_ROOT / "webui" / "server.py")],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_ready(url)
+        fetch(url + args.path)  # warm the pool and page cache
+        for clients in [int(c) for c in args.clients.split(",") if c.strip()]:
+            run_level(url + args.path, clients, args.requests)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
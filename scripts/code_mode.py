@@ -4,9 +4,14 @@ Generate a unified diff patch for jcw-agent-ops using OpenAI.
 """
 
 import argparse
+import os
 from pathlib import Path
 
-from openai import OpenAI
+import model_client
+
+CODE_MODE_MODEL = os.environ.get("CODE_MODE_MODEL", "gpt-4o-mini").strip()
+# Whole-diff generations run long; keep the OpenAI SDK's 600s default rather than MODEL_TIMEOUT.
+CODE_MODE_TIMEOUT = float(os.environ.get("CODE_MODE_TIMEOUT", "600"))
 
 
 def read_file(path: Path, max_chars: int = 6000) -> str:
@@ -44,16 +49,21 @@ def main():
         "Return ONLY a unified diff patch. "
         "Make minimal, correct changes. If unsure, output an empty diff."
     )
-    client = OpenAI()
-    response = client.responses.create(
-        model="gpt-4o-mini",
+    reason = model_client.missing_reason()
+    if reason:
+        raise SystemExit(f"Code mode error: {reason}")
+    model_client.configure(calls_log=out_dir / "model_calls.jsonl")
+    response, _ = model_client.create_response(
+        model=CODE_MODE_MODEL,
+        caller="code_mode",
+        timeout=CODE_MODE_TIMEOUT,
         input=[
             {"role": "system", "content": system},
             {"role": "user", "content": "REQUEST:\n" + request},
             {"role": "user", "content": "\n\nCONTEXT:\n" + "\n\n".join(context)},
         ],
     )
-    diff = getattr(response, "output_text", "").strip()
+    diff = model_client.output_text(response)
     diff_path = out_dir / "change.diff"
     diff_path.write_text(diff, encoding="utf-8")
     (out_dir / "summary.txt").write_text(request, encoding="utf-8")
@@ -3,8 +3,10 @@
 Repository crawler and indexer.
 
 Outputs:
-- SQLite DB with file metadata and content chunks.
-- JSONL with raw chunks (optional).
+- SQLite DB with file metadata and content chunks. Chunk text is stored once
+  per distinct content in chunk_blobs (keyed by sha256); repo_chunks rows
+  reference it, and the repo_chunk_content view joins the two back together.
+- JSONL with raw chunks for every indexed file, exported after the crawl (optional).
 """
 
 import argparse
@@ -14,6 +16,8 @@ import os
 import sqlite3
 import sys
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 
@@ -60,21 +64,22 @@ DEFAULT_NAME_EXCLUDES = {
 }
 
 
+TEXT_CHARS = bytes(bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100))))
+# Files handed to a worker process per task; enough to amortize the pickling round trip.
+WORK_BATCH = 64
+
+
 def is_binary_bytes(sample: bytes) -> bool:
     if b"\x00" in sample:
         return True
     # Heuristic: a lot of non-text bytes
-    text_chars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)))
-    nontext = sample.translate(None, text_chars)
+    nontext = sample.translate(None, TEXT_CHARS)
     return float(len(nontext)) / max(len(sample), 1) > 0.30
 
 
-def sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+def decode_text(data: bytes) -> str:
+    """Same text Path.read_text(errors="replace") gives: UTF-8 with universal newlines."""
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
 
 
 def chunk_text(text: str, max_chars: int = 4000, overlap: int = 200):
@@ -93,16 +98,87 @@ def chunk_text(text: str, max_chars: int = 4000, overlap: int = 200):
     return chunks
 
 
-def should_exclude(path: Path, root: Path, excludes, ext_excludes, name_excludes):
-    rel = path.relative_to(root)
-    parts = set(rel.parts)
-    if parts & set(excludes):
-        return True
-    if path.suffix.lower() in ext_excludes:
-        return True
-    if path.name in name_excludes:
-        return True
-    return False
+def walk_files(root: Path, excludes, ext_excludes, name_excludes, counts):
+    """Yield (abs_path, rel_path, size, mtime) for indexable files under `root`.
+
+    Excluded directories are pruned before descending, so node_modules and .git
+    cost one directory entry each. Entries are sorted for a repeatable order.
+    Excluded files are tallied in counts["excluded"].
+    """
+    excludes = set(excludes)
+    stack = [(str(root), "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}{entry.name}"
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in excludes:
+                        subdirs.append((entry.path, rel_path + "/"))
+                    continue
+                if not entry.is_file():
+                    continue
+                if (
+                    entry.name in excludes
+                    or entry.name in name_excludes
+                    or os.path.splitext(entry.name)[1].lower() in ext_excludes
+                ):
+                    counts["excluded"] += 1
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            yield entry.path, rel_path, st.st_size, int(st.st_mtime)
+        stack.extend(reversed(subdirs))
+
+
+def process_file(item):
+    """Read, hash, sniff and chunk one file (runs in a worker process).
+
+    Returns (rel_path, abs_path, ext, size, mtime, sha256, is_binary, chunks),
+    or None if the file could not be read.
+    """
+    abs_path, rel_path, _size, mtime = item
+    try:
+        with open(abs_path, "rb") as f:
+            # One read serves the hash, the binary sniff and the decode.
+            data = f.read()
+    except OSError:
+        return None
+    is_binary = 1 if is_binary_bytes(data[:4096]) else 0
+    chunks = [] if is_binary else [(start, end, content, chunk_hash(content)) for start, end, content in chunk_text(decode_text(data))]
+    ext = os.path.splitext(abs_path)[1].lower()
+    return rel_path, abs_path, ext, len(data), mtime, hashlib.sha256(data).hexdigest(), is_binary, chunks
+
+
+def process_batch(items):
+    return [process_file(item) for item in items]
+
+
+def processed(batches, workers: int):
+    """process_batch over `batches`, in order, on `workers` processes (in-process if 1).
+
+    At most a few batches per worker are in flight, which bounds memory while
+    the single writer (the caller) catches up.
+    """
+    if workers <= 1:
+        for batch in batches:
+            yield process_batch(batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for batch in batches:
+            in_flight.append(pool.submit(process_batch, batch))
+            if len(in_flight) >= workers * 4:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
 
 
 def init_db(db_path: Path):
@@ -121,24 +197,101 @@ def init_db(db_path: Path):
             is_binary INTEGER,
             indexed_at INTEGER
         );
-        CREATE TABLE IF NOT EXISTS repo_chunks (
-            id INTEGER PRIMARY KEY,
-            file_id INTEGER,
-            chunk_index INTEGER,
-            start_char INTEGER,
-            end_char INTEGER,
-            content TEXT,
-            FOREIGN KEY(file_id) REFERENCES repo_files(id)
-        );
-        CREATE INDEX IF NOT EXISTS idx_chunks_file ON repo_chunks(file_id);
         """
     )
+    ensure_chunk_store(conn)
     return conn
 
 
+CHUNKS_DDL = """
+    CREATE TABLE IF NOT EXISTS chunk_blobs (
+        id INTEGER PRIMARY KEY,
+        hash TEXT NOT NULL UNIQUE,
+        size INTEGER,
+        content TEXT
+    );
+    CREATE TABLE IF NOT EXISTS repo_chunks (
+        id INTEGER PRIMARY KEY,
+        file_id INTEGER,
+        chunk_index INTEGER,
+        start_char INTEGER,
+        end_char INTEGER,
+        blob_id INTEGER,
+        FOREIGN KEY(file_id) REFERENCES repo_files(id),
+        FOREIGN KEY(blob_id) REFERENCES chunk_blobs(id)
+    );
+"""
+
+CHUNK_INDEXES_DDL = """
+    CREATE INDEX IF NOT EXISTS idx_chunks_file ON repo_chunks(file_id);
+    CREATE INDEX IF NOT EXISTS idx_chunks_blob ON repo_chunks(blob_id);
+    CREATE VIEW IF NOT EXISTS repo_chunk_content AS
+        SELECT c.id, c.file_id, c.chunk_index, c.start_char, c.end_char, c.blob_id, b.content
+        FROM repo_chunks c JOIN chunk_blobs b ON b.id = c.blob_id;
+"""
+
+
+def chunk_hash(content) -> str:
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+
+def ensure_chunk_store(conn):
+    """Create the blob/ref chunk tables, moving an older inline-content repo_chunks over.
+
+    Shared by merge_indexes.py, whose repo_chunks has the same layout.
+    """
+    conn.executescript(CHUNKS_DDL)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(repo_chunks)")]
+    if "content" in columns:
+        conn.create_function("chunk_hash", 1, chunk_hash, deterministic=True)
+        conn.executescript(
+            """
+            BEGIN;
+            INSERT OR IGNORE INTO chunk_blobs (hash, size, content)
+                SELECT chunk_hash(content), length(CAST(content AS BLOB)), content FROM repo_chunks;
+            CREATE TABLE repo_chunks_refs (
+                id INTEGER PRIMARY KEY,
+                file_id INTEGER,
+                chunk_index INTEGER,
+                start_char INTEGER,
+                end_char INTEGER,
+                blob_id INTEGER,
+                FOREIGN KEY(file_id) REFERENCES repo_files(id),
+                FOREIGN KEY(blob_id) REFERENCES chunk_blobs(id)
+            );
+            INSERT INTO repo_chunks_refs (id, file_id, chunk_index, start_char, end_char, blob_id)
+                SELECT c.id, c.file_id, c.chunk_index, c.start_char, c.end_char, b.id
+                FROM repo_chunks c JOIN chunk_blobs b ON b.hash = chunk_hash(c.content);
+            DROP TABLE repo_chunks;
+            ALTER TABLE repo_chunks_refs RENAME TO repo_chunks;
+            COMMIT;
+            """
+        )
+    conn.executescript(CHUNK_INDEXES_DDL)
+
+
+def intern_blob(conn, digest: str, content: str):
+    """Id of the blob for `digest`, inserting it first if new. Returns (id, inserted)."""
+    row = conn.execute("SELECT id FROM chunk_blobs WHERE hash = ?", (digest,)).fetchone()
+    if row:
+        return row[0], False
+    cur = conn.execute(
+        "INSERT INTO chunk_blobs (hash, size, content) VALUES (?, ?, ?) RETURNING id",
+        (digest, len(content.encode("utf-8")), content),
+    )
+    return cur.fetchone()[0], True
+
+
+def gc_blobs(conn) -> int:
+    """Drop blobs no chunk references any more (after re-crawls, prunes and merges)."""
+    return conn.execute(
+        "DELETE FROM chunk_blobs WHERE NOT EXISTS (SELECT 1 FROM repo_chunks WHERE blob_id = chunk_blobs.id)"
+    ).rowcount
+
+
 def upsert_file(conn, rel_path, abs_path, ext, size, mtime, sha256, is_binary):
-    cur = conn.cursor()
-    cur.execute(
+    """Insert or update one file row and return its id. The caller commits."""
+    cur = conn.execute(
         """
         INSERT INTO repo_files (rel_path, abs_path, ext, size, mtime, sha256, is_binary, indexed_at)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -150,26 +303,91 @@ def upsert_file(conn, rel_path, abs_path, ext, size, mtime, sha256, is_binary):
             sha256=excluded.sha256,
             is_binary=excluded.is_binary,
             indexed_at=excluded.indexed_at
+        RETURNING id
         """,
         (rel_path, abs_path, ext, size, mtime, sha256, is_binary, int(time.time())),
     )
-    conn.commit()
-    cur.execute("SELECT id FROM repo_files WHERE rel_path = ?", (rel_path,))
     return cur.fetchone()[0]
 
 
-def replace_chunks(conn, file_id, chunks):
-    cur = conn.cursor()
-    cur.execute("DELETE FROM repo_chunks WHERE file_id = ?", (file_id,))
-    for idx, (start, end, content) in enumerate(chunks):
-        cur.execute(
+def load_file_stats(conn):
+    """rel_path -> (id, size, mtime) for everything indexed by earlier runs."""
+    return {row[0]: (row[1], row[2], row[3]) for row in conn.execute("SELECT rel_path, id, size, mtime FROM repo_files")}
+
+
+def prune_files(conn, file_ids):
+    ids = [(file_id,) for file_id in file_ids]
+    conn.executemany("DELETE FROM repo_chunks WHERE file_id = ?", ids)
+    conn.executemany("DELETE FROM repo_files WHERE id = ?", ids)
+
+
+def export_jsonl(conn, path: Path) -> int:
+    """Write every chunk in the DB to `path`, one JSON object per line; returns the count.
+
+    Exported from the DB after the crawl rather than as files are read, so an
+    incremental run still produces the full set, unchanged files included.
+    """
+    written = 0
+    with path.open("w", encoding="utf-8") as fp:
+        for rel_path, chunk_index, start, end, content in conn.execute(
             """
-            INSERT INTO repo_chunks (file_id, chunk_index, start_char, end_char, content)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (file_id, idx, start, end, content),
-        )
+            SELECT f.rel_path, c.chunk_index, c.start_char, c.end_char, c.content
+            FROM repo_chunk_content c JOIN repo_files f ON f.id = c.file_id
+            ORDER BY f.rel_path, c.chunk_index
+            """
+        ):
+            fp.write(
+                json.dumps(
+                    {
+                        "rel_path": rel_path,
+                        "chunk_index": chunk_index,
+                        "start_char": start,
+                        "end_char": end,
+                        "content": content,
+                    }
+                )
+                + "\n"
+            )
+            written += 1
+    return written
+
+
+def replace_chunks(conn, file_id, chunks, is_new=False) -> int:
+    """Swap in a file's (start, end, content, hash) chunks; returns how many blobs were new.
+
+    The caller commits; a file new to the DB has nothing to delete.
+    """
+    if not is_new:
+        conn.execute("DELETE FROM repo_chunks WHERE file_id = ?", (file_id,))
+    rows = []
+    new_blobs = 0
+    for idx, (start, end, content, digest) in enumerate(chunks):
+        blob_id, inserted = intern_blob(conn, digest, content)
+        new_blobs += inserted
+        rows.append((file_id, idx, start, end, blob_id))
+    conn.executemany(
+        """
+        INSERT INTO repo_chunks (file_id, chunk_index, start_char, end_char, blob_id)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    return new_blobs
+
+
+def begin_bulk_load(conn):
+    """Empty DB: skip fsyncs and build the chunk index once at the end instead of per row."""
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("DROP INDEX IF EXISTS idx_chunks_file")
+    conn.execute("DROP INDEX IF EXISTS idx_chunks_blob")
+
+
+def end_bulk_load(conn):
+    conn.executescript(CHUNK_INDEXES_DDL)
     conn.commit()
+    conn.execute("PRAGMA synchronous=NORMAL")
 
 
 def main():
@@ -178,80 +396,114 @@ def main():
     parser.add_argument("--db", required=True, help="SQLite output path")
     parser.add_argument("--jsonl", default="", help="Optional JSONL output path")
     parser.add_argument("--max-bytes", type=int, default=2 * 1024 * 1024, help="Max file size to index")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip files whose size and mtime match the existing DB (without reading them)",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000, help="Files per transaction")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Processes for reading/hashing/chunking (default: CPU count; 1 = no pool)",
+    )
     args = parser.parse_args()
 
     root = Path(args.root).resolve()
     db_path = Path(args.db).resolve()
     jsonl_path = Path(args.jsonl).resolve() if args.jsonl else None
+    workers = args.workers or os.cpu_count() or 1
 
     conn = init_db(db_path)
-    jsonl_fp = jsonl_path.open("w", encoding="utf-8") if jsonl_path else None
-
-    total = 0
-    indexed = 0
-    skipped = 0
-
-    for path in root.rglob("*"):
-        if path.is_dir():
-            continue
-
-        total += 1
-        if should_exclude(path, root, DEFAULT_EXCLUDES, DEFAULT_EXT_EXCLUDES, DEFAULT_NAME_EXCLUDES):
-            skipped += 1
-            continue
-
-        try:
-            size = path.stat().st_size
+    known = load_file_stats(conn)
+    seen = set()
+    bulk = not known
+    if bulk:
+        begin_bulk_load(conn)
+    else:
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+    counts = {"total": 0, "excluded": 0, "too_large": 0, "unchanged": 0}
+    started = time.perf_counter()
+
+    def work_batches():
+        """Walk the tree and yield batches of files that need (re)indexing."""
+        batch = []
+        for item in walk_files(root, DEFAULT_EXCLUDES, DEFAULT_EXT_EXCLUDES, DEFAULT_NAME_EXCLUDES, counts):
+            _, rel_path, size, mtime = item
+            counts["total"] += 1
             if size > args.max_bytes:
-                skipped += 1
+                counts["too_large"] += 1
                 continue
-
-            rel_path = str(path.relative_to(root)).replace("\\", "/")
-            ext = path.suffix.lower()
-            mtime = int(path.stat().st_mtime)
-            sha = sha256_file(path)
-
-            with path.open("rb") as f:
-                sample = f.read(4096)
-                is_binary = 1 if is_binary_bytes(sample) else 0
-
-            file_id = upsert_file(conn, rel_path, str(path), ext, size, mtime, sha, is_binary)
-
-            if is_binary:
-                skipped += 1
+            seen.add(rel_path)
+            previous = known.get(rel_path)
+            if args.incremental and previous is not None and previous[1:] == (size, mtime):
+                counts["unchanged"] += 1
                 continue
+            batch.append(item)
+            if len(batch) >= WORK_BATCH:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
 
-            text = path.read_text(encoding="utf-8", errors="replace")
-            chunks = chunk_text(text)
-            replace_chunks(conn, file_id, chunks)
-
-            if jsonl_fp:
-                for idx, (start, end, content) in enumerate(chunks):
-                    jsonl_fp.write(
-                        json.dumps(
-                            {
-                                "rel_path": rel_path,
-                                "chunk_index": idx,
-                                "start_char": start,
-                                "end_char": end,
-                                "content": content,
-                            }
-                        )
-                        + "\n"
-                    )
-
-            indexed += 1
-        except Exception:
-            skipped += 1
-            continue
+    indexed = 0
+    binary = 0
+    errors = 0
+    pending = 0
+    bytes_read = 0
+    chunk_refs = 0
+    new_blobs = 0
+
+    # This process is the only writer; workers never touch the DB.
+    for results in processed(work_batches(), workers):
+        for result in results:
+            if result is None:
+                errors += 1
+                continue
+            rel_path, abs_path, ext, size, mtime, sha, is_binary, chunks = result
+            bytes_read += size
+            previous = known.get(rel_path)
+            file_id = upsert_file(conn, rel_path, abs_path, ext, size, mtime, sha, is_binary)
+            if is_binary:
+                if previous is not None:
+                    replace_chunks(conn, file_id, [])
+                binary += 1
+            else:
+                chunk_refs += len(chunks)
+                new_blobs += replace_chunks(conn, file_id, chunks, is_new=previous is None)
+                indexed += 1
+            pending += 1
+            if pending >= args.batch_size:
+                conn.commit()
+                pending = 0
+
+    # Rows for files that were deleted, or are now excluded or too large.
+    removed = [file_id for rel_path, (file_id, _, _) in known.items() if rel_path not in seen]
+    prune_files(conn, removed)
+    freed_blobs = 0 if bulk else gc_blobs(conn)
+    conn.commit()
+    if bulk:
+        end_bulk_load(conn)
 
-    if jsonl_fp:
-        jsonl_fp.close()
+    exported = export_jsonl(conn, jsonl_path) if jsonl_path else 0
     conn.close()
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    total = counts["total"]
 
-    print(f"Total files: {total}")
+    # Files inside pruned directories are never seen, so they are not counted anywhere.
+    print(f"Total files: {total + counts['excluded']}")
+    print(f"Excluded: {counts['excluded']}")
     print(f"Indexed: {indexed}")
-    print(f"Skipped: {skipped}")
+    print(f"Unchanged: {counts['unchanged']}")
+    print(f"Removed: {len(removed)}")
+    print(f"Skipped: {counts['too_large'] + binary + errors} (too large {counts['too_large']}, binary {binary}, unreadable {errors})")
+    print(f"Chunks written: {chunk_refs} ({new_blobs} new blobs, {chunk_refs - new_blobs} deduplicated, {freed_blobs} orphaned blobs dropped)")
+    if jsonl_path:
+        print(f"JSONL: {exported} chunks -> {jsonl_path}")
+    print(f"Workers: {workers}")
+    print(f"Elapsed: {elapsed:.2f}s ({total / elapsed:.0f} files/s, {bytes_read / elapsed / 1e6:.1f} MB/s read)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Fake OpenClaw agent for local latency/throughput benchmarks.
+
+One-shot mode mirrors the real CLI call made by slack_bot.run_openclaw:
+    fake_openclaw_agent.py agent --agent orchestrator --message "hi" --thinking low
+
+Serve mode speaks the openclaw_pool line protocol on stdin/stdout:
+    fake_openclaw_agent.py --serve
+
+Startup and per-request cost are simulated with FAKE_OPENCLAW_STARTUP and
+FAKE_OPENCLAW_LATENCY (seconds). The messages "__crash__" and "__hang__"
+make the agent exit or stall, for exercising pool restarts and timeouts.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+STARTUP = float(os.environ.get("FAKE_OPENCLAW_STARTUP", "0.4"))
+LATENCY = float(os.environ.get("FAKE_OPENCLAW_LATENCY", "0.05"))
+
+
+def reply(message: str) -> str:
+    if message == "__crash__":
+        sys.exit(3)
+    if message == "__hang__":
+        time.sleep(3600)
+    time.sleep(LATENCY)
+    last = message.strip().splitlines()[-1] if message.strip() else ""
+    return f"fake-openclaw: {last[:200]}"
+
+
+def serve() -> int:
+    time.sleep(STARTUP)
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            req = json.loads(line)
+        except ValueError:
+            continue
+        try:
+            out = {"id": req.get("id"), "ok": True, "output": reply(req.get("message") or "")}
+        except SystemExit:
+            raise
+        except Exception as exc:
+            out = {"id": req.get("id"), "ok": False, "error": str(exc)}
+        sys.stdout.write(json.dumps(out) + "\n")
+        sys.stdout.flush()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", nargs="?", default="agent")
+    parser.add_argument("--serve", action="store_true", help="Speak the line protocol on stdin/stdout")
+    parser.add_argument("--agent", default="orchestrator")
+    parser.add_argument("--message", default="")
+    parser.add_argument("--thinking", default="low")
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve()
+    time.sleep(STARTUP)
+    print(reply(args.message))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
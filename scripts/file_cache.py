@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+File-content cache keyed by (path, mtime, size).
+
+Callers ask for raw text or for a value derived from it (a snippet, parsed
+sections, a rendered summary). Each lookup costs one stat(); the file is
+only re-read and re-parsed when its mtime or size changes.
+"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+_MISSING = object()
+
+
+def stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FileCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, cache_key, key):
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return _MISSING
+
+    def _put(self, cache_key, key, value) -> None:
+        with self._lock:
+            self._entries[cache_key] = (key, value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def derive(self, path: Path, name: str, fn: Callable[[str], Any], default: Any = None) -> Any:
+        """Return fn(file text), recomputed only when the file changes. `default` if missing."""
+        path = Path(path)
+        key = stat_key(path)
+        if key is None:
+            return default
+        cache_key = (str(path), name)
+        value = self._get(cache_key, key)
+        if value is not _MISSING:
+            return value
+        text = path.read_text(encoding="utf-8", errors="ignore")
+        value = fn(text)
+        # Key on the stat taken before the read: a concurrent write bumps mtime
+        # and the next lookup re-reads instead of trusting a torn snapshot.
+        self._put(cache_key, key, value)
+        return value
+
+    def read_text(self, path: Path, default: str = "") -> str:
+        return self.derive(path, "raw", lambda text: text, default=default)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -5,11 +5,10 @@ import argparse
 import json
 from pathlib import Path
 
-from googleapiclient.discovery import build
-
-from google_common import get_credentials
+from google_common import get_service
 
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
+_CALENDAR_IDS = {}
 
 
 def find_calendar_id(service, name):
@@ -25,6 +24,18 @@ def find_calendar_id(service, name):
     return None
 
 
+def insert_event(event: dict, calendar_name: str, calendar_id: str = "") -> str:
+    service = get_service("calendar", "v3", SCOPES)
+    if not calendar_id:
+        # Listing calendars is a paged API walk; a long-lived process does it once per name.
+        calendar_id = _CALENDAR_IDS.get(calendar_name) or find_calendar_id(service, calendar_name)
+    if not calendar_id:
+        raise LookupError(f"Calendar not found: {calendar_name}. Create it manually or pass --calendar-id.")
+    _CALENDAR_IDS[calendar_name] = calendar_id
+    created = service.events().insert(calendarId=calendar_id, body=event, sendUpdates="none").execute()
+    return created.get("id")
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--title", required=True)
@@ -58,18 +69,11 @@ def main():
         print("DRY RUN: Event not created. Use --commit to create in Calendar.")
         return
 
-    creds = get_credentials(SCOPES)
-    service = build("calendar", "v3", credentials=creds)
-
-    calendar_id = args.calendar_id
-    if not calendar_id:
-        calendar_id = find_calendar_id(service, args.calendar_name)
-
-    if not calendar_id:
-        raise SystemExit(f"Calendar not found: {args.calendar_name}. Create it manually or pass --calendar-id.")
-
-    created = service.events().insert(calendarId=calendar_id, body=event, sendUpdates="none").execute()
-    print("Created event:", created.get("id"))
+    try:
+        event_id = insert_event(event, args.calendar_name, args.calendar_id)
+    except LookupError as exc:
+        raise SystemExit(str(exc))
+    print("Created event:", event_id)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,14 @@
 #!/usr/bin/env python
 """Shared helpers for Google API scripts."""
 
+import threading
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build
 
 DEFAULT_CREDS = Path(__file__).resolve().parent.parent / "data" / "google" / "credentials.json"
 DEFAULT_TOKEN = Path(__file__).resolve().parent.parent / "data" / "google" / "token.json"
@@ -29,3 +31,21 @@ def get_credentials(scopes: List[str], creds_path: Path = DEFAULT_CREDS, token_p
         token_path.write_text(creds.to_json())
 
     return creds
+
+
+_SERVICES: Dict[Tuple[str, str, Tuple[str, ...]], object] = {}
+_SERVICES_LOCK = threading.Lock()
+
+
+def get_service(api: str, version: str, scopes: List[str]):
+    """API client built once per process; the credentials inside refresh their own access token.
+
+    googleapiclient clients are not thread-safe: share one only within a single thread.
+    """
+    key = (api, version, tuple(sorted(scopes)))
+    with _SERVICES_LOCK:
+        service = _SERVICES.get(key)
+        if service is None:
+            service = build(api, version, credentials=get_credentials(scopes), cache_discovery=False)
+            _SERVICES[key] = service
+        return service
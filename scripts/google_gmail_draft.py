@@ -6,9 +6,7 @@ import base64
 from email.message import EmailMessage
 from pathlib import Path
 
-from googleapiclient.discovery import build
-
-from google_common import get_credentials
+from google_common import get_service
 
 SCOPES = ["https://www.googleapis.com/auth/gmail.compose"]
 
@@ -30,6 +28,12 @@ def encode_message(msg: EmailMessage) -> str:
     return raw
 
 
+def create_draft(msg: EmailMessage) -> str:
+    service = get_service("gmail", "v1", SCOPES)
+    draft = {"message": {"raw": encode_message(msg)}}
+    return service.users().drafts().create(userId="me", body=draft).execute().get("id")
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--to", required=True)
@@ -42,7 +46,6 @@ def main():
     args = parser.parse_args()
 
     msg = build_message(args.to, args.subject, args.body, cc=args.cc or None, bcc=args.bcc or None)
-    raw = encode_message(msg)
 
     if args.out:
         Path(args.out).write_bytes(msg.as_bytes())
@@ -51,11 +54,7 @@ def main():
         print("DRY RUN: Draft not created. Use --commit to create in Gmail.")
         return
 
-    creds = get_credentials(SCOPES)
-    service = build("gmail", "v1", credentials=creds)
-    draft = {"message": {"raw": raw}}
-    result = service.users().drafts().create(userId="me", body=draft).execute()
-    print("Created draft:", result.get("id"))
+    print("Created draft:", create_draft(msg))
 
 
 if __name__ == "__main__":
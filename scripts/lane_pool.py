@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Bounded worker pool with per-lane serial ordering.
+
+Work submitted to the same lane (e.g. one Slack conversation) runs one item
+at a time in submission order; different lanes run in parallel on a fixed
+thread pool. Each user is capped at a number of queued+running items so a
+burst from one person cannot starve everyone else.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+
+class LanePool:
+    def __init__(
+        self,
+        workers: int = 8,
+        max_in_flight_per_user: int = 3,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+    ):
+        self.workers = max(1, workers)
+        self.max_in_flight_per_user = max_in_flight_per_user
+        self.on_error = on_error
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="lane")
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._lanes: Dict[str, Deque[Tuple[str, float, Callable, tuple]]] = {}
+        self._active: set = set()
+        self._in_flight: Dict[str, int] = {}
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+
+    def submit(self, lane: str, user: str, fn: Callable, *args) -> bool:
+        """Queue fn(*args) on `lane`. Returns False if `user` is over the in-flight cap."""
+        with self._lock:
+            if self.max_in_flight_per_user and self._in_flight.get(user, 0) >= self.max_in_flight_per_user:
+                self._rejected += 1
+                return False
+            self._in_flight[user] = self._in_flight.get(user, 0) + 1
+            self._lanes.setdefault(lane, deque()).append((user, time.monotonic(), fn, args))
+            self._queued += 1
+            self._submitted += 1
+            if lane in self._active:
+                return True
+            self._active.add(lane)
+        self._executor.submit(self._run_next, lane)
+        return True
+
+    def _run_next(self, lane: str) -> None:
+        with self._lock:
+            user, enqueued, fn, args = self._lanes[lane].popleft()
+            self._queued -= 1
+            self._running += 1
+            wait = time.monotonic() - enqueued
+            self._wait_last = wait
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        try:
+            fn(*args)
+        except Exception as exc:
+            if self.on_error:
+                self.on_error(lane, exc)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                remaining = self._in_flight.get(user, 1) - 1
+                if remaining > 0:
+                    self._in_flight[user] = remaining
+                else:
+                    self._in_flight.pop(user, None)
+                pending = self._lanes.get(lane)
+                if not pending:
+                    self._lanes.pop(lane, None)
+                    self._active.discard(lane)
+                    pending = None
+                if not self._active:
+                    self._idle.notify_all()
+            # Re-submit instead of looping so busy lanes share workers fairly.
+            if pending:
+                self._executor.submit(self._run_next, lane)
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "workers": self.workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "active_lanes": len(self._active),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_last_s": round(self._wait_last, 3),
+                "wait_avg_s": round(self._wait_total / started, 3) if started else 0.0,
+                "wait_max_s": round(self._wait_max, 3),
+            }
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None) -> None:
+        """Stop the pool; with wait=True, drain every queued item first."""
+        if wait:
+            with self._idle:
+                self._idle.wait_for(lambda: not self._active, timeout)
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+Append-only buffered log sink shared by the bot and relay scripts.
+
+Lines are queued by callers and written by a single background thread that
+keeps the file open in append mode, flushes periodically, and rotates the
+file by size and age (path -> path.1 -> path.2 ...).
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+DEFAULT_BACKUPS = 5
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+_STOP = object()
+
+
+class LogSink:
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE,
+        backups: int = DEFAULT_BACKUPS,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue()
+        self._fp = None
+        self._opened_at = 0.0
+        self._bytes = 0
+        # Guards the closed/stopped handoff: once the writer thread has stopped,
+        # callers write through _write_line themselves, one at a time.
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=f"log-sink:{self.path.name}", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str) -> None:
+        if not line.endswith("\n"):
+            line += "\n"
+        with self._lock:
+            if not self._stopped:
+                self._queue.put(line)
+                return
+            # Late writers after close() still land on disk, synchronously.
+            try:
+                self._write_line(line)
+                self._fp.flush()
+            except Exception:
+                pass
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every line queued before this call is on disk."""
+        done = threading.Event()
+        with self._lock:
+            if self._stopped:
+                return True
+            self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fp = self.path.open("a", encoding="utf-8")
+        self._opened_at = time.time()
+        self._bytes = os.path.getsize(self.path)
+
+    def _write_line(self, line: str) -> None:
+        if self._fp is None:
+            self._open()
+        self._fp.write(line)
+        # Counted rather than read back with tell(), which flushes the text buffer.
+        self._bytes += len(line.encode("utf-8")) + (line.count("\n") * (len(os.linesep) - 1))
+        if self._should_rotate():
+            self._rotate()
+
+    def _should_rotate(self) -> bool:
+        if self._fp is None:
+            return False
+        if self.max_bytes and self._bytes >= self.max_bytes:
+            return True
+        if self.max_age and (time.time() - self._opened_at) >= self.max_age and self._bytes > 0:
+            return True
+        return False
+
+    def _rotate(self) -> None:
+        self._fp.close()
+        self._fp = None
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                src = self.path.with_name(f"{self.path.name}.{i}")
+                if src.exists():
+                    os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._open()
+
+    def _run(self) -> None:
+        self._open()
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            batch = [] if item is None else [item]
+            # Drain whatever else is already queued so a burst costs one write.
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            waiters = []
+            stop = False
+            for entry in batch:
+                if entry is _STOP:
+                    stop = True
+                elif isinstance(entry, threading.Event):
+                    waiters.append(entry)
+                else:
+                    try:
+                        self._write_line(entry)
+                    except Exception:
+                        pass
+            now = time.monotonic()
+            if waiters or stop or now - last_flush >= self.flush_interval:
+                try:
+                    self._fp.flush()
+                    if self._should_rotate():
+                        self._rotate()
+                except Exception:
+                    pass
+                last_flush = now
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                self._stop()
+                return
+
+    def _stop(self) -> None:
+        # close() queued _STOP under the lock, so anything queued after it raced
+        # the handoff; write it out before late writers take over.
+        with self._lock:
+            while True:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(entry, threading.Event):
+                    entry.set()
+                elif entry is not _STOP:
+                    try:
+                        self._write_line(entry)
+                    except Exception:
+                        pass
+            try:
+                self._fp.flush()
+            except Exception:
+                pass
+            self._stopped = True
+
+
+_SINKS: Dict[str, LogSink] = {}
+_SINKS_LOCK = threading.Lock()
+
+
+def get_sink(path: Path, **kwargs) -> LogSink:
+    """Return the process-wide sink for `path`, creating it on first use."""
+    key = str(Path(path).resolve())
+    with _SINKS_LOCK:
+        sink = _SINKS.get(key)
+        if sink is None:
+            sink = LogSink(Path(path), **kwargs)
+            _SINKS[key] = sink
+        return sink
+
+
+def close_all() -> None:
+    with _SINKS_LOCK:
+        sinks = list(_SINKS.values())
+    for sink in sinks:
+        sink.close()
+
+
+atexit.register(close_all)
@@ -1,12 +1,22 @@
 #!/usr/bin/env python
 """
 Merge per-repo SQLite indexes into a single unified DB.
+
+Chunk text is content-addressed (chunk_blobs, shared with crawl_repo.py), so
+a vendored file or config copied across repos is stored once, and a re-merge
+only inserts blobs the unified DB does not already have.
+
+The chunk_fts search index (search_index.py) is built on first merge and kept
+current afterwards by its triggers on chunk_blobs.
 """
 
 import argparse
 import sqlite3
 from pathlib import Path
 
+from crawl_repo import chunk_hash, ensure_chunk_store, gc_blobs, intern_blob
+from search_index import TOKENIZERS, ensure_search_index
+
 
 def init_db(db_path: Path):
     conn = sqlite3.connect(db_path)
@@ -32,23 +42,32 @@ def init_db(db_path: Path):
             indexed_at INTEGER,
             UNIQUE(repo_name, rel_path)
         );
-        CREATE TABLE IF NOT EXISTS repo_chunks (
-            id INTEGER PRIMARY KEY,
-            file_id INTEGER,
-            chunk_index INTEGER,
-            start_char INTEGER,
-            end_char INTEGER,
-            content TEXT,
-            FOREIGN KEY(file_id) REFERENCES repo_files(id)
-        );
         CREATE INDEX IF NOT EXISTS idx_files_repo ON repo_files(repo_name);
         CREATE INDEX IF NOT EXISTS idx_files_repo_path ON repo_files(repo_name, rel_path);
-        CREATE INDEX IF NOT EXISTS idx_chunks_file ON repo_chunks(file_id);
         """
     )
+    ensure_chunk_store(conn)
     return conn
 
 
+def source_chunks(src: sqlite3.Connection):
+    """(file_id, chunk_index, start_char, end_char, hash, content) from either source layout."""
+    tables = {row[0] for row in src.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "chunk_blobs" in tables:
+        yield from src.execute(
+            """
+            SELECT c.file_id, c.chunk_index, c.start_char, c.end_char, b.hash, b.content
+            FROM repo_chunks c JOIN chunk_blobs b ON b.id = c.blob_id
+            """
+        )
+        return
+    # Index written before chunk_blobs existed: content is inline.
+    for file_id, chunk_index, start, end, content in src.execute(
+        "SELECT file_id, chunk_index, start_char, end_char, content FROM repo_chunks"
+    ):
+        yield file_id, chunk_index, start, end, chunk_hash(content), content
+
+
 def repo_name_from_file(path: Path):
     name = path.stem  # repo_xxx or repo_index
     if name == "repo_index":
@@ -74,10 +93,6 @@ def merge_db(dest: sqlite3.Connection, source_path: Path):
         (repo_name, str(source_path)),
     )
 
-    # Prepare statements
-    insert_file = dest.cursor()
-    insert_chunk = dest.cursor()
-
     file_id_map = {}
 
     for row in src.execute("SELECT * FROM repo_files"):
@@ -113,34 +128,56 @@ def merge_db(dest: sqlite3.Connection, source_path: Path):
         new_id = cur.fetchone()[0]
         file_id_map[row["id"]] = new_id
 
-    # Replace chunks for files in this repo
+    # Replace chunk refs for files in this repo; blob content is only written when new.
     dest.execute("DELETE FROM repo_chunks WHERE file_id IN (SELECT id FROM repo_files WHERE repo_name = ?)", (repo_name,))
-    for row in src.execute("SELECT * FROM repo_chunks"):
-        new_file_id = file_id_map.get(row["file_id"])
+    refs = []
+    new_blobs = 0
+    for file_id, chunk_index, start, end, digest, content in source_chunks(src):
+        new_file_id = file_id_map.get(file_id)
         if not new_file_id:
             continue
-        insert_chunk.execute(
-            """
-            INSERT INTO repo_chunks (file_id, chunk_index, start_char, end_char, content)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (
-                new_file_id,
-                row["chunk_index"],
-                row["start_char"],
-                row["end_char"],
-                row["content"],
-            ),
-        )
+        blob_id, inserted = intern_blob(dest, digest, content or "")
+        new_blobs += inserted
+        refs.append((new_file_id, chunk_index, start, end, blob_id))
+    dest.executemany(
+        """
+        INSERT INTO repo_chunks (file_id, chunk_index, start_char, end_char, blob_id)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        refs,
+    )
 
     dest.commit()
     src.close()
+    return len(refs), new_blobs
+
+
+def dedup_stats(conn: sqlite3.Connection) -> dict:
+    """Chunk refs vs distinct blobs, and bytes that inline storage would have used."""
+    refs, logical = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(b.size), 0) FROM repo_chunks c JOIN chunk_blobs b ON b.id = c.blob_id"
+    ).fetchone()
+    blobs, stored = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM chunk_blobs").fetchone()
+    return {
+        "chunks": refs,
+        "blobs": blobs,
+        "ratio": refs / blobs if blobs else 1.0,
+        "logical_bytes": logical,
+        "stored_bytes": stored,
+        "bytes_saved": logical - stored,
+    }
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--input-dir", required=True, help="Directory with repo_*.sqlite files")
     parser.add_argument("--output", required=True, help="Unified SQLite output path")
+    parser.add_argument(
+        "--fts",
+        choices=sorted(TOKENIZERS) + ["none"],
+        default="unicode61",
+        help="Tokenizer for the search index if the output has none yet (none: skip)",
+    )
     args = parser.parse_args()
 
     input_dir = Path(args.input_dir)
@@ -148,17 +185,28 @@ def main():
 
     dest = init_db(output)
 
-    sources = sorted(input_dir.glob("repo_*.sqlite"))
+    # The output usually lives in the input dir (repo_unified.sqlite); never merge it into itself.
+    sources = [p for p in sorted(input_dir.glob("repo_*.sqlite")) if p.resolve() != output.resolve()]
     # Include repo_index.sqlite (jcw_payroll)
     index_path = input_dir / "repo_index.sqlite"
     if index_path.exists():
         sources = [index_path] + sources
 
+    new_blobs = 0
     for src in sources:
-        merge_db(dest, src)
-
+        new_blobs += merge_db(dest, src)[1]
+    gc_blobs(dest)
+    dest.commit()
+    # Built once from the merged blobs (cheaper than per-row triggers on a fresh DB).
+    if args.fts != "none":
+        ensure_search_index(dest, args.fts)
+    stats = dedup_stats(dest)
     dest.close()
     print(f"Merged {len(sources)} sources into {output}")
+    print(
+        f"Chunks: {stats['chunks']} refs -> {stats['blobs']} blobs ({new_blobs} new this run), "
+        f"dedup ratio {stats['ratio']:.2f}x, {stats['bytes_saved'] / 1e6:.1f} MB saved"
+    )
 
 
 if __name__ == "__main__":
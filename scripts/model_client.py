@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+"""
+Shared OpenAI client for the bot, relay and code-mode scripts.
+
+Holds one process-wide client with a pooled, keep-alive HTTP transport
+instead of building a new `OpenAI(...)` per call, and records latency and
+token usage for every call. Point MODEL_BASE_URL at a local stub
+(scripts/stub_model_server.py) to exercise the request path offline.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import httpx
+except Exception:  # pragma: no cover - optional dependency
+    httpx = None
+try:
+    from openai import AsyncOpenAI, OpenAI
+except Exception:  # pragma: no cover - optional dependency
+    OpenAI = None
+    AsyncOpenAI = None
+
+from log_sink import get_sink
+
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "").strip()
+MODEL_BASE_URL = (os.environ.get("MODEL_BASE_URL") or os.environ.get("OPENAI_BASE_URL") or "").strip()
+MODEL_TIMEOUT = float(os.environ.get("MODEL_TIMEOUT", "120"))
+MODEL_MAX_RETRIES = int(os.environ.get("MODEL_MAX_RETRIES", "2"))
+MODEL_MAX_CONNECTIONS = int(os.environ.get("MODEL_MAX_CONNECTIONS", "20"))
+MODEL_KEEPALIVE_EXPIRY = float(os.environ.get("MODEL_KEEPALIVE_EXPIRY", "60"))
+MODEL_CALLS_LOG = os.environ.get("MODEL_CALLS_LOG", "").strip()
+
+
+@dataclass
+class CallRecord:
+    ts: str
+    caller: str
+    model: str
+    ok: bool
+    latency_ms: int
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    error: str = ""
+
+
+_lock = threading.Lock()
+_client = None
+_async_clients: Dict[int, object] = {}
+_calls_log: Optional[Path] = Path(MODEL_CALLS_LOG) if MODEL_CALLS_LOG else None
+_listeners: List[Callable[[CallRecord], None]] = []
+_totals = {"calls": 0, "errors": 0, "latency_ms": 0, "prompt_tokens": 0, "output_tokens": 0}
+
+
+def configure(calls_log: Optional[Path] = None, listener: Optional[Callable[[CallRecord], None]] = None) -> None:
+    """Set where call records go. Call once at startup, before the first request."""
+    global _calls_log
+    if calls_log is not None and not MODEL_CALLS_LOG:
+        _calls_log = Path(calls_log)
+    if listener is not None:
+        _listeners.append(listener)
+
+
+def missing_reason() -> str:
+    """Human-readable reason no client can be built, or "" when ready."""
+    if OpenAI is None:
+        return "openai package not installed."
+    if not OPENAI_API_KEY and not MODEL_BASE_URL:
+        return "OPENAI_API_KEY is not set."
+    return ""
+
+
+def _client_kwargs() -> dict:
+    kwargs = {
+        # Local stubs don't check the key, but the SDK insists on one.
+        "api_key": OPENAI_API_KEY or "stub",
+        "timeout": MODEL_TIMEOUT,
+        "max_retries": MODEL_MAX_RETRIES,
+    }
+    if MODEL_BASE_URL:
+        kwargs["base_url"] = MODEL_BASE_URL
+    return kwargs
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=MODEL_MAX_CONNECTIONS,
+        max_keepalive_connections=MODEL_MAX_CONNECTIONS,
+        keepalive_expiry=MODEL_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_client():
+    global _client
+    with _lock:
+        if _client is None:
+            kwargs = _client_kwargs()
+            if httpx is not None:
+                kwargs["http_client"] = httpx.Client(limits=_limits(), timeout=MODEL_TIMEOUT)
+            _client = OpenAI(**kwargs)
+        return _client
+
+
+def get_async_client():
+    # httpx.AsyncClient is bound to the loop it first runs on, so keep one per loop.
+    loop_id = id(asyncio.get_running_loop())
+    with _lock:
+        client = _async_clients.get(loop_id)
+        if client is None:
+            kwargs = _client_kwargs()
+            if httpx is not None:
+                kwargs["http_client"] = httpx.AsyncClient(limits=_limits(), timeout=MODEL_TIMEOUT)
+            client = AsyncOpenAI(**kwargs)
+            _async_clients[loop_id] = client
+        return client
+
+
+def usage_tokens(response) -> Tuple[int, int, int]:
+    """(prompt, output, total) tokens from a Responses or Chat Completions usage block."""
+    usage = getattr(response, "usage", None)
+    if not usage:
+        return (0, 0, 0)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    output_tokens = getattr(usage, "output_tokens", None)
+    total_tokens = getattr(usage, "total_tokens", None)
+    # Newer Responses API fields
+    if prompt_tokens is None:
+        prompt_tokens = getattr(usage, "input_tokens", None)
+    if output_tokens is None:
+        output_tokens = getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens_total", None)
+    if total_tokens is None and prompt_tokens is not None and output_tokens is not None:
+        total_tokens = prompt_tokens + output_tokens
+    return (prompt_tokens or 0, output_tokens or 0, total_tokens or 0)
+
+
+def _record(caller: str, model: str, start: float, response=None, error: str = "") -> CallRecord:
+    prompt_tokens, output_tokens, total_tokens = usage_tokens(response) if response is not None else (0, 0, 0)
+    record = CallRecord(
+        ts=datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        caller=caller,
+        model=model,
+        ok=not error,
+        latency_ms=int((time.monotonic() - start) * 1000),
+        prompt_tokens=prompt_tokens,
+        output_tokens=output_tokens,
+        total_tokens=total_tokens,
+        error=error[:300],
+    )
+    with _lock:
+        _totals["calls"] += 1
+        _totals["errors"] += 0 if record.ok else 1
+        _totals["latency_ms"] += record.latency_ms
+        _totals["prompt_tokens"] += record.prompt_tokens
+        _totals["output_tokens"] += record.output_tokens
+    if _calls_log is not None:
+        get_sink(_calls_log).write(json.dumps(asdict(record)))
+    for listener in _listeners:
+        try:
+            listener(record)
+        except Exception:
+            pass
+    return record
+
+
+def create_response(model: str, input: list, caller: str = "", **kwargs):
+    """Blocking Responses API call on the shared client. Returns (response, CallRecord)."""
+    start = time.monotonic()
+    try:
+        response = get_client().responses.create(model=model, input=input, **kwargs)
+    except Exception as exc:
+        _record(caller, model, start, error=str(exc))
+        raise
+    return response, _record(caller, model, start, response=response)
+
+
+async def acreate_response(model: str, input: list, caller: str = "", **kwargs):
+    """Async twin of create_response for asyncio callers and load tests."""
+    start = time.monotonic()
+    try:
+        response = await get_async_client().responses.create(model=model, input=input, **kwargs)
+    except Exception as exc:
+        _record(caller, model, start, error=str(exc))
+        raise
+    return response, _record(caller, model, start, response=response)
+
+
+def output_text(response) -> str:
+    return (getattr(response, "output_text", "") or "").strip()
+
+
+def stats() -> dict:
+    with _lock:
+        calls = _totals["calls"]
+        return {
+            **_totals,
+            "avg_latency_ms": int(_totals["latency_ms"] / calls) if calls else 0,
+            "base_url": MODEL_BASE_URL or "default",
+        }
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""
+Warm OpenClaw worker pool.
+
+Keeps N long-lived agent processes running and talks to each one with a
+line-delimited JSON protocol over stdin/stdout:
+
+    request:  {"id": "<id>", "message": "<prompt>", "thinking": "low"}
+    response: {"id": "<id>", "ok": true, "output": "<text>"}
+              {"id": "<id>", "ok": false, "error": "<text>"}
+
+A worker that crashes is restarted on next use. A worker that misses its
+per-request deadline is killed and replaced; the rest of the pool keeps
+serving.
+"""
+
+import json
+import queue
+import subprocess
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+
+class OpenClawError(Exception):
+    pass
+
+
+class OpenClawTimeout(OpenClawError):
+    pass
+
+
+_EOF = object()
+
+
+class OpenClawWorker:
+    def __init__(self, cmd: List[str], name: str):
+        self.cmd = cmd
+        self.name = name
+        self.proc: Optional[subprocess.Popen] = None
+        self.restarts = -1
+        self._lines: "queue.Queue" = queue.Queue()
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self) -> None:
+        self.stop()
+        self._lines = queue.Queue()
+        self.proc = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self.restarts += 1
+        reader = threading.Thread(target=self._read, args=(self.proc, self._lines), daemon=True)
+        reader.start()
+
+    def stop(self) -> None:
+        if self.proc is None:
+            return
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+        self.proc = None
+
+    @staticmethod
+    def _read(proc: subprocess.Popen, lines: "queue.Queue") -> None:
+        for line in proc.stdout:
+            lines.put(line)
+        lines.put(_EOF)
+
+    def request(self, message: str, timeout: float, thinking: str = "low") -> str:
+        if not self.alive():
+            self.start()
+        req_id = uuid.uuid4().hex
+        try:
+            self.proc.stdin.write(json.dumps({"id": req_id, "message": message, "thinking": thinking}) + "\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as exc:
+            self.stop()
+            raise OpenClawError(f"worker {self.name} pipe closed: {exc}")
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.stop()
+                raise OpenClawTimeout(f"openclaw timed out after {timeout:.0f} seconds")
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is _EOF:
+                self.stop()
+                raise OpenClawError(f"worker {self.name} exited")
+            try:
+                data = json.loads(line)
+            except ValueError:
+                continue  # stray log output from the agent
+            if data.get("id") != req_id:
+                continue  # late reply to an earlier, abandoned request
+            if not data.get("ok", False):
+                raise OpenClawError(data.get("error") or "unknown error")
+            return (data.get("output") or "").strip()
+
+
+class OpenClawPool:
+    def __init__(self, cmd: List[str], size: int = 2, timeout: float = 60.0):
+        self.cmd = cmd
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._workers = [OpenClawWorker(cmd, f"openclaw-{i}") for i in range(self.size)]
+        self._idle: "queue.Queue" = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def start(self) -> None:
+        """Spawn every worker up front so the first requests don't pay startup."""
+        for worker in self._workers:
+            if not worker.alive():
+                worker.start()
+
+    def request(self, message: str, timeout: Optional[float] = None, thinking: str = "low") -> str:
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise OpenClawTimeout(f"no openclaw worker free after {timeout:.0f} seconds")
+        try:
+            remaining = max(0.1, timeout - (time.monotonic() - start))
+            return worker.request(message, remaining, thinking=thinking)
+        finally:
+            self._idle.put(worker)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "alive": sum(1 for w in self._workers if w.alive()),
+            "restarts": sum(max(0, w.restarts) for w in self._workers),
+        }
+
+    def close(self) -> None:
+        for worker in self._workers:
+            worker.stop()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Write-behind queue for relay message appends.
+
+Appends are queued and shipped to /relay/batch by one background thread,
+several at a time, so the bot's hot path never waits on the relay to store a
+message. Callers that need an up-to-date tail take their pending messages
+out of the queue with `take()` and send them alongside the context request.
+
+A relay that predates /relay/batch answers it with 404; batches then go out
+one message at a time to /relay/message, and /relay/batch is probed again
+every LEGACY_RECHECK seconds in case the relay was upgraded.
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+LEGACY_RECHECK = 300.0
+
+
+class RelayWriteBehind:
+    def __init__(
+        self,
+        request: Callable[[str, dict], Tuple[Optional[int], Optional[dict]]],
+        flush_interval: float = 0.05,
+        max_batch: int = 50,
+        on_error: Optional[Callable[[str], None]] = None,
+    ):
+        self.request = request
+        self.flush_interval = flush_interval
+        self.max_batch = max(1, max_batch)
+        self.on_error = on_error
+        self._pending: List[dict] = []
+        self._cond = threading.Condition()
+        self._in_flight: List[dict] = []
+        self._legacy_until = 0.0
+        self._closed = False
+        self._sent = 0
+        self._batches = 0
+        self._dropped = 0
+        self._thread = threading.Thread(target=self._run, name="relay-write-behind", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, message: dict) -> None:
+        with self._cond:
+            self._pending.append(message)
+            self._cond.notify_all()
+
+    def requeue(self, messages: List[dict]) -> None:
+        """Put messages that never reached the relay back at the front of the queue."""
+        if not messages:
+            return
+        with self._cond:
+            self._pending[:0] = messages
+            self._cond.notify_all()
+
+    def record_dropped(self, count: int) -> None:
+        """Count (and report) messages a caller gave up on outside the writer thread."""
+        self._record(0, count)
+
+    def take(self, match: Callable[[dict], bool], timeout: float = 10.0) -> List[dict]:
+        """Remove and return pending messages for which `match` is true, in order.
+
+        Waits (up to `timeout`) for an in-flight batch holding a matching
+        message, so the caller's next request cannot overtake it at the relay.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while any(match(m) for m in self._in_flight):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            taken = [m for m in self._pending if match(m)]
+            if taken:
+                self._pending = [m for m in self._pending if not match(m)]
+            return taken
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # Give a burst a moment to accumulate into one request.
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+                self._in_flight = batch
+            self._send(batch)
+            with self._cond:
+                self._in_flight = []
+                self._cond.notify_all()
+
+    def _send(self, batch: List[dict]) -> None:
+        if time.monotonic() >= self._legacy_until:
+            status, body = self._request("/relay/batch", {"messages": batch})
+            if status == 200 and body and body.get("ok"):
+                self._record(len(batch), 0, batches=1)
+                return
+            if status != 404:
+                # Unreachable or failed mid-request: the relay may have stored
+                # part of the batch, so resending could duplicate messages.
+                self._record(0, len(batch))
+                return
+            self._legacy_until = time.monotonic() + LEGACY_RECHECK
+        sent = 0
+        for message in batch:
+            status, body = self._request("/relay/message", message)
+            if status != 200 or not (body and body.get("ok")):
+                break
+            sent += 1
+        self._record(sent, len(batch) - sent, batches=1 if sent else 0)
+
+    def _request(self, path: str, payload: dict) -> Tuple[Optional[int], Optional[dict]]:
+        try:
+            return self.request(path, payload)
+        except Exception:
+            return None, None
+
+    def _record(self, sent: int, dropped: int, batches: int = 0) -> None:
+        with self._cond:
+            self._sent += sent
+            self._batches += batches
+            self._dropped += dropped
+        if dropped and self.on_error:
+            self.on_error(f"relay write-behind dropped {dropped} messages")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far has been sent (or dropped)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "pending": len(self._pending) + len(self._in_flight),
+                "sent": self._sent,
+                "batches": self._batches,
+                "dropped": self._dropped,
+            }
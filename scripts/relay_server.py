@@ -2,29 +2,71 @@
 """
 Relay server for Slack chat context.
 Stores per-channel message logs and optional summaries.
+
+Storage is pluggable (see relay_store.py): RELAY_BACKEND=jsonl keeps the
+per-key files in RELAY_DIR, RELAY_BACKEND=sqlite uses one WAL database.
+    python scripts/relay_server.py --migrate-jsonl   # copy JSONL logs into SQLite
+    python scripts/relay_server.py --compact         # prune folded/expired messages
 """
 
+import argparse
 import json
 import os
-from datetime import datetime
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import urlparse
 
-try:
-    from openai import OpenAI
-except Exception:  # pragma: no cover
-    OpenAI = None
+import model_client
+from relay_store import JsonlStore, SqliteStore, _now, migrate_jsonl, parse_retention
 
 
 RELAY_DIR = Path(os.environ.get("RELAY_DATA_DIR", "/opt/agent-ops/agent_outputs/relay"))
 RELAY_DIR.mkdir(parents=True, exist_ok=True)
-OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "").strip()
 RELAY_MODEL = os.environ.get("RELAY_MODEL", "gpt-4o-mini").strip()
-
-
-def _now():
-    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+RELAY_BACKEND = os.environ.get("RELAY_BACKEND", "jsonl").strip().lower()
+RELAY_DB = Path(os.environ.get("RELAY_DB", str(RELAY_DIR / "relay.sqlite")))
+RELAY_INDEX_ENABLED = os.environ.get("RELAY_INDEX", "true").strip().lower() in {"1", "true", "yes"}
+RELAY_BATCH_MS = float(os.environ.get("RELAY_SQLITE_BATCH_MS", "5"))
+RELAY_READERS = int(os.environ.get("RELAY_SQLITE_READERS", "4"))
+RELAY_RETENTION = int(os.environ.get("RELAY_RETENTION", "0"))
+RELAY_RETENTION_KEYS = parse_retention(os.environ.get("RELAY_RETENTION_KEYS", ""))
+RELAY_COMPACT_KEEP = int(os.environ.get("RELAY_COMPACT_KEEP", "200"))
+RELAY_COMPACT_INTERVAL = int(os.environ.get("RELAY_COMPACT_INTERVAL", "3600"))
+SUMMARY_EVERY = int(os.environ.get("RELAY_SUMMARY_EVERY", "20"))
+SUMMARY_MAX_AGE = int(os.environ.get("RELAY_SUMMARY_MAX_AGE", "600"))
+SUMMARY_MAX_BATCH = int(os.environ.get("RELAY_SUMMARY_MAX_BATCH", "120"))
+
+
+def _open_store(backend: str = RELAY_BACKEND):
+    if backend == "sqlite":
+        return SqliteStore(
+            RELAY_DB,
+            batch_ms=RELAY_BATCH_MS,
+            retention=RELAY_RETENTION,
+            retention_overrides=RELAY_RETENTION_KEYS,
+            compact_keep=RELAY_COMPACT_KEEP,
+            readers=RELAY_READERS,
+        )
+    return JsonlStore(RELAY_DIR, index_enabled=RELAY_INDEX_ENABLED)
+
+
+STORE = _open_store()
+
+_SUMMARY_LOCKS: dict = {}
+_SUMMARY_LOCKS_GUARD = threading.Lock()
+
+
+def _summary_lock(key: str) -> threading.RLock:
+    # Held across the model call, so it must not be the store's append lock.
+    with _SUMMARY_LOCKS_GUARD:
+        lock = _SUMMARY_LOCKS.get(key)
+        if lock is None:
+            lock = threading.RLock()
+            _SUMMARY_LOCKS[key] = lock
+        return lock
 
 
 def _key(channel_type: str, channel_id: str, user_id: str) -> str:
@@ -33,76 +75,178 @@ def _key(channel_type: str, channel_id: str, user_id: str) -> str:
     return f"channel_{channel_id}"
 
 
-def _log_path(key: str) -> Path:
-    return RELAY_DIR / f"{key}.jsonl"
-
-
-def _summary_path(key: str) -> Path:
-    return RELAY_DIR / f"{key}.summary.md"
+def _append_message(key: str, role: str, text: str, user_id: str | None) -> int:
+    return STORE.append(key, role, text, user_id)
 
 
-def _append_message(key: str, role: str, text: str, user_id: str | None):
-    record = {
-        "ts": _now(),
-        "role": role,
-        "user_id": user_id,
-        "text": text,
-    }
-    path = _log_path(key)
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+def _read_tail(key: str, limit: int = 40) -> list:
+    return STORE.tail(key, limit)
 
 
-def _read_tail(key: str, limit: int = 40) -> list:
-    path = _log_path(key)
-    if not path.exists():
-        return []
-    lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
-    tail = lines[-limit:]
-    out = []
-    for line in tail:
-        try:
-            out.append(json.loads(line))
-        except Exception:
-            continue
-    return out
+def _record_count(key: str) -> int:
+    return STORE.count(key)
 
 
-def _read_summary(key: str) -> str:
-    path = _summary_path(key)
-    if not path.exists():
-        return ""
-    return path.read_text(encoding="utf-8", errors="ignore").strip()
+def _read_range(key: str, start: int, limit: int) -> list:
+    return STORE.read_range(key, start, limit)
 
 
-def _write_summary(key: str, text: str):
-    path = _summary_path(key)
-    path.write_text(text.strip() + "\n", encoding="utf-8")
+def _read_record(key: str, n: int):
+    rows = _read_range(key, n, 1)
+    return rows[0] if rows else None
 
 
-def _summarize(key: str, tail: list) -> str:
-    if not OPENAI_API_KEY or OpenAI is None:
+def _summarize(key: str, tail: list, previous: str = "") -> str:
+    if model_client.missing_reason():
         return ""
     if not tail:
         return ""
-    client = OpenAI(api_key=OPENAI_API_KEY)
     content = "\n".join([f"{row.get('role')}: {row.get('text')}" for row in tail])
     prompt = (
         "Summarize the conversation briefly for context. "
         "Keep to 8 bullet points max. Focus on decisions, tasks, and pending questions."
     )
-    response = client.responses.create(
+    if previous:
+        prompt = (
+            "Update the running conversation summary with the new messages. "
+            "Keep to 8 bullet points max. Focus on decisions, tasks, and pending questions; "
+            "drop items the new messages resolve.\n\n[Current summary]\n" + previous
+        )
+    response, _ = model_client.create_response(
         model=RELAY_MODEL,
         input=[
             {"role": "system", "content": prompt},
             {"role": "user", "content": content},
         ],
+        caller="relay.summary",
+    )
+    return model_client.output_text(response)
+
+
+def _refresh_summary(key: str) -> str:
+    """Fold messages past the watermark into the rolling summary; returns the summary."""
+    with _summary_lock(key):
+        return _fold_new_messages(key)
+
+
+def _fold_new_messages(key: str) -> str:
+    previous, state = STORE.read_summary(key)
+    watermark = int(state.get("watermark") or 0)
+    count = _record_count(key)
+    if count < watermark:
+        # Log was rotated or replaced: start over from what is left.
+        watermark, previous = 0, ""
+    if count == watermark:
+        return previous
+    # A long backlog (first run, or the relay was down) folds only its newest slice.
+    start = max(watermark, count - SUMMARY_MAX_BATCH)
+    rows = _read_range(key, start, count - start)
+    summary = _summarize(key, rows, previous=previous)
+    if not summary:
+        return previous
+    STORE.save_summary(key, summary, count)
+    return summary
+
+
+def _summary_due(key: str) -> bool:
+    _, state = STORE.read_summary(key)
+    pending = _record_count(key) - int(state.get("watermark") or 0)
+    if pending <= 0:
+        return False
+    if pending >= SUMMARY_EVERY:
+        return True
+    return time.time() - float(state.get("updated_at") or 0) >= SUMMARY_MAX_AGE
+
+
+class SummaryWorker:
+    """Single background thread that refreshes rolling summaries off the request path."""
+
+    def __init__(self):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="relay-summary", daemon=True)
+        self._thread.start()
+
+    def schedule(self, key: str) -> bool:
+        if model_client.missing_reason():
+            return False
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        self._queue.put(key)
+        return True
+
+    def maybe_schedule(self, key: str) -> bool:
+        return self.schedule(key) if _summary_due(key) else False
+
+    def _run(self):
+        while True:
+            key = self._queue.get()
+            with self._lock:
+                self._pending.discard(key)
+            try:
+                _refresh_summary(key)
+            except Exception as exc:
+                print(f"summary refresh failed for {key}: {exc}", flush=True)
+
+
+SUMMARIES = SummaryWorker()
+
+
+def _payload_key(payload: dict) -> str:
+    return _key(
+        (payload.get("channel_type") or "im").strip(),
+        (payload.get("channel_id") or "").strip(),
+        (payload.get("user_id") or "").strip(),
     )
-    return (getattr(response, "output_text", "") or "").strip()
+
+
+def _context(key: str, payload: dict) -> dict:
+    limit = int(payload.get("limit") or 40)
+    summarize = bool(payload.get("summarize"))
+    tail = _read_tail(key, limit=limit)
+    # Always answer from the cached summary; summarize=true only asks for a refresh.
+    summary, _ = STORE.read_summary(key)
+    refreshing = SUMMARIES.schedule(key) if summarize else SUMMARIES.maybe_schedule(key)
+    return {"key": key, "summary": summary, "tail": tail, "refreshing": refreshing}
+
+
+def _batch(payload: dict) -> dict:
+    """Append `messages` (in order, one store write) then answer `context` requests.
+
+    Appends land before the context reads, so a caller can flush its pending
+    messages and fetch the tail that includes them in a single round-trip.
+    """
+    results: list = []
+    rows = []
+    for item in payload.get("messages") or []:
+        text = (item.get("text") or "").strip()
+        if not text:
+            results.append({"ok": False, "error": "text required"})
+            continue
+        key = _payload_key(item)
+        rows.append((key, (item.get("role") or "user").strip(), text, (item.get("user_id") or "").strip()))
+        results.append({"ok": True, "key": key})
+    seqs = iter(STORE.append_many(rows) if rows else [])
+    for result in results:
+        if result["ok"]:
+            result["seq"] = next(seqs)
+    for key in {row[0] for row in rows}:
+        SUMMARIES.maybe_schedule(key)
+    contexts = [_context(_payload_key(item), item) for item in payload.get("context") or []]
+    return {"messages": results, "context": contexts}
 
 
 class RelayServer(BaseHTTPRequestHandler):
     server_version = "AgentOpsRelay/1.0"
+    # HTTP/1.1 keeps connections open between requests; every response sets Content-Length.
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without TCP_NODELAY a kept-alive
+    # client waits out its delayed ACK (~40ms) on every response.
+    disable_nagle_algorithm = True
+    timeout = 120
 
     def _send_json(self, data, status=200):
         payload = json.dumps(data).encode("utf-8")
@@ -125,17 +269,15 @@ class RelayServer(BaseHTTPRequestHandler):
     def do_GET(self):
         parsed = urlparse(self.path)
         if parsed.path == "/relay/health":
-            self._send_json({"ok": True, "time": _now(), "dir": str(RELAY_DIR)})
+            self._send_json({"ok": True, "time": _now(), "dir": str(RELAY_DIR), "backend": STORE.backend})
             return
         self._send_json({"error": "not found"}, status=404)
 
     def do_POST(self):
         parsed = urlparse(self.path)
         payload = self._read_json() or {}
-        channel_type = (payload.get("channel_type") or "im").strip()
-        channel_id = (payload.get("channel_id") or "").strip()
         user_id = (payload.get("user_id") or "").strip()
-        key = _key(channel_type, channel_id, user_id)
+        key = _payload_key(payload)
 
         if parsed.path == "/relay/message":
             role = (payload.get("role") or "user").strip()
@@ -143,40 +285,66 @@ class RelayServer(BaseHTTPRequestHandler):
             if not text:
                 self._send_json({"ok": False, "error": "text required"}, status=400)
                 return
-            _append_message(key, role, text, user_id)
-            self._send_json({"ok": True, "key": key})
+            seq = _append_message(key, role, text, user_id)
+            SUMMARIES.maybe_schedule(key)
+            self._send_json({"ok": True, "key": key, "seq": seq})
             return
 
         if parsed.path == "/relay/context":
-            limit = int(payload.get("limit") or 40)
-            summarize = bool(payload.get("summarize"))
-            tail = _read_tail(key, limit=limit)
-            summary = _read_summary(key)
-            if summarize:
-                summary = _summarize(key, tail)
-                if summary:
-                    _write_summary(key, summary)
-            self._send_json({"ok": True, "key": key, "summary": summary, "tail": tail})
+            self._send_json({"ok": True, **_context(key, payload)})
+            return
+
+        if parsed.path == "/relay/batch":
+            self._send_json({"ok": True, **_batch(payload)})
             return
 
         if parsed.path == "/relay/summary":
-            tail = _read_tail(key, limit=120)
-            summary = _summarize(key, tail)
-            if summary:
-                _write_summary(key, summary)
-            self._send_json({"ok": True, "summary": summary})
+            summary = _refresh_summary(key)
+            _, state = STORE.read_summary(key)
+            self._send_json({"ok": True, "summary": summary, "watermark": state.get("watermark", 0)})
             return
 
         self._send_json({"error": "not found"}, status=404)
 
 
+def _compact_loop(interval: int):
+    while True:
+        time.sleep(interval)
+        try:
+            pruned = STORE.compact()
+            if pruned:
+                print(f"relay compaction pruned {sum(pruned.values())} messages across {len(pruned)} keys", flush=True)
+        except Exception as exc:
+            print(f"relay compaction failed: {exc}", flush=True)
+
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--migrate-jsonl", action="store_true", help="Import RELAY_DIR/*.jsonl into the SQLite store and exit")
+    parser.add_argument("--compact", action="store_true", help="Run one compaction pass and exit")
+    args = parser.parse_args()
+
+    if args.migrate_jsonl:
+        dest = STORE if isinstance(STORE, SqliteStore) else _open_store("sqlite")
+        migrated = migrate_jsonl(JsonlStore(RELAY_DIR, index_enabled=RELAY_INDEX_ENABLED), dest)
+        for key, rows in migrated.items():
+            print(f"{key}: {rows} messages" if rows else f"{key}: already present, skipped")
+        print(f"migrated {sum(migrated.values())} messages into {RELAY_DB}")
+        return
+    if args.compact:
+        pruned = STORE.compact()
+        print(f"pruned {sum(pruned.values())} messages across {len(pruned)} keys")
+        return
+
+    if RELAY_COMPACT_INTERVAL > 0 and STORE.backend == "sqlite":
+        threading.Thread(target=_compact_loop, args=(RELAY_COMPACT_INTERVAL,), name="relay-compact", daemon=True).start()
     host = os.environ.get("RELAY_HOST", "127.0.0.1")
     port = int(os.environ.get("RELAY_PORT", "8092"))
-    server = HTTPServer((host, port), RelayServer)
-    print(f"Relay server running at http://{host}:{port}")
+    server = ThreadingHTTPServer((host, port), RelayServer)
+    server.daemon_threads = True
+    print(f"Relay server running at http://{host}:{port} ({STORE.backend} store)")
     server.serve_forever()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Storage backends for the relay server.
+
+- JsonlStore: one {key}.jsonl per conversation plus a {key}.idx offset
+  sidecar, {key}.summary.md and {key}.summary.json (the original layout).
+- SqliteStore: a single WAL-mode database with (key, seq) primary-key
+  access, group-committed appends, per-key retention and compaction of
+  messages already folded into summaries.
+
+Positions are 0-based sequence numbers per key. count(key) is the next
+sequence number, so a summary watermark of N means records [0, N) are folded.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+TAIL_BLOCK_SIZE = 64 * 1024
+_OFFSET = struct.Struct("<Q")
+
+
+def _now():
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+def parse_retention(raw: str) -> Dict[str, int]:
+    """"dm_U1=500;channel_C1=2000" -> {"dm_U1": 500, "channel_C1": 2000}."""
+    out: Dict[str, int] = {}
+    for entry in (raw or "").replace(",", ";").split(";"):
+        if "=" not in entry:
+            continue
+        key, value = entry.split("=", 1)
+        try:
+            out[key.strip()] = int(value.strip())
+        except ValueError:
+            continue
+    return out
+
+
+class _KeyLocks:
+    def __init__(self):
+        self._locks: Dict[str, threading.RLock] = {}
+        self._guard = threading.Lock()
+
+    def __call__(self, key: str) -> threading.RLock:
+        with self._guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = threading.RLock()
+                self._locks[key] = lock
+            return lock
+
+
+def _decode_lines(lines) -> list:
+    out = []
+    for line in lines:
+        try:
+            out.append(json.loads(line))
+        except Exception:
+            continue
+    return out
+
+
+def tail_lines(path: Path, limit: int, block_size: int = TAIL_BLOCK_SIZE) -> list:
+    """Last `limit` lines of `path`, reading backwards from EOF in fixed blocks."""
+    if limit <= 0:
+        return []
+    with path.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        # limit + 1 newlines guarantees `limit` complete lines after the first break.
+        while pos > 0 and buf.count(b"\n") <= limit:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    lines = buf.splitlines()
+    if pos > 0:
+        lines = lines[1:]  # first line is a partial record
+    return [line.decode("utf-8", errors="ignore") for line in lines[-limit:] if line.strip()]
+
+
+class JsonlStore:
+    backend = "jsonl"
+
+    def __init__(self, root: Path, index_enabled: bool = True):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_enabled = index_enabled
+        self.key_lock = _KeyLocks()
+
+    def log_path(self, key: str) -> Path:
+        return self.root / f"{key}.jsonl"
+
+    def summary_path(self, key: str) -> Path:
+        return self.root / f"{key}.summary.md"
+
+    def summary_state_path(self, key: str) -> Path:
+        return self.root / f"{key}.summary.json"
+
+    def index_path(self, key: str) -> Path:
+        # Sidecar of fixed-width byte offsets, one per record: record N starts at entry N.
+        return self.root / f"{key}.idx"
+
+    def keys(self) -> List[str]:
+        return sorted(p.stem for p in self.root.glob("*.jsonl"))
+
+    def append(self, key: str, role: str, text: str, user_id: Optional[str]) -> int:
+        record = {"ts": _now(), "role": role, "user_id": user_id, "text": text}
+        with self.key_lock(key):
+            count = self.sync_index(key) if self.index_enabled else 0
+            with self.log_path(key).open("ab") as f:
+                offset = f.tell()
+                f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            if self.index_enabled:
+                with self.index_path(key).open("ab") as idx:
+                    idx.write(_OFFSET.pack(offset))
+        return count
+
+    def append_many(self, rows: List[Tuple[str, str, str, Optional[str]]]) -> List[int]:
+        return [self.append(key, role, text, user_id) for key, role, text, user_id in rows]
+
+    def tail(self, key: str, limit: int) -> list:
+        path = self.log_path(key)
+        if not path.exists():
+            return []
+        return _decode_lines(tail_lines(path, limit))
+
+    def sync_index(self, key: str) -> int:
+        """Bring the offset index up to date with the log; returns the record count.
+
+        Only bytes past the last indexed record are scanned, so this is O(1) on
+        the hot path and O(file) once when an index is first built.
+        """
+        path = self.log_path(key)
+        idx_path = self.index_path(key)
+        with self.key_lock(key):
+            if not path.exists():
+                idx_path.unlink(missing_ok=True)
+                return 0
+            size = path.stat().st_size
+            count = idx_path.stat().st_size // _OFFSET.size if idx_path.exists() else 0
+            with path.open("rb") as log:
+                scan_from = 0
+                if count:
+                    with idx_path.open("rb") as idx:
+                        idx.seek((count - 1) * _OFFSET.size)
+                        last = _OFFSET.unpack(idx.read(_OFFSET.size))[0]
+                    if last >= size:
+                        # Log was truncated or replaced underneath us: rebuild.
+                        idx_path.unlink()
+                        count = 0
+                    else:
+                        log.seek(last)
+                        log.readline()
+                        scan_from = log.tell()
+                if scan_from >= size and count:
+                    return count
+                log.seek(scan_from)
+                new_offsets = []
+                pos = scan_from
+                for line in log:
+                    if line.endswith(b"\n"):
+                        if line.strip():
+                            new_offsets.append(pos)
+                        pos += len(line)
+            if new_offsets:
+                with idx_path.open("ab") as idx:
+                    idx.write(b"".join(_OFFSET.pack(o) for o in new_offsets))
+            return count + len(new_offsets)
+
+    def count(self, key: str) -> int:
+        return self.sync_index(key)
+
+    def read_range(self, key: str, start: int, limit: int) -> list:
+        """Records [start, start + limit) by position, via the offset index."""
+        count = self.count(key)
+        if start < 0:
+            start = max(0, count + start)
+        end = min(count, start + limit)
+        if start >= end:
+            return []
+        with self.index_path(key).open("rb") as idx:
+            idx.seek(start * _OFFSET.size)
+            first = _OFFSET.unpack(idx.read(_OFFSET.size))[0]
+        lines = []
+        with self.log_path(key).open("rb") as log:
+            log.seek(first)
+            while len(lines) < end - start:
+                line = log.readline()
+                if not line:
+                    break
+                if line.strip():
+                    lines.append(line.decode("utf-8", errors="ignore"))
+        return _decode_lines(lines)
+
+    def read_summary(self, key: str) -> Tuple[str, dict]:
+        path = self.summary_path(key)
+        text = path.read_text(encoding="utf-8", errors="ignore").strip() if path.exists() else ""
+        state = {"watermark": 0, "updated_at": 0}
+        state_path = self.summary_state_path(key)
+        if state_path.exists():
+            try:
+                state = json.loads(state_path.read_text(encoding="utf-8"))
+            except Exception:
+                pass
+        return text, state
+
+    def save_summary(self, key: str, text: str, watermark: int) -> None:
+        state = {"watermark": watermark, "updated_at": time.time(), "summarized_at": _now()}
+        with self.key_lock(key):
+            self.summary_path(key).write_text(text.strip() + "\n", encoding="utf-8")
+            state_path = self.summary_state_path(key)
+            tmp = state_path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp, state_path)
+
+    def compact(self) -> dict:
+        # Rewriting append-only JSONL in place would race readers; use the SQLite backend for retention.
+        return {}
+
+    def close(self) -> None:
+        pass
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS relay_messages (
+    key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    ts TEXT,
+    role TEXT,
+    user_id TEXT,
+    text TEXT,
+    PRIMARY KEY (key, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS relay_keys (
+    key TEXT PRIMARY KEY,
+    next_seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS relay_summaries (
+    key TEXT PRIMARY KEY,
+    summary TEXT,
+    watermark INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL,
+    summarized_at TEXT
+);
+"""
+
+
+class SqliteStore:
+    backend = "sqlite"
+
+    def __init__(
+        self,
+        db_path: Path,
+        batch_ms: float = 5.0,
+        retention: int = 0,
+        retention_overrides: Optional[Dict[str, int]] = None,
+        compact_keep: int = 200,
+        readers: int = 4,
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_ms = batch_ms
+        self.retention = retention
+        self.retention_overrides = retention_overrides or {}
+        self.compact_keep = compact_keep
+        # Bounded reader pool: ThreadingHTTPServer runs each client connection on
+        # a fresh thread, so per-thread connections would reopen on every client.
+        self.readers = max(1, readers)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._pool_lock = threading.Lock()
+        self._writes: "queue.Queue" = queue.Queue()
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        self._opened = 1
+        self._idle.put(conn)
+        self._writer = threading.Thread(target=self._write_loop, name="relay-sqlite-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("PRAGMA busy_timeout=30000;")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            grow = self._opened < self.readers
+            if grow:
+                self._opened += 1
+        if grow:
+            try:
+                return self._connect()
+            except Exception:
+                with self._pool_lock:
+                    self._opened -= 1
+                raise
+        return self._idle.get()
+
+    @contextmanager
+    def _reader(self):
+        """Check out a pooled connection for the block; waits when all are busy."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def keys(self) -> List[str]:
+        with self._reader() as conn:
+            return [row[0] for row in conn.execute("SELECT key FROM relay_keys ORDER BY key")]
+
+    def append(self, key: str, role: str, text: str, user_id: Optional[str]) -> int:
+        return self.append_many([(key, role, text, user_id)])[0]
+
+    def append_many(self, rows: List[Tuple[str, str, str, Optional[str]]]) -> List[int]:
+        """Queue rows for the writer and wait until they are committed; returns their seqs."""
+        done = threading.Event()
+        job = {"rows": rows, "done": done, "seqs": None, "error": None}
+        self._writes.put(job)
+        done.wait()
+        if job["error"]:
+            raise job["error"]
+        return job["seqs"]
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        while True:
+            jobs = [self._writes.get()]
+            # Group-commit: whatever arrives within the batch window shares one transaction.
+            deadline = time.monotonic() + self.batch_ms / 1000.0
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    jobs.append(self._writes.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    for job in jobs:
+                        job["seqs"] = [self._insert(conn, *row) for row in job["rows"]]
+            except Exception as exc:
+                for job in jobs:
+                    job["error"] = exc
+            for job in jobs:
+                job["done"].set()
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, key: str, role: str, text: str, user_id: Optional[str]) -> int:
+        conn.execute("INSERT OR IGNORE INTO relay_keys (key, next_seq) VALUES (?, 0)", (key,))
+        seq = conn.execute("SELECT next_seq FROM relay_keys WHERE key = ?", (key,)).fetchone()[0]
+        conn.execute(
+            "INSERT INTO relay_messages (key, seq, ts, role, user_id, text) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, seq, _now(), role, user_id, text),
+        )
+        conn.execute("UPDATE relay_keys SET next_seq = ? WHERE key = ?", (seq + 1, key))
+        return seq
+
+    @staticmethod
+    def _rows(cur) -> list:
+        return [{"ts": ts, "role": role, "user_id": user_id, "text": text} for ts, role, user_id, text in cur]
+
+    def tail(self, key: str, limit: int) -> list:
+        with self._reader() as conn:
+            cur = conn.execute(
+                "SELECT ts, role, user_id, text FROM relay_messages WHERE key = ? ORDER BY seq DESC LIMIT ?",
+                (key, limit),
+            )
+            return list(reversed(self._rows(cur)))
+
+    def count(self, key: str) -> int:
+        with self._reader() as conn:
+            row = conn.execute("SELECT next_seq FROM relay_keys WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def read_range(self, key: str, start: int, limit: int) -> list:
+        if start < 0:
+            start = max(0, self.count(key) + start)
+        with self._reader() as conn:
+            cur = conn.execute(
+                "SELECT ts, role, user_id, text FROM relay_messages WHERE key = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (key, start, start + limit),
+            )
+            return self._rows(cur)
+
+    def read_summary(self, key: str) -> Tuple[str, dict]:
+        with self._reader() as conn:
+            row = conn.execute(
+                "SELECT summary, watermark, updated_at, summarized_at FROM relay_summaries WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return "", {"watermark": 0, "updated_at": 0}
+        return (row[0] or "").strip(), {"watermark": row[1], "updated_at": row[2] or 0, "summarized_at": row[3]}
+
+    def save_summary(self, key: str, text: str, watermark: int) -> None:
+        with self._reader() as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO relay_summaries (key, summary, watermark, updated_at, summarized_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    summary=excluded.summary,
+                    watermark=excluded.watermark,
+                    updated_at=excluded.updated_at,
+                    summarized_at=excluded.summarized_at
+                """,
+                (key, text.strip(), watermark, time.time(), _now()),
+            )
+
+    def compact(self) -> dict:
+        """Prune per-key retention and messages already folded into summaries.
+
+        The newest `compact_keep` messages are always kept so /relay/context
+        still has a tail to return.
+        """
+        pruned: Dict[str, int] = {}
+        with self._reader() as conn, conn:
+            for key, next_seq, watermark in conn.execute(
+                """
+                SELECT k.key, k.next_seq, COALESCE(s.watermark, 0)
+                FROM relay_keys k LEFT JOIN relay_summaries s ON s.key = k.key
+                """
+            ).fetchall():
+                cutoff = min(watermark, next_seq - self.compact_keep)
+                retention = self.retention_overrides.get(key, self.retention)
+                if retention:
+                    cutoff = max(cutoff, next_seq - retention)
+                if cutoff <= 0:
+                    continue
+                cur = conn.execute("DELETE FROM relay_messages WHERE key = ? AND seq < ?", (key, cutoff))
+                if cur.rowcount:
+                    pruned[key] = cur.rowcount
+        return pruned
+
+    def import_key(self, key: str, records: list, summary: str = "", watermark: int = 0) -> int:
+        """Load a whole conversation (used by the JSONL migrator). Skips keys that already exist."""
+        with self._reader() as conn, conn:
+            if conn.execute("SELECT 1 FROM relay_keys WHERE key = ?", (key,)).fetchone():
+                return 0
+            conn.executemany(
+                "INSERT INTO relay_messages (key, seq, ts, role, user_id, text) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (key, seq, row.get("ts"), row.get("role"), row.get("user_id"), row.get("text"))
+                    for seq, row in enumerate(records)
+                ],
+            )
+            conn.execute("INSERT INTO relay_keys (key, next_seq) VALUES (?, ?)", (key, len(records)))
+            if summary:
+                conn.execute(
+                    "INSERT OR REPLACE INTO relay_summaries (key, summary, watermark, updated_at, summarized_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, summary, min(watermark, len(records)), time.time(), _now()),
+                )
+        return len(records)
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._pool_lock:
+                self._opened -= 1
+
+
+def migrate_jsonl(source: JsonlStore, dest: SqliteStore) -> dict:
+    """One-shot copy of every JSONL conversation (and its summary) into SQLite."""
+    migrated: Dict[str, int] = {}
+    for key in source.keys():
+        path = source.log_path(key)
+        records = _decode_lines(path.read_text(encoding="utf-8", errors="ignore").splitlines())
+        summary, state = source.read_summary(key)
+        # Pre-watermark summaries covered an unknown window; treat them as covering everything.
+        watermark = int(state.get("watermark") or (len(records) if summary else 0))
+        migrated[key] = dest.import_key(key, records, summary=summary, watermark=watermark)
+    return migrated
@@ -7,6 +7,8 @@ import argparse
 import sqlite3
 from pathlib import Path
 
+from merge_indexes import dedup_stats
+
 
 def main():
     parser = argparse.ArgumentParser()
@@ -23,6 +25,8 @@ def main():
     # Totals
     total_files = cur.execute("SELECT COUNT(*) FROM repo_files").fetchone()[0]
     total_chunks = cur.execute("SELECT COUNT(*) FROM repo_chunks").fetchone()[0]
+    has_blobs = cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chunk_blobs'").fetchone()
+    dedup = dedup_stats(conn) if has_blobs else None
 
     # By repo
     by_repo = cur.execute(
@@ -52,6 +56,12 @@ def main():
     lines.append("## Totals")
     lines.append(f"- Files indexed: {total_files}")
     lines.append(f"- Chunks indexed: {total_chunks}")
+    if dedup:
+        lines.append(f"- Distinct chunk blobs: {dedup['blobs']} (dedup ratio {dedup['ratio']:.2f}x)")
+        lines.append(
+            f"- Chunk text stored: {dedup['stored_bytes'] / 1e6:.1f} MB of {dedup['logical_bytes'] / 1e6:.1f} MB "
+            f"({dedup['bytes_saved'] / 1e6:.1f} MB saved)"
+        )
     lines.append("")
     lines.append("## Files by Repo")
     for repo, cnt in by_repo:
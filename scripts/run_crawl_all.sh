@@ -37,7 +37,12 @@ while IFS= read -r line || [ -n "$line" ]; do
   fi
 
   db="$outdir/repo_${name}.sqlite"
-  if python3 /opt/agent-ops/scripts/crawl_repo.py --root "$repo_path" --db "$db" --max-bytes "$MAX_BYTES"; then
+  # Start from the previous crawl so only new, changed and deleted files cost work.
+  prev="$OUT_ROOT/latest/repo_${name}.sqlite"
+  if [ -f "$prev" ]; then
+    cp "$prev" "$db"
+  fi
+  if python3 /opt/agent-ops/scripts/crawl_repo.py --root "$repo_path" --db "$db" --max-bytes "$MAX_BYTES" --incremental; then
     indexed=$((indexed+1))
   else
     echo "WARN: crawl failed for $repo" >&2
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+"""
+Full-text search over a repo index (crawl_repo.py or merge_indexes.py output).
+
+chunk_fts is an FTS5 external-content index over chunk_blobs: text is stored
+once in the blobs, the index holds tokens only, and triggers on chunk_blobs keep
+it current as crawls and merges intern or drop blobs. Blobs never change in
+place, so there is no update trigger. A hit on a blob fans out to every chunk
+that references it, so a file vendored into three repos shows up three times.
+
+Tokenizers:
+- unicode61 (default): word search; `get_credentials` matches the phrase "get credentials".
+- trigram: substring search on identifiers and punctuation (`Sheets(`, `.env`);
+  terms shorter than three characters never match. The index is ~3x larger.
+
+    python scripts/search_index.py --db repo_unified.sqlite build --tokenizer trigram
+    python scripts/search_index.py --db repo_unified.sqlite query "payroll export" --repo jcw_payroll
+    python scripts/search_index.py --db repo_unified.sqlite bench
+"""
+
+import argparse
+import json
+import random
+import re
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+
+TOKENIZERS = {
+    "unicode61": "unicode61 remove_diacritics 2",
+    "trigram": "trigram",
+}
+
+
+def index_tokenizer(conn: sqlite3.Connection):
+    """Tokenizer name chunk_fts was built with, or None if there is no index."""
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'chunk_fts'").fetchone()
+    if not row:
+        return None
+    return "trigram" if "trigram" in row[0] else "unicode61"
+
+
+def drop_search_index(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        DROP TRIGGER IF EXISTS chunk_fts_insert;
+        DROP TRIGGER IF EXISTS chunk_fts_delete;
+        DROP TABLE IF EXISTS chunk_fts;
+        """
+    )
+
+
+def ensure_search_index(conn: sqlite3.Connection, tokenizer: str = "unicode61", rebuild: bool = False) -> bool:
+    """Create chunk_fts and its triggers if missing; returns True when it (re)built the index.
+
+    An existing index keeps its tokenizer unless `rebuild` is set, so callers
+    that only want "an index" (merge_indexes.py) never throw one away.
+    """
+    current = index_tokenizer(conn)
+    if current and not rebuild:
+        return False
+    if current:
+        drop_search_index(conn)
+    conn.executescript(
+        f"""
+        CREATE VIRTUAL TABLE chunk_fts USING fts5(
+            content,
+            content='chunk_blobs', content_rowid='id',
+            tokenize='{TOKENIZERS[tokenizer]}'
+        );
+        CREATE TRIGGER chunk_fts_insert AFTER INSERT ON chunk_blobs BEGIN
+            INSERT INTO chunk_fts(rowid, content) VALUES (new.id, new.content);
+        END;
+        CREATE TRIGGER chunk_fts_delete AFTER DELETE ON chunk_blobs BEGIN
+            INSERT INTO chunk_fts(chunk_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END;
+        """
+    )
+    conn.execute("INSERT INTO chunk_fts(chunk_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO chunk_fts(chunk_fts) VALUES ('optimize')")
+    conn.commit()
+    return True
+
+
+def query_terms(text: str, tokenizer: str = "unicode61"):
+    """Search terms from free text: words for unicode61, whitespace-separated strings for trigram."""
+    if tokenizer == "trigram":
+        return [term for term in text.split() if len(term) >= 3]
+    return re.findall(r"\w+", text.lower())
+
+
+def fts_query(text: str, tokenizer: str = "unicode61") -> str:
+    """Turn free text into an FTS5 MATCH expression: every term must match.
+
+    Terms are quoted so code like `foo(bar)` or `a.b` cannot inject FTS syntax.
+    """
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query_terms(text, tokenizer))
+
+
+def first_match(content: str, terms) -> int:
+    """Offset of the earliest query term in a chunk, or -1. Case-insensitive."""
+    lowered = content.lower()
+    found = [pos for pos in (lowered.find(term.lower()) for term in terms) if pos >= 0]
+    return min(found) if found else -1
+
+
+def search(conn: sqlite3.Connection, text: str, limit: int = 20, repo: str = None, raw: bool = False,
+           snippet_tokens: int = 16) -> list:
+    """Ranked hits for `text`, best first.
+
+    Each hit is a dict with repo (None in a single-repo index), path, chunk_index,
+    start/end (the chunk's char range in the file), match (file char offset of
+    the first query term, or None), score (bm25, lower is better) and snippet,
+    with matched terms wrapped in [ ]. `raw` passes `text` through as FTS5 syntax.
+    """
+    tokenizer = index_tokenizer(conn)
+    if tokenizer is None:
+        raise RuntimeError("no search index; run: search_index.py --db <db> build")
+    match = text if raw else fts_query(text, tokenizer)
+    if not match:
+        return []
+    has_repo = any(row[1] == "repo_name" for row in conn.execute("PRAGMA table_info(repo_files)"))
+
+    # Two statements on purpose: joining chunk_blobs in the same statement as the
+    # MATCH makes SQLite rank every matching row the slow way (~10x on common terms).
+    repo_filter = ""
+    params = [snippet_tokens, match]
+    if repo:
+        if not has_repo:
+            raise ValueError("--repo needs a unified index (merge_indexes.py output)")
+        # Restrict inside the FTS query so the LIMIT applies to this repo's blobs only.
+        repo_filter = """
+              AND chunk_fts.rowid IN (
+                  SELECT c.blob_id FROM repo_chunks c JOIN repo_files f ON f.id = c.file_id
+                  WHERE f.repo_name = ?
+              )"""
+        params.append(repo)
+    ranked = conn.execute(
+        f"""
+        SELECT chunk_fts.rowid, bm25(chunk_fts) AS score, snippet(chunk_fts, 0, '[', ']', '…', ?)
+        FROM chunk_fts
+        WHERE chunk_fts MATCH ?{repo_filter}
+        ORDER BY score
+        LIMIT ?
+        """,
+        params + [limit],
+    ).fetchall()
+    if not ranked:
+        return []
+
+    blob_ids = [blob_id for blob_id, _, _ in ranked]
+    refs = {}
+    for blob_id, repo_name, path, chunk_index, start, end, content in conn.execute(
+        f"""
+        SELECT c.blob_id, {"f.repo_name" if has_repo else "NULL"}, f.rel_path, c.chunk_index,
+               c.start_char, c.end_char, b.content
+        FROM repo_chunks c
+        JOIN repo_files f ON f.id = c.file_id
+        JOIN chunk_blobs b ON b.id = c.blob_id
+        WHERE c.blob_id IN ({",".join("?" * len(blob_ids))})
+        """,
+        blob_ids,
+    ):
+        if repo and repo_name != repo:
+            continue
+        refs.setdefault(blob_id, []).append((repo_name or "", path, chunk_index, start, end, content))
+
+    terms = re.findall(r"\w+", text) if raw else query_terms(text, tokenizer)
+    hits = []
+    for blob_id, score, snip in ranked:
+        for repo_name, path, chunk_index, start, end, content in sorted(refs.get(blob_id, [])):
+            pos = first_match(content or "", terms)
+            hits.append(
+                {
+                    "repo": repo_name or None,
+                    "path": path,
+                    "chunk_index": chunk_index,
+                    "start": start,
+                    "end": end,
+                    "match": start + pos if pos >= 0 else None,
+                    "score": score,
+                    "snippet": " ".join(snip.split()),
+                }
+            )
+    return hits[:limit]
+
+
+def sample_queries(conn: sqlite3.Connection, count: int, seed: int = 7) -> list:
+    """Identifiers pulled from random blobs, for benchmarking without a hand-written query set."""
+    rng = random.Random(seed)
+    max_id = conn.execute("SELECT MAX(id) FROM chunk_blobs").fetchone()[0] or 0
+    queries = []
+    for _ in range(count * 5):
+        if len(queries) >= count or not max_id:
+            break
+        row = conn.execute("SELECT content FROM chunk_blobs WHERE id >= ? LIMIT 1", (rng.randint(1, max_id),)).fetchone()
+        words = re.findall(r"[A-Za-z_][A-Za-z0-9_]{3,}", row[0] if row else "")
+        if words:
+            picked = rng.sample(words, min(len(words), rng.choice([1, 1, 2])))
+            queries.append(" ".join(picked))
+    return queries
+
+
+def bench(conn: sqlite3.Connection, queries: list, runs: int, limit: int) -> dict:
+    """Latency (ms) of search() over `queries`, each run `runs` times after one warm-up."""
+    timings = []
+    for query in queries:
+        search(conn, query, limit)
+        for _ in range(runs):
+            start = time.perf_counter()
+            search(conn, query, limit)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    pct = lambda p: timings[min(len(timings) - 1, int(p * len(timings)))]
+    return {
+        "queries": len(queries),
+        "samples": len(timings),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": timings[-1],
+        "mean_ms": statistics.fmean(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True, help="Repo index SQLite (per-repo or unified)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Create the FTS index (no-op if present unless --rebuild)")
+    build.add_argument("--tokenizer", choices=sorted(TOKENIZERS), default="unicode61")
+    build.add_argument("--rebuild", action="store_true", help="Drop and rebuild, e.g. to switch tokenizer")
+
+    query = sub.add_parser("query", help="Search and print ranked hits")
+    query.add_argument("text")
+    query.add_argument("--limit", type=int, default=20)
+    query.add_argument("--repo", default="", help="Only hits from this repo (unified index)")
+    query.add_argument("--raw", action="store_true", help="Treat text as FTS5 query syntax")
+    query.add_argument("--json", action="store_true", help="Print hits as JSON lines")
+
+    bench_p = sub.add_parser("bench", help="Measure query latency")
+    bench_p.add_argument("--queries", nargs="*", default=[], help="Queries to time (default: sampled from the index)")
+    bench_p.add_argument("--sample", type=int, default=50, help="Sampled queries when --queries is not given")
+    bench_p.add_argument("--runs", type=int, default=5)
+    bench_p.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    db = Path(args.db)
+    if not db.exists():
+        parser.error(f"{db} not found")
+    conn = sqlite3.connect(db)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        built = ensure_search_index(conn, args.tokenizer, args.rebuild)
+        blobs = conn.execute("SELECT COUNT(*) FROM chunk_blobs").fetchone()[0]
+        if built:
+            print(f"Indexed {blobs} blobs with {args.tokenizer} in {time.perf_counter() - start:.2f}s")
+        else:
+            print(f"Index already present ({index_tokenizer(conn)}, {blobs} blobs); use --rebuild to rebuild")
+    elif args.command == "query":
+        try:
+            hits = search(conn, args.text, args.limit, args.repo or None, args.raw)
+        except (RuntimeError, ValueError, sqlite3.OperationalError) as exc:
+            parser.error(str(exc))
+        for hit in hits:
+            if args.json:
+                print(json.dumps(hit, ensure_ascii=False))
+            else:
+                where = f"{hit['repo']}:{hit['path']}" if hit["repo"] else hit["path"]
+                print(f"{hit['score']:8.3f}  {where} [{hit['start']}-{hit['end']}] @{hit['match']}")
+                print(f"          {hit['snippet']}")
+        if not args.json:
+            print(f"{len(hits)} hits")
+    else:
+        if index_tokenizer(conn) is None:
+            parser.error("no search index; run the build command first")
+        queries = args.queries or sample_queries(conn, args.sample)
+        stats = bench(conn, queries, args.runs, args.limit)
+        blobs = conn.execute("SELECT COUNT(*) FROM chunk_blobs").fetchone()[0]
+        print(f"Index: {index_tokenizer(conn)}, {blobs} blobs, {db.stat().st_size / 1e6:.1f} MB db")
+        print(
+            f"Queries: {stats['queries']} x {args.runs} runs, limit {args.limit}: "
+            f"p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, "
+            f"max {stats['max_ms']:.2f} ms, mean {stats['mean_ms']:.2f} ms"
+        )
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
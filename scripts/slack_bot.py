@@ -4,12 +4,15 @@ Slack Socket Mode bot bridge for Clawdbot.
 Responds to app mentions and direct messages using OpenClaw.
 """
 
+import atexit
 import json
 import os
 import subprocess
 import shutil
 import logging
 import re
+import select
+import shlex
 import threading
 from typing import Dict, Tuple, Optional
 import sys
@@ -20,12 +23,15 @@ from pathlib import Path
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 from slack_sdk.errors import SlackApiError
-from urllib.request import Request, urlopen
-from urllib.error import URLError
-try:
-    from openai import OpenAI
-except Exception:  # pragma: no cover - optional dependency
-    OpenAI = None
+from http.client import HTTPConnection, HTTPSConnection
+from urllib.parse import urlparse
+
+import model_client
+from file_cache import FileCache
+from lane_pool import LanePool
+from log_sink import get_sink
+from openclaw_pool import OpenClawError, OpenClawPool, OpenClawTimeout
+from relay_queue import RelayWriteBehind
 
 
 BOT_TOKEN = os.environ.get("SLACK_BOT_TOKEN", "").strip()
@@ -42,7 +48,9 @@ if BOT_MODE != "socket" and not SIGNING_SECRET:
 
 OPENCLAW_AGENT = os.environ.get("CLAWDBOT_AGENT", "orchestrator")
 OPENCLAW_BIN = os.environ.get("OPENCLAW_BIN", "").strip()
-OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "").strip()
+OPENCLAW_WORKER_CMD = os.environ.get("OPENCLAW_WORKER_CMD", "").strip()
+OPENCLAW_POOL_SIZE = int(os.environ.get("OPENCLAW_POOL_SIZE", "2"))
+OPENCLAW_TIMEOUT = int(os.environ.get("OPENCLAW_TIMEOUT", "60"))
 CODEX_MODEL = os.environ.get("CODEX_MODEL", "gpt-4o-mini").strip()
 CODE_MODE_ENABLED = os.environ.get("CLAWDBOT_CODE_MODE", "true").strip().lower() in {"1", "true", "yes"}
 EXEC_MODE_ENABLED = os.environ.get("CLAWDBOT_EXEC_MODE", "true").strip().lower() in {"1", "true", "yes"}
@@ -76,11 +84,20 @@ EXEC_CWD = Path(_EXEC_CWD_RAW).expanduser() if _EXEC_CWD_RAW else REPO_ROOT
 RELAY_DIR = Path(os.environ.get("CLAWDBOT_RELAY_DIR", str(LOG_DIR / "relay")))
 RELAY_DIR.mkdir(parents=True, exist_ok=True)
 RELAY_URL = os.environ.get("CLAWDBOT_RELAY_URL", "http://127.0.0.1:8092").strip()
+RELAY_FLUSH_MS = float(os.environ.get("CLAWDBOT_RELAY_FLUSH_MS", "50"))
+RELAY_MAX_BATCH = int(os.environ.get("CLAWDBOT_RELAY_MAX_BATCH", "50"))
 QUEUE_PATH = Path(os.environ.get("CLAWDBOT_QUEUE_PATH", str(REPO_ROOT / "tasks" / "approval_queue.json")))
 QUEUE_CHANNEL = os.environ.get("CLAWDBOT_QUEUE_CHANNEL", "").strip()
 QUEUE_INTERVAL = int(os.environ.get("CLAWDBOT_QUEUE_INTERVAL", "3600"))
 ANTHROPIC_USAGE_ENABLED = os.environ.get("CLAWDBOT_ANTHROPIC_USAGE", "true").strip().lower() in {"1", "true", "yes"}
 APPROVED_TASKS_PATH = Path(os.environ.get("CLAWDBOT_APPROVED_TASKS", str(REPO_ROOT / "tasks" / "approved_tasks.json")))
+LOG_MAX_BYTES = int(os.environ.get("CLAWDBOT_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_MAX_AGE_HOURS = float(os.environ.get("CLAWDBOT_LOG_MAX_AGE_HOURS", "168"))
+LOG_BACKUPS = int(os.environ.get("CLAWDBOT_LOG_BACKUPS", "5"))
+LOG_FLUSH_INTERVAL = float(os.environ.get("CLAWDBOT_LOG_FLUSH_INTERVAL", "1.0"))
+WORKERS = int(os.environ.get("CLAWDBOT_WORKERS", "8"))
+MAX_IN_FLIGHT_PER_USER = int(os.environ.get("CLAWDBOT_MAX_IN_FLIGHT_PER_USER", "3"))
+BUSY_REPLY = "Still working on your earlier messages. Give me a moment and try again."
 
 LOG_LEVEL = os.environ.get("CLAWDBOT_LOG_LEVEL", "INFO").upper()
 logging.basicConfig(
@@ -117,16 +134,59 @@ def _parse_repo_map(raw: str) -> Dict[str, str]:
 
 
 REPO_MAP = _parse_repo_map(REPO_MAP_RAW)
+FILE_CACHE = FileCache()
+
+
+def _log_sink(path: Path):
+    return get_sink(
+        path,
+        max_bytes=LOG_MAX_BYTES,
+        max_age=LOG_MAX_AGE_HOURS * 3600,
+        backups=LOG_BACKUPS,
+        flush_interval=LOG_FLUSH_INTERVAL,
+    )
+
+
+SLACK_LOG = _log_sink(LOG_DIR / "clawdbot_slack.log")
+ANTHROPIC_USAGE_SINK = _log_sink(ANTHROPIC_USAGE_LOG)
+CODEX_USAGE_SINK = _log_sink(LOG_DIR / "codex_usage.log")
+model_client.configure(calls_log=LOG_DIR / "model_calls.jsonl")
 
 
 def log_line(message: str):
     ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
     line = f"[{ts}] {message}"
-    log_path = LOG_DIR / "clawdbot_slack.log"
-    log_path.write_text(log_path.read_text() + line + "\n" if log_path.exists() else line + "\n")
+    SLACK_LOG.write(line)
     print(line, flush=True)
 
 
+def _on_lane_error(lane: str, exc: Exception) -> None:
+    log_line(f"lane {lane} handler error: {exc}")
+
+
+LANES = LanePool(workers=WORKERS, max_in_flight_per_user=MAX_IN_FLIGHT_PER_USER, on_error=_on_lane_error)
+
+
+def dispatch(lane: str, user: str, say, fn, *args) -> None:
+    """Hand slow work to the lane pool so the Bolt listener returns right away."""
+    if LANES.submit(lane, user, fn, *args):
+        return
+    stats = LANES.stats()
+    log_line(f"lane {lane} rejected for {user} (in-flight cap, queue_depth={stats['queue_depth']})")
+    try:
+        say(BUSY_REPLY)
+    except Exception as exc:
+        log_line(f"busy reply failed: {exc}")
+
+
+def log_lane_metrics(label: str, enqueued: float) -> None:
+    stats = LANES.stats()
+    log_line(
+        f"{label} lane wait={time.monotonic() - enqueued:.2f}s "
+        f"queue_depth={stats['queue_depth']} running={stats['running']}"
+    )
+
+
 def estimate_tokens(text: str) -> int:
     if not text:
         return 0
@@ -142,11 +202,9 @@ def log_anthropic_usage(prompt: str, output: str) -> None:
     ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
     line = (
         f"[{ts}] model=openclaw/{OPENCLAW_AGENT} "
-        f"prompt={prompt_tokens} output={output_tokens} total={total_tokens} estimated=1\n"
-    )
-    ANTHROPIC_USAGE_LOG.write_text(
-        ANTHROPIC_USAGE_LOG.read_text() + line if ANTHROPIC_USAGE_LOG.exists() else line
+        f"prompt={prompt_tokens} output={output_tokens} total={total_tokens} estimated=1"
     )
+    ANTHROPIC_USAGE_SINK.write(line)
 
 
 def _load_queue() -> list:
@@ -223,7 +281,45 @@ def mark_queue_status(task: str, status: str) -> None:
         _save_queue(items)
 
 
+_OPENCLAW_POOL: Optional[OpenClawPool] = None
+_OPENCLAW_POOL_LOCK = threading.Lock()
+
+
+def get_openclaw_pool() -> Optional[OpenClawPool]:
+    """Warm worker pool, when OPENCLAW_WORKER_CMD names a line-protocol agent."""
+    global _OPENCLAW_POOL
+    if not OPENCLAW_WORKER_CMD:
+        return None
+    with _OPENCLAW_POOL_LOCK:
+        if _OPENCLAW_POOL is None:
+            cmd = shlex.split(OPENCLAW_WORKER_CMD, posix=os.name != "nt")
+            _OPENCLAW_POOL = OpenClawPool(cmd, size=OPENCLAW_POOL_SIZE, timeout=OPENCLAW_TIMEOUT)
+        return _OPENCLAW_POOL
+
+
+def run_openclaw_pooled(pool: OpenClawPool, user_text: str) -> str:
+    prompt = f"{SAFE_PREFIX}\n\nUser: {user_text}".strip()
+    start = time.monotonic()
+    try:
+        output = pool.request(prompt)
+    except OpenClawTimeout:
+        log_line(f"openclaw timeout after {OPENCLAW_TIMEOUT}s (pool)")
+        return f"Clawdbot error: openclaw timed out after {OPENCLAW_TIMEOUT} seconds."
+    except OpenClawError as exc:
+        log_line(f"openclaw error (pool) in {time.monotonic() - start:.1f}s: {exc}")
+        return f"Clawdbot error: {exc}"
+    except Exception as exc:
+        log_line(f"openclaw invoke failed: {exc}")
+        return f"Clawdbot error: {exc}"
+    log_line(f"openclaw ok in {time.monotonic() - start:.1f}s (pool)")
+    log_anthropic_usage(prompt, output)
+    return output
+
+
 def run_openclaw(user_text: str) -> str:
+    pool = get_openclaw_pool()
+    if pool is not None:
+        return run_openclaw_pooled(pool, user_text)
     openclaw_cmd = OPENCLAW_BIN or shutil.which("openclaw") or shutil.which("openclaw.cmd")
     if not openclaw_cmd:
         # Common Windows global npm location
@@ -246,10 +342,10 @@ def run_openclaw(user_text: str) -> str:
     ]
     start = time.monotonic()
     try:
-        proc = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=60)
+        proc = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=OPENCLAW_TIMEOUT)
     except subprocess.TimeoutExpired:
-        log_line("openclaw timeout after 60s")
-        return "Clawdbot error: openclaw timed out after 60 seconds."
+        log_line(f"openclaw timeout after {OPENCLAW_TIMEOUT}s")
+        return f"Clawdbot error: openclaw timed out after {OPENCLAW_TIMEOUT} seconds."
     except Exception as exc:
         log_line(f"openclaw invoke failed: {exc}")
         return f"Clawdbot error: {exc}"
@@ -264,10 +360,9 @@ def run_openclaw(user_text: str) -> str:
 
 
 def run_codex(user_text: str, relay_context: str = "") -> str:
-    if not OPENAI_API_KEY:
-        return "Clawdbot error: OPENAI_API_KEY is not set."
-    if OpenAI is None:
-        return "Clawdbot error: openai package not installed."
+    reason = model_client.missing_reason()
+    if reason:
+        return f"Clawdbot error: {reason}"
     context = build_codex_context()
     system = (
         "You are Codex, the supervisor for the jcw-agent-ops repo. "
@@ -277,38 +372,24 @@ def run_codex(user_text: str, relay_context: str = "") -> str:
     prompt = f"{SAFE_PREFIX}\n\n{context}".strip()
     if relay_context:
         prompt = f"{prompt}\n\n[Relay Context]\n{relay_context}".strip()
-    client = OpenAI(api_key=OPENAI_API_KEY)
     try:
-        response = client.responses.create(
+        response, record = model_client.create_response(
             model=CODEX_MODEL,
             input=[
                 {"role": "system", "content": system},
                 {"role": "system", "content": prompt},
                 {"role": "user", "content": user_text},
             ],
+            caller="slack_bot.codex",
         )
     except Exception as exc:
         return f"Clawdbot error: {exc}"
-    usage = getattr(response, "usage", None)
-    if usage:
-        prompt_tokens = getattr(usage, "prompt_tokens", None)
-        output_tokens = getattr(usage, "output_tokens", None)
-        total_tokens = getattr(usage, "total_tokens", None)
-        # Newer Responses API fields
-        if prompt_tokens is None:
-            prompt_tokens = getattr(usage, "input_tokens", None)
-        if output_tokens is None:
-            output_tokens = getattr(usage, "output_tokens", None) or getattr(usage, "output_tokens_total", None)
-        if total_tokens is None and prompt_tokens is not None and output_tokens is not None:
-            total_tokens = prompt_tokens + output_tokens
-        if prompt_tokens is not None or output_tokens is not None or total_tokens is not None:
-            usage_path = LOG_DIR / "codex_usage.log"
-            ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-            line = f"[{ts}] model={CODEX_MODEL} prompt={prompt_tokens or 0} output={output_tokens or 0} total={total_tokens or 0}\n"
-            usage_path.write_text(
-                usage_path.read_text() + line if usage_path.exists() else line
-            )
-    return getattr(response, "output_text", "").strip() or "No response."
+    if record.total_tokens:
+        CODEX_USAGE_SINK.write(
+            f"[{record.ts}] model={CODEX_MODEL} prompt={record.prompt_tokens} "
+            f"output={record.output_tokens} total={record.total_tokens} latency_ms={record.latency_ms}"
+        )
+    return model_client.output_text(response) or "No response."
 
 
 def truncate(text: str, limit: int = 3000) -> str:
@@ -369,9 +450,15 @@ def _extract_section(text: str, header: str) -> str:
 
 def render_sprint_summary() -> str:
     sprint_path = REPO_ROOT / "SPRINT_BOARD.md"
-    if not sprint_path.exists():
-        return "Sprint board not found."
-    text = sprint_path.read_text(encoding="utf-8", errors="ignore")
+    return FILE_CACHE.derive(
+        sprint_path,
+        "sprint_summary",
+        lambda text: _render_sprint_text(sprint_path, text),
+        default="Sprint board not found.",
+    )
+
+
+def _render_sprint_text(sprint_path: Path, text: str) -> str:
     lane_match = re.search(r"\\*\\*Lane Summaries.*?\\*\\*\\r?\\n(.*?)\\r?\\n---", text, flags=re.DOTALL)
     lane_lines = ""
     if lane_match:
@@ -418,7 +505,12 @@ def render_digest_summary() -> str:
     if not digests:
         return "No research digests found."
     latest = digests[0]
-    lines = latest.read_text(encoding="utf-8", errors="ignore").splitlines()
+    preview = FILE_CACHE.derive(latest, "digest_preview", _digest_preview, default="")
+    return f"Latest digest: {latest.name}\n\n{preview}" if preview else f"Latest digest: {latest.name}"
+
+
+def _digest_preview(text: str) -> str:
+    lines = text.splitlines()
     cleaned = []
     for line in lines:
         line = strip_ansi(line).strip()
@@ -430,12 +522,18 @@ def render_digest_summary() -> str:
         if "temporary outage" in lower or "web fetching" in lower or "api restored" in lower:
             continue
         cleaned.append(line)
-    preview = "\n".join(cleaned[:12]).strip()
-    return f"Latest digest: {latest.name}\n\n{preview}" if preview else f"Latest digest: {latest.name}"
+    return "\n".join(cleaned[:12]).strip()
 
 
 def render_queue_summary() -> str:
-    items = _load_queue()
+    return FILE_CACHE.derive(QUEUE_PATH, "queue_summary", _render_queue_text, default="Approval queue is empty.")
+
+
+def _render_queue_text(text: str) -> str:
+    try:
+        items = json.loads(text)
+    except Exception:
+        items = []
     if not items:
         return "Approval queue is empty."
     lines = ["Approval queue:"]
@@ -635,11 +733,7 @@ def run_code_mode(request_text: str) -> Tuple[str, str]:
 
 
 def _load_context_snippet(path: Path, max_chars: int = 1800) -> str:
-    if not path.exists():
-        return ""
-    raw = path.read_text(encoding="utf-8", errors="ignore")
-    snippet = raw.strip()[:max_chars]
-    return snippet
+    return FILE_CACHE.derive(path, f"snippet:{max_chars}", lambda raw: raw.strip()[:max_chars], default="")
 
 
 def build_codex_context() -> str:
@@ -658,19 +752,126 @@ def build_codex_context() -> str:
     return "\n".join(parts)
 
 
-def relay_post(path: str, payload: dict, timeout: int = 6) -> Optional[dict]:
+_RELAY_CONN = threading.local()
+RELAY_NOT_SENT = 0
+
+
+def _relay_connection(timeout: int):
+    """Keep-alive connection to the relay, one per thread (http.client is not thread-safe)."""
+    conn = getattr(_RELAY_CONN, "conn", None)
+    if conn is None:
+        parsed = urlparse(RELAY_URL)
+        conn_cls = HTTPSConnection if parsed.scheme == "https" else HTTPConnection
+        conn = conn_cls(parsed.hostname or "127.0.0.1", parsed.port, timeout=timeout)
+        _RELAY_CONN.conn = conn
+        _RELAY_CONN.prefix = parsed.path.rstrip("/")
+    if conn.sock is not None and select.select([conn.sock], [], [], 0)[0]:
+        # Readable while idle means the relay closed it (EOF); reconnect before sending.
+        conn.close()
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _relay_reset() -> None:
+    conn = getattr(_RELAY_CONN, "conn", None)
+    if conn is not None:
+        conn.close()
+    _RELAY_CONN.conn = None
+
+
+def relay_request(path: str, payload: dict, timeout: int = 6) -> Tuple[Optional[int], Optional[dict]]:
+    """POST to the relay on the pooled connection; returns (status, json body).
+
+    status is RELAY_NOT_SENT (0) when the request never left, so the caller can
+    safely resend it, and None when it was sent but no response came back.
+    Only a failure while sending on a reused connection is retried: once the
+    request is out, the relay may have stored it, and a second send would
+    append the message twice.
+    """
     if not RELAY_URL:
-        return None
-    try:
-        data = json.dumps(payload).encode("utf-8")
-        req = Request(f"{RELAY_URL}{path}", data=data, headers={"Content-Type": "application/json"})
-        with urlopen(req, timeout=timeout) as resp:
+        return RELAY_NOT_SENT, None
+    data = json.dumps(payload).encode("utf-8")
+    headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+    for attempt in range(2):
+        reused = False
+        try:
+            conn = _relay_connection(timeout)
+            reused = conn.sock is not None
+            conn.request("POST", f"{_RELAY_CONN.prefix}{path}", body=data, headers=headers)
+        except Exception:
+            _relay_reset()
+            if attempt == 0 and reused:
+                continue
+            return RELAY_NOT_SENT, None
+        try:
+            resp = conn.getresponse()
             raw = resp.read().decode("utf-8")
-            return json.loads(raw)
-    except URLError:
-        return None
-    except Exception:
+        except Exception:
+            _relay_reset()
+            return None, None
+        if resp.will_close:
+            _relay_reset()
+        try:
+            return resp.status, json.loads(raw)
+        except ValueError:
+            return resp.status, None
+    return RELAY_NOT_SENT, None
+
+
+def relay_post(path: str, payload: dict, timeout: int = 6) -> Optional[dict]:
+    """JSON body of a 2xx relay response, else None."""
+    status, body = relay_request(path, payload, timeout)
+    if not status or not 200 <= status < 300:
         return None
+    return body
+
+
+RELAY_WRITER = RelayWriteBehind(
+    relay_request,
+    flush_interval=RELAY_FLUSH_MS / 1000.0,
+    max_batch=RELAY_MAX_BATCH,
+    on_error=log_line,
+)
+atexit.register(RELAY_WRITER.close)
+
+
+def relay_append(key_payload: dict, role: str, text: str) -> None:
+    """Queue a message for the relay; the write-behind thread ships it via /relay/batch."""
+    if RELAY_URL and text:
+        RELAY_WRITER.enqueue({**key_payload, "role": role, "text": text})
+
+
+def relay_context(key_payload: dict, limit: int = 20) -> str:
+    """Summary + tail for one conversation, flushing its queued appends in the same request."""
+    pending = RELAY_WRITER.take(lambda m: all(m.get(k) == v for k, v in key_payload.items()))
+    status, resp = relay_request("/relay/batch", {"messages": pending, "context": [{**key_payload, "limit": limit}]})
+    if status == 200 and resp and resp.get("context"):
+        ctx = resp["context"][0]
+    else:
+        if status == 404:
+            # Relay without /relay/batch: one call per message.
+            for message in pending:
+                relay_post("/relay/message", message)
+        elif status == RELAY_NOT_SENT:
+            # Never reached the relay: hand the messages back to the write-behind queue.
+            RELAY_WRITER.requeue(pending)
+        elif pending:
+            # Sent but failed or unanswered: the relay may have stored the batch, so
+            # resending could duplicate it.
+            RELAY_WRITER.record_dropped(len(pending))
+        ctx = relay_post("/relay/context", {**key_payload, "limit": limit})
+    if not ctx:
+        return ""
+    summary = (ctx.get("summary") or "").strip()
+    tail_lines = []
+    for row in ctx.get("tail") or []:
+        role = row.get("role", "")
+        msg = row.get("text", "")
+        if msg:
+            tail_lines.append(f"{role}: {msg}")
+    return "\n".join([line for line in ([summary] + tail_lines) if line])
 
 
 def build_approval_blocks(task: str, requester: str) -> list:
@@ -877,6 +1078,15 @@ def on_app_mention(event, say):
     if not text:
         text = "Hello! How can I help?"
     log_line(f"app_mention from {user}: {text}")
+    dispatch(f"{channel}/{user}", user, say, process_app_mention, event, text, time.monotonic())
+
+
+def process_app_mention(event, text: str, enqueued: float):
+    if _AGENT_PAUSED:
+        return
+    user = event.get("user", "")
+    channel = event.get("channel", "")
+    log_lane_metrics("app_mention", enqueued)
     try:
         if text.lower().startswith(("approve:", "request:")):
             task = text.split(":", 1)[1].strip() or "Unspecified task"
@@ -907,7 +1117,6 @@ def on_app_mention(event, say):
     except Exception as exc:
         response = f"Clawdbot error: {exc}"
     try:
-        user = event.get("user", "")
         if should_send_reply(user, response):
             app.client.chat_postMessage(
                 channel=event.get("channel"),
@@ -937,7 +1146,6 @@ def on_message(event, say):
         return  # Silently ignore all messages while paused
 
     # DM flow
-    relay_key_payload = {"channel_type": channel_type, "channel_id": channel, "user_id": user}
     if channel_type == "im":
         if not is_allowed(user, channel, "im"):
             log_line(f"dm blocked for user {user} in {channel}")
@@ -958,8 +1166,19 @@ def on_message(event, say):
             if CHANNEL_PREFIX and not text.lower().startswith(CHANNEL_PREFIX.lower()):
                 return
         log_line(f"channel msg from {user} in {channel}: {text}")
-    # Persist relay input (relay service)
-    relay_post("/relay/message", {**relay_key_payload, "role": "user", "text": text})
+    dispatch(f"{channel}/{user}", user, say, process_message, event, text, time.monotonic())
+
+
+def process_message(event, text: str, enqueued: float):
+    if _AGENT_PAUSED:
+        return
+    channel_type = event.get("channel_type", "")
+    user = event.get("user", "")
+    channel = event.get("channel", "")
+    relay_key_payload = {"channel_type": channel_type, "channel_id": channel, "user_id": user}
+    log_lane_metrics("dm" if channel_type == "im" else "channel", enqueued)
+    # Persist relay input (relay service); queued, so routing does not wait on the relay.
+    relay_append(relay_key_payload, "user", text)
     try:
         if text.lower().startswith(("approve:", "request:")):
             task = text.split(":", 1)[1].strip() or "Unspecified task"
@@ -978,19 +1197,8 @@ def on_message(event, say):
                     else:
                         response = result
                 else:
-                    relay_context = ""
-                    relay_ctx = relay_post("/relay/context", {**relay_key_payload, "limit": 20})
-                    if relay_ctx:
-                        summary = (relay_ctx.get("summary") or "").strip()
-                        tail = relay_ctx.get("tail") or []
-                        tail_lines = []
-                        for row in tail:
-                            role = row.get("role", "")
-                            msg = row.get("text", "")
-                            if msg:
-                                tail_lines.append(f"{role}: {msg}")
-                        relay_context = "\n".join([line for line in ([summary] + tail_lines) if line])
-                    response = sanitize_response(run_codex(payload, relay_context=relay_context))
+                    relay_ctx = relay_context(relay_key_payload, limit=20)
+                    response = sanitize_response(run_codex(payload, relay_context=relay_ctx))
             else:
                 local = maybe_local_response(payload)
                 if local:
@@ -1007,7 +1215,7 @@ def on_message(event, say):
                 channel=event.get("channel"),
                 text=truncate(response),
             )
-            relay_post("/relay/message", {**relay_key_payload, "role": "assistant", "text": response})
+            relay_append(relay_key_payload, "assistant", response)
             if channel_type == "im":
                 log_line("dm reply sent")
             else:
@@ -1403,6 +1611,10 @@ if __name__ == "__main__":
     if QUEUE_INTERVAL:
         thread = threading.Thread(target=queue_tick, daemon=True)
         thread.start()
+    pool = get_openclaw_pool()
+    if pool is not None and not DISABLE_OPENCLAW:
+        pool.start()
+        log_line(f"openclaw pool started (size={pool.size})")
     if BOT_MODE in {"http", "web", "cloudrun"}:
         try:
             from flask import Flask, request
@@ -1420,6 +1632,19 @@ if __name__ == "__main__":
         def health():
             return ("ok", 200)
 
+        @flask_app.route("/metrics", methods=["GET"])
+        def metrics():
+            payload = {
+                "lanes": LANES.stats(),
+                "model": model_client.stats(),
+                "file_cache": FILE_CACHE.stats(),
+                "relay_writer": RELAY_WRITER.stats(),
+            }
+            pool = get_openclaw_pool()
+            if pool is not None:
+                payload["openclaw_pool"] = pool.stats()
+            return (json.dumps(payload), 200, {"Content-Type": "application/json"})
+
         port = int(os.environ.get("PORT", "8080"))
         flask_app.run(host="0.0.0.0", port=port)
     else:
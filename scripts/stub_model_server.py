@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI Responses API, for offline load tests.
+
+    python scripts/stub_model_server.py --port 8099 --latency 0.2
+    MODEL_BASE_URL=http://127.0.0.1:8099/v1 python scripts/relay_server.py
+
+Answers POST /v1/responses with a canned reply and a token usage block
+estimated from the input size (len/4, like slack_bot.estimate_tokens).
+"""
+
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+LATENCY = 0.0
+
+
+def _text_of(payload) -> str:
+    items = payload.get("input") or []
+    if isinstance(items, str):
+        return items
+    parts = []
+    for item in items:
+        content = item.get("content") if isinstance(item, dict) else item
+        parts.append(content if isinstance(content, str) else json.dumps(content))
+    return "\n".join(parts)
+
+
+def build_response(payload) -> dict:
+    text = _text_of(payload)
+    last = text.strip().splitlines()[-1] if text.strip() else ""
+    reply = f"stub reply: {last[:200]}"
+    prompt_tokens = max(1, len(text) // 4)
+    output_tokens = max(1, len(reply) // 4)
+    return {
+        "id": f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": payload.get("model") or "stub",
+        "output": [
+            {
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex}",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": reply, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+        },
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "AgentOpsModelStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, data, status=200):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        raw = self.rfile.read(length) if length > 0 else b"{}"
+        if urlparse(self.path).path.rstrip("/").endswith("/responses"):
+            try:
+                payload = json.loads(raw.decode("utf-8"))
+            except Exception:
+                self._send_json({"error": {"message": "invalid json"}}, status=400)
+                return
+            if LATENCY:
+                time.sleep(LATENCY)
+            self._send_json(build_response(payload))
+            return
+        self._send_json({"error": {"message": "not found"}}, status=404)
+
+
+def main():
+    global LATENCY
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to sleep per request")
+    args = parser.parse_args()
+    LATENCY = args.latency
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Model stub running at http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Conditional-response cache for the task UI.
+
+Each entry is built once per file version, keyed on the file's (mtime, size).
+It holds the response body, a validator pair (ETag and Last-Modified), and
+gzip/brotli variants for text content, all compressed once. Repeat requests
+cost one stat(). A client holding the current ETag gets a bodyless 304.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import brotli  # type: ignore
+except Exception:
+    brotli = None
+
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+MIN_COMPRESS_BYTES = 512
+
+
+def stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, content_type: str, mtime_ns: int):
+        self.body = body
+        self.content_type = content_type
+        digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        # Weak: the same ETag is served for the identity, gzip and br encodings.
+        self.etag = f'W/"{digest}"'
+        self.version = digest[:10]
+        self.last_modified = formatdate(mtime_ns / 1e9, usegmt=True)
+        self.mtime = int(mtime_ns // 1_000_000_000)
+        self.variants: Dict[str, bytes] = {}
+        if content_type.startswith(COMPRESSIBLE) and len(body) >= MIN_COMPRESS_BYTES:
+            self.variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=11)
+
+    def encoding_for(self, accept_encoding: str) -> Optional[str]:
+        accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and encoding in accepted:
+                return encoding
+        return None
+
+    def not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        if if_none_match:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            # Weak comparison (RFC 9110 13.1.2): ignore the W/ prefix on either side.
+            return "*" in tags or self.etag[2:] in {t[2:] if t.startswith("W/") else t for t in tags}
+        if if_modified_since:
+            try:
+                return int(parsedate_to_datetime(if_modified_since).timestamp()) >= self.mtime
+            except Exception:
+                return False
+        return False
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[tuple, CachedResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        path: Path,
+        name: str,
+        content_type: str,
+        build: Callable[[bytes], bytes],
+        extra_key: tuple = (),
+    ) -> Optional[CachedResponse]:
+        """Response for build(file bytes), rebuilt only when the file (or `extra_key`) changes."""
+        path = Path(path)
+        key = stat_key(path)
+        if key is None:
+            return None
+        version = (key, extra_key)
+        cache_key = (str(path), name)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        response = CachedResponse(build(path.read_bytes()), content_type, key[0])
+        with self._lock:
+            self._entries[cache_key] = (version, response)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return response
+
+    def file(self, path: Path, content_type: str) -> Optional[CachedResponse]:
+        return self.get(path, "raw", content_type, lambda data: data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "brotli": brotli is not None}
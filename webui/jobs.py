@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+In-process job runner for the slow task UI actions (Gmail/Calendar drafts, Excel writeback).
+
+Handlers submit a job and return its id at once; the browser polls
+/api/jobs/{id}. Each lane is one long-lived worker thread with its own
+queue. Work in a lane runs in order, and state the lane keeps (the Google
+API clients and their credentials) stays warm between jobs. The lane
+threads are the only users of that state, so the non-thread-safe Google
+clients are never shared across threads.
+"""
+
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobRunner:
+    def __init__(self, keep: int = 200):
+        self.keep = keep
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._queues: Dict[str, "queue.Queue"] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[[], dict], lane: str = "default") -> dict:
+        job = {
+            "id": uuid.uuid4().hex[:16],
+            "kind": kind,
+            "lane": lane,
+            "status": QUEUED,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            # Forget the oldest finished jobs; queued and running ones are always kept.
+            for job_id in [j for j, v in self._jobs.items() if v["status"] in (DONE, FAILED)][: max(0, len(self._jobs) - self.keep)]:
+                del self._jobs[job_id]
+            lane_queue = self._queues.get(lane)
+            if lane_queue is None:
+                lane_queue = self._queues[lane] = queue.Queue()
+                threading.Thread(target=self._run, args=(lane_queue,), name=f"jobs:{lane}", daemon=True).start()
+            position = lane_queue.qsize()
+        lane_queue.put((job["id"], fn))
+        return {**job, "queue_position": position}
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def recent(self, limit: int = 20) -> list:
+        with self._lock:
+            return [dict(job) for job in list(self._jobs.values())[-limit:]][::-1]
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def _run(self, lane_queue: "queue.Queue") -> None:
+        while True:
+            job_id, fn = lane_queue.get()
+            self._update(job_id, status=RUNNING, started_at=time.time())
+            try:
+                result = fn()
+            except Exception as exc:
+                traceback.print_exc()
+                self._update(job_id, status=FAILED, error=str(exc) or exc.__class__.__name__, finished_at=time.time())
+            else:
+                self._update(job_id, status=DONE, result=result, finished_at=time.time())
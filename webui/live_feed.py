@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Change feed behind /api/stream (server-sent events).
+
+One watcher thread serves every viewer. File-backed topics are rebuilt when
+a watched file's (mtime, size) changes; other topics (the Firestore metrics
+document) are rebuilt on a fixed interval. A topic is published only when
+its payload actually differs from the last one, so server work tracks the
+change rate, not viewers x poll interval. The watcher idles while nobody is
+subscribed.
+"""
+
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class _Topic:
+    def __init__(self, name: str, build: Callable[[], dict], paths: List[Path], every: Optional[float]):
+        self.name = name
+        self.build = build
+        self.paths = paths
+        self.every = every
+        self.stats: Optional[list] = None
+        self.built_at = 0.0
+        self.payload: Optional[str] = None
+
+
+class LiveFeed:
+    def __init__(self, poll_interval: float = 1.0, max_backlog: int = 64):
+        self.poll_interval = poll_interval
+        self.max_backlog = max_backlog
+        self._topics: Dict[str, _Topic] = {}
+        self._subscribers: List["queue.Queue"] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._event_id = 0
+        self.published = 0
+
+    def add(self, name: str, build: Callable[[], dict], paths=(), every: Optional[float] = None) -> None:
+        self._topics[name] = _Topic(name, build, [Path(p) for p in paths], every)
+
+    def subscribe(self) -> Tuple["queue.Queue", List[Tuple[int, str, str]]]:
+        """New subscriber queue plus the current value of every topic (sent first)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+                self._thread.start()
+        # First viewer after startup: build anything not built yet so the snapshot is complete.
+        self._refresh(only_missing=True)
+        q: "queue.Queue" = queue.Queue(maxsize=self.max_backlog)
+        with self._lock:
+            # Snapshot and registration under one lock: every later change lands in the queue.
+            snapshot = [(self._event_id, t.name, t.payload) for t in self._topics.values() if t.payload is not None]
+            self._subscribers.append(q)
+        self._wake.set()
+        return q, snapshot
+
+    def unsubscribe(self, q: "queue.Queue") -> None:
+        with self._lock:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+
+    def is_subscribed(self, q: "queue.Queue") -> bool:
+        with self._lock:
+            return q in self._subscribers
+
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def _publish(self, name: str, payload: str) -> None:
+        with self._lock:
+            self._event_id += 1
+            event = (self._event_id, name, payload)
+            self.published += 1
+            for q in list(self._subscribers):
+                try:
+                    q.put_nowait(event)
+                except queue.Full:
+                    # A viewer that stopped reading; drop it rather than buffer forever.
+                    self._subscribers.remove(q)
+
+    def _due(self, topic: _Topic, now: float) -> bool:
+        if topic.payload is None:
+            return True
+        if topic.every is not None and now - topic.built_at >= topic.every:
+            return True
+        if topic.paths:
+            return [_stat(p) for p in topic.paths] != topic.stats
+        return False
+
+    def _refresh(self, only_missing: bool = False) -> None:
+        now = time.monotonic()
+        for topic in list(self._topics.values()):
+            with self._lock:
+                due = topic.payload is None if only_missing else self._due(topic, now)
+                if not due:
+                    continue
+                # Claim the rebuild so concurrent subscribers do not repeat it.
+                topic.stats = [_stat(p) for p in topic.paths]
+                topic.built_at = now
+            try:
+                payload = json.dumps(topic.build(), sort_keys=True)
+            except Exception as exc:
+                payload = json.dumps({"error": str(exc)})
+            with self._lock:
+                changed = payload != topic.payload
+                topic.payload = payload
+            if changed:
+                self._publish(topic.name, payload)
+
+    def _run(self) -> None:
+        while True:
+            if not self.subscribers():
+                self._wake.clear()
+                self._wake.wait()
+            self._refresh()
+            time.sleep(self.poll_interval)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+"""
+Rolling Slack-bot counters behind /api/ops.
+
+A background thread follows the Slack and runtime logs by byte offset and
+reads only what was appended since the last poll. Rotation (the sink renames
+path -> path.1) is detected by inode, and the rest of the old file is read
+before switching. Truncation is detected by the file shrinking. Matching
+lines go into per-minute buckets that cover the last 24 hours. After each
+poll the 1h and 24h totals are recomputed, so a request only copies a dict.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+WINDOWS = {"1h": 3600, "24h": 24 * 3600}
+RETAIN_SECONDS = max(WINDOWS.values())
+READ_CHUNK = 1024 * 1024
+
+# (counter, substring matched case-insensitively) per log.
+SLACK_RULES = [("dms", "dm from"), ("mentions", "app_mention"), ("replies", "reply sent"), ("errors", "error")]
+RUNTIME_RULES = [("runtime_errors", "error")]
+COUNTERS = [name for name, _ in SLACK_RULES + RUNTIME_RULES]
+
+# log_line() in slack_bot.py writes "[YYYY-mm-dd HH:MM:SS]" in UTC; the logging
+# module writes "YYYY-mm-dd HH:MM:SS,mmm" in local time.
+_UTC_STAMP = re.compile(rb"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\]")
+_LOCAL_STAMP = re.compile(rb"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),\d+ ")
+
+
+def line_time(line: bytes) -> Optional[float]:
+    match = _UTC_STAMP.match(line)
+    if match:
+        stamp = datetime.strptime(match.group(1).decode(), "%Y-%m-%d %H:%M:%S")
+        return stamp.replace(tzinfo=timezone.utc).timestamp()
+    match = _LOCAL_STAMP.match(line)
+    if match:
+        return time.mktime(time.strptime(match.group(1).decode(), "%Y-%m-%d %H:%M:%S"))
+    return None
+
+
+class LogFollower:
+    """Yields complete lines appended to `path` since the previous call."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fp = None
+        self._inode: Optional[int] = None
+        self._partial = b""
+
+    def _open(self) -> bool:
+        try:
+            fp = self.path.open("rb")
+        except OSError:
+            return False
+        self._fp = fp
+        self._inode = os.fstat(fp.fileno()).st_ino
+        self._partial = b""
+        return True
+
+    def _drain(self) -> List[bytes]:
+        lines: List[bytes] = []
+        while True:
+            chunk = self._fp.read(READ_CHUNK)
+            if not chunk:
+                break
+            data = self._partial + chunk
+            parts = data.split(b"\n")
+            self._partial = parts.pop()
+            lines.extend(part for part in parts if part)
+        return lines
+
+    def read_new(self) -> List[bytes]:
+        if self._fp is None and not self._open():
+            return []
+        lines = self._drain()
+        try:
+            st = self.path.stat()
+        except OSError:
+            st = None
+        if st is not None and st.st_ino != self._inode:
+            # Rotated: everything left in the renamed file was just drained; start the new one.
+            if self._partial:
+                lines.append(self._partial)
+            self.close()
+            if self._open():
+                lines.extend(self._drain())
+        elif st is not None and st.st_size < self._fp.tell():
+            # Truncated in place.
+            self._fp.seek(0)
+            self._partial = b""
+            lines.extend(self._drain())
+        return lines
+
+    def close(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+        self._fp = None
+        self._inode = None
+        self._partial = b""
+
+
+class OpsAggregator:
+    def __init__(self, slack_log: Path, runtime_log: Path, poll_interval: float = 2.0):
+        self.slack_log = Path(slack_log)
+        self.runtime_log = Path(runtime_log)
+        self.poll_interval = poll_interval
+        self._sources: List[Tuple[LogFollower, list]] = [
+            (LogFollower(self.slack_log), SLACK_RULES),
+            (LogFollower(self.runtime_log), RUNTIME_RULES),
+        ]
+        self._buckets: Dict[int, Counter] = {}
+        self._last_event = "No events yet."
+        self._summary: dict = {}
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.lines_read = 0
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            # The first pass (rotated backlog plus the whole current file) runs once, inline,
+            # so the first request already sees real counts.
+            self._backfill()
+            self.poll()
+            self._thread = threading.Thread(target=self._run, name="ops-aggregator", daemon=True)
+            self._thread.start()
+
+    def summary(self, window: str = "24h") -> dict:
+        """Counters for `window` at the top level (the suite's fields), plus every window."""
+        self.start()
+        with self._lock:
+            data = dict(self._summary)
+        data.update(data["windows"].get(window) or data["windows"]["24h"])
+        data["window"] = window if window in WINDOWS else "24h"
+        return data
+
+    def _count(self, lines: List[bytes], rules: list, now: float) -> None:
+        cutoff = now - RETAIN_SECONDS
+        for line in lines:
+            lower = line.lower()
+            hits = [name for name, needle in rules if needle.encode() in lower]
+            if not hits:
+                continue
+            stamp = line_time(line) or now
+            if stamp < cutoff:
+                continue
+            bucket = self._buckets.setdefault(int(stamp // 60), Counter())
+            bucket.update(hits)
+
+    def _backfill(self) -> None:
+        """Seed the buckets from the first rotated file, read once at startup."""
+        now = time.time()
+        for path, rules in ((self.slack_log, SLACK_RULES), (self.runtime_log, RUNTIME_RULES)):
+            rotated = path.with_name(f"{path.name}.1")
+            try:
+                if now - rotated.stat().st_mtime > RETAIN_SECONDS:
+                    continue
+            except OSError:
+                continue
+            follower = LogFollower(rotated)
+            self._count(follower.read_new(), rules, now)
+            follower.close()
+
+    def poll(self) -> int:
+        now = time.time()
+        read = 0
+        for follower, rules in self._sources:
+            lines = follower.read_new()
+            if not lines:
+                continue
+            read += len(lines)
+            self._count(lines, rules, now)
+            if rules is SLACK_RULES:
+                self._last_event = lines[-1].decode("utf-8", errors="ignore")
+        self.lines_read += read
+        self._rebuild(now)
+        return read
+
+    def _rebuild(self, now: float) -> None:
+        current = int(now // 60)
+        for minute in [m for m in self._buckets if m <= current - RETAIN_SECONDS // 60]:
+            del self._buckets[minute]
+        windows = {}
+        for name, seconds in WINDOWS.items():
+            start = current - seconds // 60
+            total = Counter()
+            for minute, bucket in self._buckets.items():
+                if minute > start:
+                    total.update(bucket)
+            windows[name] = {counter: total.get(counter, 0) for counter in COUNTERS}
+        summary = {
+            "windows": windows,
+            "last_event": self._last_event,
+            "log_path": str(self.slack_log),
+            "lines_read": self.lines_read,
+        }
+        with self._lock:
+            self._summary = summary
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.poll()
+            except Exception:
+                pass
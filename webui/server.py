@@ -1,28 +1,44 @@
 #!/usr/bin/env python
 """
 Minimal local web UI for Actions tasks.
-No external dependencies. Uses Python stdlib only.
+Runs on the Python stdlib alone. Optional extras (webui/requirements.txt):
+brotli adds br-encoded responses, google-cloud-firestore backs tasks and
+metrics with Firestore when FIRESTORE_ENABLED=1.
 """
 
+import base64
 import json
 import os
+import queue
+import re
 import sqlite3
 import subprocess
 import sys
+import threading
 import time
 from datetime import datetime
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
+from db_pool import ConnectionPool
+from http_cache import ResponseCache, stat_key
+from jobs import JobRunner
+from live_feed import LiveFeed
+from ops_aggregator import OpsAggregator
+
 try:
     from google.cloud import firestore  # type: ignore
+    from google.cloud.firestore_v1.base_query import FieldFilter  # type: ignore
+    from google.api_core.exceptions import FailedPrecondition  # type: ignore
 except Exception:
     firestore = None
+    FieldFilter = None
+    FailedPrecondition = None
 
 BASE_DIR = Path(__file__).resolve().parent
 REPO_ROOT = BASE_DIR.parent
-DB_PATH = REPO_ROOT / "data" / "actions.sqlite"
+DB_PATH = Path(os.environ.get("AGENT_OPS_DB") or REPO_ROOT / "data" / "actions.sqlite")
 TEMPLATES_DIR = BASE_DIR / "templates"
 STATIC_DIR = BASE_DIR / "static"
 DRAFTS_DIR = REPO_ROOT / "data" / "drafts"
@@ -34,8 +50,24 @@ APPS_PATH = REPO_ROOT / "data" / "suite_apps.json"
 FIRESTORE_ENABLED = os.environ.get("FIRESTORE_ENABLED", "0").strip().lower() in {"1", "true", "yes"}
 FIRESTORE_PROJECT_ID = os.environ.get("FIRESTORE_PROJECT_ID", "").strip()
 METRICS_DOC = os.environ.get("OPS_METRICS_DOC", "ops_metrics/current").strip()
+TAGS_DOC = os.environ.get("TASK_TAGS_DOC", "task_meta/tags").strip()
+SCHEMA_DOC = os.environ.get("TASK_SCHEMA_DOC", "task_meta/schema").strip()
+THREADED = os.environ.get("AGENT_OPS_THREADED", "1").strip().lower() in {"1", "true", "yes"}
+DB_POOL_SIZE = int(os.environ.get("AGENT_OPS_DB_POOL", "8"))
+STREAM_POLL = float(os.environ.get("AGENT_OPS_STREAM_POLL", "1"))
+METRICS_REFRESH = float(os.environ.get("AGENT_OPS_METRICS_REFRESH", "30"))
+STREAM_HEARTBEAT = 15
+OPS_POLL = float(os.environ.get("AGENT_OPS_LOG_POLL", "2"))
 
 _FS_CLIENT = None
+DB_POOL = ConnectionPool(DB_PATH, size=DB_POOL_SIZE)
+RESPONSES = ResponseCache()
+_PAGE_ASSETS = {}
+OPS = OpsAggregator(OPS_LOG, RUNTIME_LOG, poll_interval=OPS_POLL)
+JOBS = JobRunner()
+STATIC_REF = re.compile(r'(["\'])/static/([\w.\-/]+)\1')
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
 
 
 def firestore_client():
@@ -47,46 +79,410 @@ def firestore_client():
     return _FS_CLIENT
 
 
-def row_to_dict(row, columns):
-    return {col: row[i] for i, col in enumerate(columns)}
+def use_scripts():
+    scripts = str(REPO_ROOT / "scripts")
+    if scripts not in sys.path:
+        sys.path.insert(0, scripts)
+
+
+def ensure_sqlite_schema():
+    """Upgrade an existing actions DB in place (search index, triggers) before serving."""
+    if firestore_client() or not DB_PATH.exists():
+        return
+    # The schema is owned by the ingest script; reuse it rather than restating the DDL here.
+    use_scripts()
+    from actions_ingest import init_db
+
+    init_db(DB_PATH).close()
 
 
-def read_text_safe(path: Path, limit: int = 12000) -> str:
-    if not path.exists():
+def fts_query(text: str, prefix: bool = False) -> str:
+    """Turn free text into an FTS5 MATCH expression: every word must match.
+
+    Words are quoted so user input cannot inject FTS syntax. With `prefix`,
+    the last word matches as a prefix (type-ahead: "vend" finds "vendor").
+    """
+    words = re.findall(r"\w+", text.lower())
+    if not words:
         return ""
-    text = path.read_text(encoding="utf-8", errors="ignore")
-    if len(text) <= limit:
-        return text
-    return text[-limit:]
-
-
-def tail_lines(path: Path, limit: int = 120) -> list:
-    if not path.exists():
-        return []
-    lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
-    return lines[-limit:]
-
-
-def compute_ops_summary():
-    slack_lines = tail_lines(OPS_LOG, 200)
-    runtime_lines = tail_lines(RUNTIME_LOG, 200)
-    errors = sum(1 for line in slack_lines if "error" in line.lower())
-    runtime_errors = sum(1 for line in runtime_lines if "error" in line.lower())
-    dms = sum(1 for line in slack_lines if "dm from" in line.lower())
-    mentions = sum(1 for line in slack_lines if "app_mention" in line.lower())
-    replies = sum(1 for line in slack_lines if "reply sent" in line.lower())
-    last_event = slack_lines[-1] if slack_lines else "No events yet."
+    terms = [f'"{word}"' for word in words]
+    if prefix:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def encode_cursor(value: dict) -> str:
+    raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str):
+    """Inverse of encode_cursor; None if the token is not one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        value = json.loads(raw.decode("utf-8"))
+    except Exception:
+        return None
+    if not isinstance(value, dict):
+        return None
+    if "k" in value and not (isinstance(value["k"], list) and len(value["k"]) == 3):
+        return None
+    if "o" in value and not isinstance(value["o"], int):
+        return None
+    return value
+
+
+def split_tags(value) -> list:
+    seen = {}
+    for t in str(value or "").split(","):
+        t = t.strip()
+        if t and t.lower() not in seen:
+            seen[t.lower()] = t
+    return list(seen.values())
+
+
+def meta_doc_ref(client, path: str):
+    collection, doc_id = path.split("/", 1) if "/" in path else ("task_meta", path)
+    return client.collection(collection).document(doc_id)
+
+
+def tags_counter_ref(client):
+    return meta_doc_ref(client, TAGS_DOC)
+
+
+STATUS_RANK = {"Not Started": 1, "In-Progress": 2, "Completed": 3}
+
+
+def firestore_sort_fields(fields: dict) -> dict:
+    """Derived fields that let Firestore filter and order tasks server-side.
+
+    tags_list (lower-cased) backs array-contains tag filters; status_rank and a
+    non-null due_date back the list ordering (see firestore.indexes.json).
+    """
+    out = {}
+    if "tags" in fields:
+        out["tags_list"] = [t.lower() for t in split_tags(fields.get("tags"))]
+    if "status" in fields:
+        out["status_rank"] = STATUS_RANK.get(fields.get("status") or "", 4)
+    if "due_date" in fields:
+        out["due_date"] = fields.get("due_date") or ""
+    return out
+
+
+def firestore_task_query(client, status: str = "", tag: str = ""):
+    """Tasks in list order, with equality filters pushed down to Firestore."""
+    query = client.collection("tasks")
+    if status:
+        query = query.where(filter=FieldFilter("status", "==", status))
+    if tag:
+        query = query.where(filter=FieldFilter("tags_list", "array_contains", tag.lower()))
+    return query.order_by("status_rank").order_by("due_date").order_by("__name__")
+
+
+SORT_FIELDS_VERSION = 1
+_SORT_FIELDS = {"ready": False, "started": False}
+_SORT_FIELDS_LOCK = threading.Lock()
+
+
+def backfill_firestore_tasks(client=None) -> int:
+    """Add tags_list/status_rank/due_date to task documents written before they existed.
+
+    Records SORT_FIELDS_VERSION in the schema doc when done, so later
+    processes skip the scan (see firestore_sort_fields_ready).
+    """
+    client = client or firestore_client()
+    if not client:
+        raise SystemExit("Firestore is disabled (set FIRESTORE_ENABLED=1).")
+    batch = client.batch()
+    pending = updated = 0
+    for doc in client.collection("tasks").stream():
+        data = doc.to_dict() or {}
+        derived = firestore_sort_fields({"tags": data.get("tags"), "status": data.get("status"), "due_date": data.get("due_date")})
+        if all(data.get(k) == v for k, v in derived.items()):
+            continue
+        batch.update(doc.reference, derived)
+        pending += 1
+        updated += 1
+        if pending == 400:
+            batch.commit()
+            batch = client.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+    meta_doc_ref(client, SCHEMA_DOC).set(
+        {"sort_fields": SORT_FIELDS_VERSION, "backfilled": updated, "backfilled_at": datetime.utcnow().isoformat()},
+        merge=True,
+    )
+    return updated
+
+
+def firestore_sort_fields_ready(client) -> bool:
+    """True once every task document carries the derived fields the list query orders by.
+
+    Firestore drops documents missing an ordered field from the result, so
+    until then /api/tasks uses the full-scan path. The first call starts a
+    background check: one read of the schema doc, plus the backfill if no
+    process has run it yet.
+    """
+    with _SORT_FIELDS_LOCK:
+        if _SORT_FIELDS["ready"] or _SORT_FIELDS["started"]:
+            return _SORT_FIELDS["ready"]
+        _SORT_FIELDS["started"] = True
+    threading.Thread(target=_prepare_sort_fields, args=(client,), name="firestore-backfill", daemon=True).start()
+    return False
+
+
+def _prepare_sort_fields(client) -> None:
+    try:
+        snap = meta_doc_ref(client, SCHEMA_DOC).get()
+        if not (snap.exists and ((snap.to_dict() or {}).get("sort_fields") or 0) >= SORT_FIELDS_VERSION):
+            print(f"Backfilled {backfill_firestore_tasks(client)} task documents with sort fields", file=sys.stderr)
+    except Exception as exc:
+        print(f"Firestore sort-field backfill failed, will retry: {exc}", file=sys.stderr)
+        with _SORT_FIELDS_LOCK:
+            _SORT_FIELDS["started"] = False
+        return
+    with _SORT_FIELDS_LOCK:
+        _SORT_FIELDS["ready"] = True
+
+
+def task_matches(data: dict, search: str) -> bool:
+    haystack = " ".join(str(data.get(k) or "") for k in ("title", "notes", "next_action", "tags")).lower()
+    return search in haystack
+
+
+def page_with_cursor(items: list, limit: int):
+    """Trim a limit+1 fetch to one page; the extra item means there is a next page."""
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor({"k": task_sort_key(items[-1], items[-1]["id"])})
+
+
+def task_sort_key(data: dict, doc_id: str) -> list:
+    """The list order (and cursor) as the Firestore query sees it: status_rank, due_date, id."""
+    derived = firestore_sort_fields({"status": data.get("status"), "due_date": data.get("due_date")})
+    return [derived["status_rank"], derived["due_date"], doc_id]
+
+
+def bump_tag_counts(client, removed, added, batch=None):
+    """Apply a tag diff to the counter document with server-side increments (inside `batch` if given)."""
+    delta = {}
+    for t in removed:
+        delta[t] = delta.get(t, 0) - 1
+    for t in added:
+        delta[t] = delta.get(t, 0) + 1
+    delta = {t: n for t, n in delta.items() if n}
+    if not delta:
+        return
+    # Nested dict + merge keeps tag names literal (no field-path parsing of "." or "/").
+    counts = {"counts": {t: firestore.Increment(n) for t, n in delta.items()}}
+    if batch is not None:
+        batch.set(tags_counter_ref(client), counts, merge=True)
+    else:
+        tags_counter_ref(client).set(counts, merge=True)
+
+
+TASK_FIELDS = {"title", "tags", "status", "due_date", "priority", "next_action", "notes", "source"}
+# One Firestore batch holds 500 writes; leave room for the tag counter document.
+BULK_MAX_OPS = 400
+INSERT_TASK_SQL = """
+    INSERT INTO tasks
+    (raw_id, source_sheet, title, tags, due_date, status, status_color, category, priority, next_action, notes, source, created_at, updated_at)
+    VALUES (NULL, 'All_Tasks', ?, ?, ?, ?, NULL, 'All_Tasks', ?, ?, ?, ?, strftime('%s','now'), strftime('%s','now'))
+"""
+
+
+def new_task_fields(payload: dict) -> dict:
     return {
-        "dms": dms,
-        "mentions": mentions,
-        "replies": replies,
-        "errors": errors,
-        "runtime_errors": runtime_errors,
-        "last_event": last_event,
-        "log_path": str(OPS_LOG),
+        "title": (payload.get("title") or "").strip(),
+        "tags": (payload.get("tags") or "").strip(),
+        "status": (payload.get("status") or "In-Progress").strip(),
+        "due_date": (payload.get("due_date") or "").strip(),
+        "priority": (payload.get("priority") or "").strip(),
+        "next_action": (payload.get("next_action") or "").strip(),
+        "notes": (payload.get("notes") or "").strip(),
+        "source": (payload.get("source") or "All Tasks").strip(),
     }
 
 
+def insert_task(conn, fields: dict) -> int:
+    cur = conn.execute(
+        INSERT_TASK_SQL,
+        (
+            fields["title"],
+            fields["tags"],
+            fields["due_date"],
+            fields["status"],
+            fields["priority"],
+            fields["next_action"],
+            fields["notes"],
+            fields["source"],
+        ),
+    )
+    return cur.lastrowid
+
+
+def update_task(conn, task_id: int, updates: dict) -> int:
+    sql = f"UPDATE tasks SET {', '.join(f'{key} = ?' for key in updates)}, updated_at=strftime('%s','now') WHERE id = ?"
+    return conn.execute(sql, [*updates.values(), task_id]).rowcount
+
+
+def bulk_op(op) -> tuple:
+    """Validate one /api/tasks/bulk entry: (kind, id, fields) or raise ValueError."""
+    if not isinstance(op, dict):
+        raise ValueError("op must be an object")
+    kind = op.get("op")
+    fields = op.get("fields") or {}
+    if kind == "create":
+        fields = new_task_fields(fields)
+        if not fields["title"]:
+            raise ValueError("title required")
+        return kind, None, fields
+    if kind not in ("update", "delete"):
+        raise ValueError("op must be create, update or delete")
+    if op.get("id") in (None, ""):
+        raise ValueError("id required")
+    if kind == "update":
+        fields = {k: v for k, v in fields.items() if k in TASK_FIELDS}
+        if not fields:
+            raise ValueError("no updatable fields")
+    return kind, op["id"], fields
+
+
+def apply_bulk_op(conn, op) -> dict:
+    try:
+        kind, task_id, fields = bulk_op(op)
+    except ValueError as exc:
+        return {"ok": False, "error": str(exc)}
+    result = {"ok": False, "op": kind}
+    try:
+        if kind == "create":
+            result["id"] = insert_task(conn, fields)
+            changed = 1
+        else:
+            result["id"] = task_id = int(task_id)
+            if kind == "update":
+                changed = update_task(conn, task_id, fields)
+            else:
+                changed = conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount
+    except (TypeError, ValueError):
+        result["error"] = "invalid id"
+        return result
+    except sqlite3.Error as exc:
+        # Only this statement is undone; the transaction and the other ops stand.
+        result["error"] = str(exc)
+        return result
+    if not changed:
+        result["error"] = "not found"
+        return result
+    result["ok"] = True
+    return result
+
+
+def doc_payload(path: Path, limit: int = 12000):
+    """/api/sprint and /api/backlog body: the file's tail plus its mtime, as JSON bytes."""
+
+    def build(data: bytes) -> bytes:
+        text = data.decode("utf-8", errors="ignore")
+        return json.dumps({"content": text[-limit:], "updated_at": path.stat().st_mtime}).encode("utf-8")
+
+    return RESPONSES.get(path, f"doc:{limit}", "application/json; charset=utf-8", build)
+
+
+def apps_payload():
+    def build(data: bytes) -> bytes:
+        try:
+            items = json.loads(data.decode("utf-8"))
+        except Exception:
+            items = []
+        return json.dumps({"items": items, "updated_at": APPS_PATH.stat().st_mtime}).encode("utf-8")
+
+    return RESPONSES.get(APPS_PATH, "apps", "application/json; charset=utf-8", build)
+
+
+def static_content_type(path: Path) -> str:
+    if path.suffix == ".css":
+        return "text/css; charset=utf-8"
+    if path.suffix == ".js":
+        return "application/javascript; charset=utf-8"
+    return "application/octet-stream"
+
+
+def page_assets(path: Path) -> tuple:
+    """/static/ paths a template references; rescanned only when its (mtime_ns, size) changes."""
+    key = stat_key(path)
+    cached = _PAGE_ASSETS.get(str(path))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        html = path.read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        html = ""
+    assets = tuple(sorted(set(m.group(2) for m in STATIC_REF.finditer(html))))
+    _PAGE_ASSETS[str(path)] = (key, assets)
+    return assets
+
+
+def page_payload(path: Path):
+    """HTML page with /static/ references pinned to content versions (?v=...).
+
+    Versioned asset URLs can be cached for a year; an edit to styles.css or
+    app.js changes its version, hence the page, hence what the browser fetches.
+    A warm request costs a stat() of the template and of each asset.
+    """
+    versions = {}
+    for rel in page_assets(path):
+        asset = RESPONSES.file(STATIC_DIR / rel, static_content_type(STATIC_DIR / rel))
+        if asset is not None:
+            versions[rel] = asset.version
+
+    def build(data: bytes) -> bytes:
+        html = data.decode("utf-8")
+
+        def pin(match):
+            version = versions.get(match.group(2))
+            if not version:
+                return match.group(0)
+            return f"{match.group(1)}/static/{match.group(2)}?v={version}{match.group(1)}"
+
+        return STATIC_REF.sub(pin, html).encode("utf-8")
+
+    return RESPONSES.get(path, "page", "text/html; charset=utf-8", build, extra_key=tuple(sorted(versions.items())))
+
+
+def email_draft_job(to: str, subject: str, body: str, out_path: Path) -> dict:
+    use_scripts()
+    from google_gmail_draft import build_message, create_draft
+
+    msg = build_message(to, subject, body)
+    out_path.write_bytes(msg.as_bytes())
+    return {"draft_id": create_draft(msg), "draft_file": str(out_path)}
+
+
+def event_draft_job(event: dict, calendar_name: str, out_path: Path) -> dict:
+    use_scripts()
+    from google_calendar_draft import insert_event
+
+    out_path.write_text(json.dumps(event, indent=2))
+    return {"event_id": insert_event(event, calendar_name), "draft_file": str(out_path)}
+
+
+def writeback_job(cmd: list) -> dict:
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(f"writeback failed: {proc.stderr.strip()[-2000:]}")
+    return {"stdout": proc.stdout.strip()}
+
+
+def row_to_dict(row, columns):
+    return {col: row[i] for i, col in enumerate(columns)}
+
+
+def compute_ops_summary(window: str = "24h"):
+    return OPS.summary(window)
+
+
 def fetch_ops_metrics():
     client = firestore_client()
     if not client:
@@ -102,6 +498,25 @@ def fetch_ops_metrics():
     return payload
 
 
+def doc_state(path: Path) -> dict:
+    entry = doc_payload(path)
+    return json.loads(entry.body) if entry is not None else {"content": "", "updated_at": None}
+
+
+def apps_state() -> dict:
+    entry = apps_payload()
+    return json.loads(entry.body) if entry is not None else {"items": [], "updated_at": None}
+
+
+LIVE = LiveFeed(poll_interval=STREAM_POLL)
+LIVE.add("sprint", lambda: doc_state(SPRINT_PATH), paths=[SPRINT_PATH])
+LIVE.add("backlog", lambda: doc_state(BACKLOG_PATH), paths=[BACKLOG_PATH])
+LIVE.add("apps", apps_state, paths=[APPS_PATH])
+# Also rebuilt each minute: counts age out of the window without any new log line.
+LIVE.add("ops", compute_ops_summary, paths=[OPS_LOG, RUNTIME_LOG], every=60)
+LIVE.add("metrics", fetch_ops_metrics, every=METRICS_REFRESH)
+
+
 class TaskServer(BaseHTTPRequestHandler):
     server_version = "AgentOpsTasks/1.0"
 
@@ -121,16 +536,42 @@ class TaskServer(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(payload)
 
-    def _serve_file(self, path: Path, content_type: str):
-        if not path.exists() or not path.is_file():
-            self._send_text("Not found", status=404)
+    def _send_cached(self, entry, cache_control=REVALIDATE):
+        """Send a cached response, or a bodyless 304 if the client's copy is current."""
+        if entry.not_modified(self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")):
+            self.send_response(304)
+            self.send_header("ETag", entry.etag)
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
             return
-        data = path.read_bytes()
+        encoding = entry.encoding_for(self.headers.get("Accept-Encoding", ""))
+        body = entry.variants[encoding] if encoding else entry.body
         self.send_response(200)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Content-Type", entry.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", entry.etag)
+        self.send_header("Last-Modified", entry.last_modified)
+        self.send_header("Cache-Control", cache_control)
+        if entry.variants:
+            self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
         self.end_headers()
-        self.wfile.write(data)
+        self.wfile.write(body)
+
+    def _serve_file(self, path: Path, content_type: str, cache_control=REVALIDATE):
+        entry = RESPONSES.file(path, content_type) if path.is_file() else None
+        if entry is None:
+            self._send_text("Not found", status=404)
+            return
+        self._send_cached(entry, cache_control)
+
+    def _serve_page(self, path: Path):
+        entry = page_payload(path) if path.is_file() else None
+        if entry is None:
+            self._send_text("Not found", status=404)
+            return
+        self._send_cached(entry)
 
     def _read_json(self):
         length = int(self.headers.get("Content-Length", "0"))
@@ -146,58 +587,62 @@ class TaskServer(BaseHTTPRequestHandler):
         parsed = urlparse(self.path)
         path = parsed.path
         if path == "/" or path == "":
-            self._serve_file(TEMPLATES_DIR / "index.html", "text/html; charset=utf-8")
+            self._serve_page(TEMPLATES_DIR / "index.html")
             return
         if path == "/suite":
-            self._serve_file(TEMPLATES_DIR / "suite.html", "text/html; charset=utf-8")
+            self._serve_page(TEMPLATES_DIR / "suite.html")
             return
         if path.startswith("/static/"):
-            rel = path.replace("/static/", "")
-            file_path = STATIC_DIR / rel
-            if file_path.suffix == ".css":
-                self._serve_file(file_path, "text/css; charset=utf-8")
-                return
-            if file_path.suffix == ".js":
-                self._serve_file(file_path, "application/javascript; charset=utf-8")
+            file_path = (STATIC_DIR / path[len("/static/"):]).resolve()
+            if STATIC_DIR.resolve() not in file_path.parents:
+                self._send_text("Not found", status=404)
                 return
-            self._serve_file(file_path, "application/octet-stream")
+            # Pages link assets as ?v=<content hash>, so those URLs never change content.
+            versioned = "v=" in parsed.query
+            self._serve_file(file_path, static_content_type(file_path), IMMUTABLE if versioned else REVALIDATE)
             return
         if path == "/api/health":
             self._send_json({"ok": True, "db": str(DB_PATH), "time": datetime.utcnow().isoformat()})
             return
+        if path == "/api/stream":
+            self.handle_stream()
+            return
         if path == "/api/tags":
             self.handle_list_tags()
             return
         if path == "/api/tasks":
             self.handle_list_tasks(parsed.query)
             return
-        if path == "/api/sprint":
-            text = read_text_safe(SPRINT_PATH)
-            self._send_json(
-                {"content": text, "updated_at": SPRINT_PATH.stat().st_mtime if SPRINT_PATH.exists() else None}
-            )
+        if path in ("/api/sprint", "/api/backlog"):
+            entry = doc_payload(SPRINT_PATH if path == "/api/sprint" else BACKLOG_PATH)
+            if entry is None:
+                self._send_json({"content": "", "updated_at": None})
+                return
+            self._send_cached(entry)
             return
-        if path == "/api/backlog":
-            text = read_text_safe(BACKLOG_PATH)
-            self._send_json(
-                {"content": text, "updated_at": BACKLOG_PATH.stat().st_mtime if BACKLOG_PATH.exists() else None}
-            )
+        if path == "/api/jobs":
+            self._send_json({"items": JOBS.recent()})
+            return
+        if path.startswith("/api/jobs/"):
+            job = JOBS.get(path[len("/api/jobs/"):])
+            if job is None:
+                self._send_json({"error": "job not found"}, status=404)
+                return
+            self._send_json(job)
             return
         if path == "/api/ops":
-            self._send_json(compute_ops_summary())
+            window = (parse_qs(parsed.query).get("window") or ["24h"])[0]
+            self._send_json(compute_ops_summary(window))
             return
         if path == "/api/metrics":
             self._send_json(fetch_ops_metrics())
             return
         if path == "/api/apps":
-            if APPS_PATH.exists():
-                try:
-                    data = json.loads(APPS_PATH.read_text(encoding="utf-8"))
-                except Exception:
-                    data = []
-            else:
-                data = []
-            self._send_json({"items": data, "updated_at": APPS_PATH.stat().st_mtime if APPS_PATH.exists() else None})
+            entry = apps_payload()
+            if entry is None:
+                self._send_json({"items": [], "updated_at": None})
+                return
+            self._send_cached(entry)
             return
         self._send_text("Not found", status=404)
 
@@ -207,6 +652,10 @@ class TaskServer(BaseHTTPRequestHandler):
             payload = self._read_json() or {}
             self.handle_create_task(payload)
             return
+        if parsed.path == "/api/tasks/bulk":
+            payload = self._read_json() or {}
+            self.handle_bulk_tasks(payload)
+            return
         if parsed.path == "/api/drafts/email":
             payload = self._read_json() or {}
             self.handle_draft_email(payload)
@@ -230,11 +679,52 @@ class TaskServer(BaseHTTPRequestHandler):
             return
         self._send_text("Not found", status=404)
 
+    def handle_stream(self):
+        """Server-sent events: every topic once, then only topics whose payload changed."""
+        if not THREADED:
+            # A held-open stream would block the single-threaded server; suite.js falls back to polling.
+            self._send_json({"error": "streaming requires AGENT_OPS_THREADED=1"}, status=503)
+            return
+        q, snapshot = LIVE.subscribe()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("X-Accel-Buffering", "no")
+            self.end_headers()
+            self.wfile.write(b"retry: 5000\n\n")
+            for event in snapshot:
+                self._send_event(*event)
+            self.wfile.flush()
+            while True:
+                try:
+                    event = q.get(timeout=STREAM_HEARTBEAT)
+                except queue.Empty:
+                    if not LIVE.is_subscribed(q):
+                        return
+                    # Comment line keeps proxies from idling the connection out.
+                    self.wfile.write(b": ping\n\n")
+                else:
+                    self._send_event(*event)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            LIVE.unsubscribe(q)
+            self.close_connection = True
+
+    def _send_event(self, event_id, name, payload):
+        self.wfile.write(f"id: {event_id}\nevent: {name}\ndata: {payload}\n\n".encode("utf-8"))
+
     def handle_list_tasks(self, query_string):
         fs = firestore_client()
         if fs:
-            items = self._firestore_list_tasks(query_string)
-            self._send_json({"items": items, "count": len(items)})
+            result = self._firestore_list_tasks(query_string)
+            if result is None:
+                self._send_json({"error": "invalid cursor"}, status=400)
+                return
+            items, next_cursor = result
+            self._send_json({"items": items, "count": len(items), "next_cursor": next_cursor})
             return
         if not DB_PATH.exists():
             self._send_json({"error": "DB not found", "db": str(DB_PATH)}, status=404)
@@ -242,44 +732,64 @@ class TaskServer(BaseHTTPRequestHandler):
         params = parse_qs(query_string)
         status = params.get("status", [""])[0].strip()
         tag = params.get("tag", [""])[0].strip().lower()
-        search = params.get("q", [""])[0].strip().lower()
+        search = params.get("q", [""])[0].strip()
+        prefix = params.get("match", [""])[0].strip().lower() == "prefix"
         limit = int(params.get("limit", ["200"])[0])
         offset = int(params.get("offset", ["0"])[0])
+        after = params.get("after", [""])[0].strip()
+
+        cursor = decode_cursor(after) if after else {}
+        if cursor is None:
+            self._send_json({"error": "invalid cursor"}, status=400)
+            return
 
         clauses = []
         values = []
+        match = fts_query(search, prefix=prefix) if search else ""
+        if search and not match:
+            self._send_json({"items": [], "count": 0, "next_cursor": None})
+            return
+        if match:
+            clauses.append("tasks_fts MATCH ?")
+            values.append(match)
         if status:
-            clauses.append("status = ?")
+            clauses.append("t.status = ?")
             values.append(status)
         if tag:
-            clauses.append("lower(coalesce(tags, '')) like ?")
-            values.append(f"%{tag}%")
-        if search:
-            clauses.append("lower(title) like ?")
-            values.append(f"%{search}%")
+            clauses.append("t.id IN (SELECT task_id FROM task_tags WHERE tag = ?)")
+            values.append(tag)
+        if match:
+            # Ranked results have no stable key to seek on; their cursor carries an offset.
+            offset = int(cursor.get("o", offset))
+        elif "k" in cursor:
+            # Keyset: resume strictly after the last row of the previous page, via idx_tasks_order.
+            clauses.append("(t.status_rank, t.due_date, t.id) > (?, ?, ?)")
+            values.extend(cursor["k"])
+            offset = 0
 
         where = "WHERE " + " AND ".join(clauses) if clauses else ""
+        source = "tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid" if match else "tasks t"
+        # Title hits outrank next_action, tags and notes hits (bm25 column weights).
+        rank = "bm25(tasks_fts, 10.0, 2.0, 4.0, 3.0)," if match else ""
         sql = f"""
-            SELECT id, title, tags, status, due_date, priority, next_action, notes, source, updated_at
-            FROM tasks
+            SELECT t.id, t.title, t.tags, t.status, t.due_date, t.priority, t.next_action, t.notes, t.source, t.updated_at,
+                   t.status_rank
+            FROM {source}
             {where}
-            ORDER BY
-                CASE status
-                    WHEN 'Not Started' THEN 1
-                    WHEN 'In-Progress' THEN 2
-                    WHEN 'Completed' THEN 3
-                    ELSE 4
-                END,
-                COALESCE(due_date, '')
+            ORDER BY {rank} t.status_rank, t.due_date, t.id
             LIMIT ? OFFSET ?
         """
-        values.extend([limit, offset])
+        # One extra row tells us whether another page exists.
+        values.extend([limit + 1, offset])
+
+        with DB_POOL.connection() as conn:
+            rows = conn.execute(sql, values).fetchall()
 
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute(sql, values)
-        rows = cur.fetchall()
-        conn.close()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor({"o": offset + limit} if match else {"k": [last[10], last[4] or "", last[0]]})
 
         columns = [
             "id",
@@ -294,7 +804,7 @@ class TaskServer(BaseHTTPRequestHandler):
             "updated_at",
         ]
         data = [row_to_dict(r, columns) for r in rows]
-        self._send_json({"items": data, "count": len(data)})
+        self._send_json({"items": data, "count": len(data), "next_cursor": next_cursor})
 
     def handle_list_tags(self):
         fs = firestore_client()
@@ -306,20 +816,10 @@ class TaskServer(BaseHTTPRequestHandler):
             self._send_json({"error": "DB not found", "db": str(DB_PATH)}, status=404)
             return
 
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute("SELECT tags FROM tasks WHERE tags IS NOT NULL AND tags <> ''")
-        rows = cur.fetchall()
-        conn.close()
+        with DB_POOL.connection() as conn:
+            rows = conn.execute("SELECT tag, count FROM tag_counts ORDER BY tag").fetchall()
 
-        tags = set()
-        for (tag_str,) in rows:
-            for t in str(tag_str).split(","):
-                t = t.strip()
-                if t:
-                    tags.add(t)
-
-        self._send_json({"items": sorted(tags)})
+        self._send_json({"items": [tag for tag, _ in rows], "counts": dict(rows)})
 
     def handle_create_task(self, payload):
         fs = firestore_client()
@@ -329,48 +829,14 @@ class TaskServer(BaseHTTPRequestHandler):
         if not DB_PATH.exists():
             self._send_json({"error": "DB not found", "db": str(DB_PATH)}, status=404)
             return
-        title = (payload.get("title") or "").strip()
-        if not title:
+        fields = new_task_fields(payload)
+        if not fields["title"]:
             self._send_json({"error": "title required"}, status=400)
             return
 
-        fields = {
-            "title": title,
-            "tags": (payload.get("tags") or "").strip(),
-            "status": (payload.get("status") or "In-Progress").strip(),
-            "due_date": (payload.get("due_date") or "").strip(),
-            "priority": (payload.get("priority") or "").strip(),
-            "next_action": (payload.get("next_action") or "").strip(),
-            "notes": (payload.get("notes") or "").strip(),
-            "source": (payload.get("source") or "All Tasks").strip(),
-        }
-
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO tasks
-            (raw_id, source_sheet, title, tags, due_date, status, status_color, category, priority, next_action, notes, source, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, strftime('%s','now'), strftime('%s','now'))
-            """,
-            (
-                None,
-                "All_Tasks",
-                fields["title"],
-                fields["tags"],
-                fields["due_date"],
-                fields["status"],
-                None,
-                "All_Tasks",
-                fields["priority"],
-                fields["next_action"],
-                fields["notes"],
-                fields["source"],
-            ),
-        )
-        task_id = cur.lastrowid
-        conn.commit()
-        conn.close()
+        with DB_POOL.connection() as conn:
+            task_id = insert_task(conn, fields)
+            conn.commit()
 
         fields["id"] = task_id
         self._send_json(fields, status=201)
@@ -389,28 +855,58 @@ class TaskServer(BaseHTTPRequestHandler):
             self._send_json({"error": "invalid id"}, status=400)
             return
 
-        allowed = {"title", "tags", "status", "due_date", "priority", "next_action", "notes", "source"}
-        updates = []
-        values = []
-        for key, value in payload.items():
-            if key in allowed:
-                updates.append(f"{key} = ?")
-                values.append(value)
+        updates = {key: value for key, value in payload.items() if key in TASK_FIELDS}
         if not updates:
             self._send_json({"error": "no updatable fields"}, status=400)
             return
 
-        values.append(task_id)
-        sql = f"UPDATE tasks SET {', '.join(updates)}, updated_at=strftime('%s','now') WHERE id = ?"
-
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute(sql, values)
-        conn.commit()
-        conn.close()
+        with DB_POOL.connection() as conn:
+            update_task(conn, task_id, updates)
+            conn.commit()
 
         self._send_json({"ok": True, "id": task_id})
 
+    def handle_bulk_tasks(self, payload):
+        """Apply create/update/delete ops in one transaction (one Firestore batch) with per-op results.
+
+        Failed ops are reported and skipped; with "atomic": true any failure
+        rolls the whole request back (409).
+        """
+        ops = payload.get("ops")
+        if not isinstance(ops, list) or not ops:
+            self._send_json({"error": "ops must be a non-empty list"}, status=400)
+            return
+        if len(ops) > BULK_MAX_OPS:
+            self._send_json({"error": f"at most {BULK_MAX_OPS} ops per request"}, status=400)
+            return
+        atomic = bool(payload.get("atomic"))
+        fs = firestore_client()
+        if fs:
+            self._firestore_bulk_tasks(fs, ops, atomic)
+            return
+        if not DB_PATH.exists():
+            self._send_json({"error": "DB not found", "db": str(DB_PATH)}, status=404)
+            return
+
+        with DB_POOL.connection() as conn:
+            results = [apply_bulk_op(conn, op) for op in ops]
+            failed = any(not result["ok"] for result in results)
+            committed = not (atomic and failed)
+            if committed:
+                conn.commit()
+            else:
+                conn.rollback()
+        self._send_bulk_results(results, committed)
+
+    def _send_bulk_results(self, results, committed):
+        for index, result in enumerate(results):
+            result["index"] = index
+        failed = sum(1 for result in results if not result["ok"])
+        self._send_json(
+            {"ok": not failed, "committed": committed, "applied": len(results) - failed if committed else 0, "failed": failed, "results": results},
+            status=200 if committed else 409,
+        )
+
     def handle_draft_email(self, payload):
         title = (payload.get("subject") or "").strip()
         to = (payload.get("to") or "").strip()
@@ -437,31 +933,9 @@ class TaskServer(BaseHTTPRequestHandler):
             self._send_json({"ok": True, "mode": "dry-run", "draft": result})
             return
 
-        script = BASE_DIR.parent / "scripts" / "google_gmail_draft.py"
-        cmd = [
-            sys.executable,
-            str(script),
-            "--to",
-            to,
-            "--subject",
-            title,
-            "--body",
-            body,
-            "--out",
-            str(out_path),
-            "--commit",
-        ]
-        try:
-            proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        except Exception as exc:
-            self._send_json({"error": str(exc)}, status=500)
-            return
-
-        if proc.returncode != 0:
-            self._send_json({"error": "draft failed", "stderr": proc.stderr}, status=500)
-            return
-
-        self._send_json({"ok": True, "mode": "commit", "draft": result, "stdout": proc.stdout})
+        # Runs on the "google" lane, whose thread keeps the Gmail client and credentials warm.
+        job = JOBS.submit("draft_email", lambda: email_draft_job(to, title, body, out_path), lane="google")
+        self._send_json({"ok": True, "mode": "commit", "draft": result, "job": job}, status=202)
 
     def handle_draft_event(self, payload):
         title = (payload.get("title") or "").strip()
@@ -502,41 +976,8 @@ class TaskServer(BaseHTTPRequestHandler):
             self._send_json({"ok": True, "mode": "dry-run", "event": event, "draft_file": str(out_path)})
             return
 
-        script = BASE_DIR.parent / "scripts" / "google_calendar_draft.py"
-        cmd = [
-            sys.executable,
-            str(script),
-            "--title",
-            title,
-            "--start",
-            start,
-            "--end",
-            end,
-            "--timezone",
-            timezone,
-            "--description",
-            description,
-            "--location",
-            location,
-            "--attendees",
-            attendees,
-            "--calendar-name",
-            calendar_name,
-            "--out",
-            str(out_path),
-            "--commit",
-        ]
-        try:
-            proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        except Exception as exc:
-            self._send_json({"error": str(exc)}, status=500)
-            return
-
-        if proc.returncode != 0:
-            self._send_json({"error": "event draft failed", "stderr": proc.stderr}, status=500)
-            return
-
-        self._send_json({"ok": True, "mode": "commit", "event": event, "draft_file": str(out_path), "stdout": proc.stdout})
+        job = JOBS.submit("draft_event", lambda: event_draft_job(event, calendar_name, out_path), lane="google")
+        self._send_json({"ok": True, "mode": "commit", "event": event, "draft_file": str(out_path), "job": job}, status=202)
 
     def handle_writeback(self, payload):
         approve = (payload.get("approve") or "").strip()
@@ -566,110 +1007,213 @@ class TaskServer(BaseHTTPRequestHandler):
             "-SheetName",
             sheet_name,
         ]
-        try:
-            proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        except Exception as exc:
-            self._send_json({"error": str(exc)}, status=500)
-            return
-
-        if proc.returncode != 0:
-            self._send_json({"error": "writeback failed", "stderr": proc.stderr}, status=500)
-            return
-
-        self._send_json({"ok": True, "stdout": proc.stdout.strip()})
+        # Its own lane: an Excel sync can take minutes and must not delay drafts, and two never overlap.
+        job = JOBS.submit("writeback", lambda: writeback_job(cmd), lane="writeback")
+        self._send_json({"ok": True, "job": job}, status=202)
 
     def _firestore_list_tasks(self, query_string):
+        """One page of tasks and the next cursor; None if `after` is not a valid cursor.
+
+        Status and tag filters, ordering and the page limit run in Firestore, so
+        a page costs about `limit` document reads. Text search has no Firestore
+        equivalent and is applied to the ordered stream until the page fills.
+        Until existing documents carry the sort fields, or while the composite
+        indexes (firestore.indexes.json) are still missing, it falls back to
+        scanning the collection; both paths return the same order and cursors.
+        """
         params = parse_qs(query_string)
         status = params.get("status", [""])[0].strip()
         tag = params.get("tag", [""])[0].strip().lower()
         search = params.get("q", [""])[0].strip().lower()
         limit = int(params.get("limit", ["200"])[0])
         offset = int(params.get("offset", ["0"])[0])
+        after = params.get("after", [""])[0].strip()
 
+        cursor = decode_cursor(after) if after else {}
+        if cursor is None or "o" in cursor:
+            return None
         client = firestore_client()
         if not client:
-            return []
-        docs = client.collection("tasks").stream()
+            return [], None
+        if not firestore_sort_fields_ready(client):
+            return self._firestore_scan_tasks(client, status, tag, search, limit, offset, cursor)
+        query = firestore_task_query(client, status=status, tag=tag)
+        if "k" in cursor:
+            query = query.start_after(cursor["k"])
+        elif offset:
+            query = query.offset(offset)
+        if not search:
+            query = query.limit(limit + 1)
+
         items = []
-        for doc in docs:
+        try:
+            for doc in query.stream():
+                data = doc.to_dict() or {}
+                if search and not task_matches(data, search):
+                    continue
+                data["id"] = doc.id
+                items.append(data)
+                if len(items) > limit:
+                    break
+        except Exception as exc:
+            if FailedPrecondition is None or not isinstance(exc, FailedPrecondition):
+                raise
+            print(f"Firestore index missing, scanning tasks instead (deploy firestore.indexes.json): {exc}", file=sys.stderr)
+            return self._firestore_scan_tasks(client, status, tag, search, limit, offset, cursor)
+        return page_with_cursor(items, limit)
+
+    def _firestore_scan_tasks(self, client, status, tag, search, limit, offset, cursor):
+        """Whole-collection fallback for _firestore_list_tasks, filtered and ordered in Python."""
+        items = []
+        for doc in client.collection("tasks").stream():
             data = doc.to_dict() or {}
+            if status and (data.get("status") or "") != status:
+                continue
+            if tag and tag not in {t.lower() for t in split_tags(data.get("tags"))}:
+                continue
+            if search and not task_matches(data, search):
+                continue
             data["id"] = doc.id
             items.append(data)
-        if status:
-            items = [item for item in items if (item.get("status") or "") == status]
-        if tag:
-            items = [item for item in items if tag in str(item.get("tags") or "").lower()]
-        if search:
-            items = [item for item in items if search in str(item.get("title") or "").lower()]
-
-        status_order = {"Not Started": 1, "In-Progress": 2, "Completed": 3}
-        items.sort(key=lambda item: (status_order.get(item.get("status"), 9), item.get("due_date") or ""))
-        if offset:
+        items.sort(key=lambda item: task_sort_key(item, item["id"]))
+        if "k" in cursor:
+            items = [item for item in items if task_sort_key(item, item["id"]) > cursor["k"]]
+        elif offset:
             items = items[offset:]
-        if limit:
-            items = items[:limit]
-        return items
+        return page_with_cursor(items[: limit + 1], limit)
 
     def _firestore_list_tags(self):
         client = firestore_client()
         if not client:
             return []
-        docs = client.collection("tasks").stream()
-        tags = set()
-        for doc in docs:
-            data = doc.to_dict() or {}
-            for t in str(data.get("tags") or "").split(","):
-                t = t.strip()
-                if t:
-                    tags.add(t)
-        return sorted(tags)
+        snap = tags_counter_ref(client).get()
+        if snap.exists:
+            counts = (snap.to_dict() or {}).get("counts") or {}
+            return sorted(t for t, n in counts.items() if n > 0)
+        # No counter yet: scan once and seed it; create/update keep it current from here on.
+        counts = {}
+        for doc in client.collection("tasks").stream():
+            for t in split_tags((doc.to_dict() or {}).get("tags")):
+                counts[t] = counts.get(t, 0) + 1
+        tags_counter_ref(client).set({"counts": counts})
+        return sorted(counts)
 
     def _firestore_create_task(self, payload):
-        title = (payload.get("title") or "").strip()
-        if not title:
+        fields = new_task_fields(payload)
+        if not fields["title"]:
             self._send_json({"error": "title required"}, status=400)
             return
-        fields = {
-            "title": title,
-            "tags": (payload.get("tags") or "").strip(),
-            "status": (payload.get("status") or "In-Progress").strip(),
-            "due_date": (payload.get("due_date") or "").strip(),
-            "priority": (payload.get("priority") or "").strip(),
-            "next_action": (payload.get("next_action") or "").strip(),
-            "notes": (payload.get("notes") or "").strip(),
-            "source": (payload.get("source") or "All Tasks").strip(),
-            "created_at": int(time.time()),
-            "updated_at": int(time.time()),
-        }
+        fields["created_at"] = fields["updated_at"] = int(time.time())
+        fields.update(firestore_sort_fields(fields))
         client = firestore_client()
         if not client:
             self._send_json({"error": "firestore disabled"}, status=500)
             return
         doc_ref = client.collection("tasks").document()
         doc_ref.set(fields)
+        bump_tag_counts(client, [], split_tags(fields["tags"]))
         fields["id"] = doc_ref.id
         self._send_json(fields, status=201)
 
     def _firestore_update_task(self, task_id, payload):
-        allowed = {"title", "tags", "status", "due_date", "priority", "next_action", "notes", "source"}
-        updates = {k: v for k, v in payload.items() if k in allowed}
+        updates = {k: v for k, v in payload.items() if k in TASK_FIELDS}
         if not updates:
             self._send_json({"error": "no updatable fields"}, status=400)
             return
+        updates.update(firestore_sort_fields(updates))
         updates["updated_at"] = int(time.time())
         client = firestore_client()
         if not client:
             self._send_json({"error": "firestore disabled"}, status=500)
             return
-        client.collection("tasks").document(str(task_id)).set(updates, merge=True)
+        doc_ref = client.collection("tasks").document(str(task_id))
+        old_tags = None
+        if "tags" in updates:
+            snap = doc_ref.get()
+            old_tags = split_tags((snap.to_dict() or {}).get("tags")) if snap.exists else []
+        doc_ref.set(updates, merge=True)
+        if old_tags is not None:
+            bump_tag_counts(client, old_tags, split_tags(updates["tags"]))
         self._send_json({"ok": True, "id": task_id})
 
+    def _firestore_bulk_tasks(self, client, ops, atomic):
+        collection = client.collection("tasks")
+        plan = []
+        for op in ops:
+            try:
+                plan.append(bulk_op(op))
+            except ValueError as exc:
+                plan.append(exc)
+        # Existing docs for updates/deletes in one round trip: existence checks and old tags.
+        refs = {str(p[1]): collection.document(str(p[1])) for p in plan if isinstance(p, tuple) and p[1] is not None}
+        snapshots = client.get_all(list(refs.values())) if refs else []
+        current = {snap.id: split_tags((snap.to_dict() or {}).get("tags")) for snap in snapshots if snap.exists}
+
+        batch = client.batch()
+        removed, added, results = [], [], []
+        now = int(time.time())
+        for step in plan:
+            if isinstance(step, ValueError):
+                results.append({"ok": False, "error": str(step)})
+                continue
+            kind, task_id, fields = step
+            if kind == "create":
+                ref = collection.document()
+                doc = {**fields, "created_at": now, "updated_at": now, **firestore_sort_fields(fields)}
+                batch.set(ref, doc)
+                added.extend(split_tags(fields["tags"]))
+                current[ref.id] = split_tags(fields["tags"])
+                results.append({"ok": True, "op": kind, "id": ref.id})
+                continue
+            task_id = str(task_id)
+            if task_id not in current:
+                results.append({"ok": False, "op": kind, "id": task_id, "error": "not found"})
+                continue
+            if kind == "delete":
+                batch.delete(refs[task_id])
+                removed.extend(current.pop(task_id))
+            else:
+                updates = {**fields, **firestore_sort_fields(fields), "updated_at": now}
+                batch.set(refs[task_id], updates, merge=True)
+                if "tags" in fields:
+                    removed.extend(current[task_id])
+                    current[task_id] = split_tags(fields["tags"])
+                    added.extend(current[task_id])
+            results.append({"ok": True, "op": kind, "id": task_id})
+
+        committed = not (atomic and any(not result["ok"] for result in results))
+        if committed:
+            bump_tag_counts(client, removed, added, batch=batch)
+            batch.commit()
+        self._send_bulk_results(results, committed)
+
+
+class TaskHTTPServer(HTTPServer):
+    # The stdlib default backlog of 5 drops SYNs under a burst of browser tabs/clients.
+    request_queue_size = 128
+
+
+class ThreadingTaskHTTPServer(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
 
 def main():
+    if "--backfill-firestore" in sys.argv[1:]:
+        print(f"Backfilled {backfill_firestore_tasks()} task documents")
+        return
     host = os.environ.get("AGENT_OPS_HOST", "0.0.0.0")
     port = int(os.environ.get("PORT") or os.environ.get("AGENT_OPS_PORT") or "8090")
-    server = HTTPServer((host, port), TaskServer)
-    print(f"Task UI running at http://{host}:{port}")
+    # Threaded by default so a slow draft/writeback subprocess does not stall the UI.
+    ensure_sqlite_schema()
+    client = firestore_client()
+    if client:
+        # Start the one-time sort-field backfill now rather than on the first /api/tasks.
+        firestore_sort_fields_ready(client)
+    server_cls = ThreadingTaskHTTPServer if THREADED else TaskHTTPServer
+    server = server_cls((host, port), TaskServer)
+    mode = f"threaded, db pool {DB_POOL_SIZE}" if THREADED else "single-threaded"
+    print(f"Task UI running at http://{host}:{port} ({mode})")
     server.serve_forever()
 
 
@@ -12,6 +12,14 @@ const countTotal = document.getElementById("count-total");
 const countOpen = document.getElementById("count-open");
 const countDone = document.getElementById("count-done");
 const tagOptions = document.getElementById("tag-options");
+const bulkBar = document.getElementById("bulk-bar");
+const bulkCount = document.getElementById("bulk-count");
+const bulkStatus = document.getElementById("bulk-status");
+const bulkSetStatus = document.getElementById("bulk-set-status");
+const bulkTag = document.getElementById("bulk-tag");
+const bulkAddTag = document.getElementById("bulk-add-tag");
+const bulkRemoveTag = document.getElementById("bulk-remove-tag");
+const bulkClear = document.getElementById("bulk-clear");
 
 const newTitle = document.getElementById("new-title");
 const newTags = document.getElementById("new-tags");
@@ -130,6 +138,20 @@ async function postJson(url, payload) {
   return data;
 }
 
+// Commit-mode drafts and the Excel sync run as server-side jobs; poll until one finishes.
+async function waitForJob(job, onProgress) {
+  let current = job;
+  while (current.status === "queued" || current.status === "running") {
+    if (onProgress) onProgress(current);
+    await new Promise((resolve) => setTimeout(resolve, 1000));
+    const res = await fetch(`/api/jobs/${job.id}`);
+    current = await res.json();
+    if (!res.ok) throw new Error(current.error || "Job lookup failed");
+  }
+  if (current.status === "failed") throw new Error(current.error || "Job failed");
+  return current;
+}
+
 function requireApproval(inputEl) {
   if (inputEl.value.trim() !== "APPROVE") {
     setDraftOutput("Type APPROVE to commit.");
@@ -138,22 +160,69 @@ function requireApproval(inputEl) {
   return true;
 }
 
-function buildQuery() {
+function buildQuery(options = {}) {
   const params = new URLSearchParams();
   if (qEl.value.trim()) params.set("q", qEl.value.trim());
+  if (options.prefix && qEl.value.trim()) params.set("match", "prefix");
   if (tagEl.value.trim()) params.set("tag", tagEl.value.trim());
   if (statusFilterEl.value) params.set("status", statusFilterEl.value);
   params.set("limit", limitEl.value || "200");
   return params.toString();
 }
 
-async function fetchTasks() {
+let fetchSeq = 0;
+let nextCursor = null;
+let lastOptions = {};
+let loadingMore = false;
+let loadedItems = [];
+const selected = new Map();
+
+async function fetchTasks(options = {}) {
+  const seq = ++fetchSeq;
+  lastOptions = options;
   setStatus("Loading...");
-  const qs = buildQuery();
+  const qs = buildQuery(options);
   const res = await fetch(`/api/tasks?${qs}`);
   const data = await res.json();
-  renderTasks(data.items || []);
-  setStatus(`Loaded ${data.items.length} tasks`);
+  // Type-ahead fires often; drop responses that a newer request has superseded.
+  if (seq !== fetchSeq) return;
+  loadedItems = data.items || [];
+  selected.clear();
+  updateBulkBar();
+  nextCursor = data.next_cursor || null;
+  renderTasks(loadedItems);
+  setStatus(`Loaded ${loadedItems.length} tasks${nextCursor ? " (scroll for more)" : ""}`);
+  fetchMoreIfSentinelVisible();
+}
+
+async function fetchMoreTasks() {
+  if (!nextCursor || loadingMore) return;
+  const seq = fetchSeq;
+  loadingMore = true;
+  try {
+    const params = new URLSearchParams(buildQuery(lastOptions));
+    params.set("after", nextCursor);
+    const res = await fetch(`/api/tasks?${params.toString()}`);
+    const data = await res.json();
+    // Filters changed while this page was in flight; the new list supersedes it.
+    if (seq !== fetchSeq) return;
+    const page = data.items || [];
+    loadedItems = loadedItems.concat(page);
+    nextCursor = data.next_cursor || null;
+    renderTasks(page, { append: true });
+    setStatus(`Loaded ${loadedItems.length} tasks${nextCursor ? " (scroll for more)" : ""}`);
+  } finally {
+    loadingMore = false;
+  }
+  fetchMoreIfSentinelVisible();
+}
+
+// The observer only fires when the sentinel crosses the margin. A page too short
+// to push it out of view would stop paging, so check again after each render.
+function fetchMoreIfSentinelVisible() {
+  if (!nextCursor) return;
+  const rect = scrollSentinel.getBoundingClientRect();
+  if (rect.top <= window.innerHeight + SCROLL_MARGIN_PX) fetchMoreTasks();
 }
 
 async function fetchTags() {
@@ -175,18 +244,27 @@ function pillClass(status) {
   return "pill";
 }
 
-function renderTasks(items) {
-  cardsEl.innerHTML = "";
-  let done = 0;
-  let open = 0;
+function renderTasks(items, options = {}) {
+  if (!options.append) cardsEl.innerHTML = "";
 
   items.forEach((item) => {
-    if (item.status === "Completed") done += 1;
-    else open += 1;
-
     const card = document.createElement("div");
     card.className = "card";
 
+    const pick = document.createElement("label");
+    pick.className = "card-select";
+    const pickBox = document.createElement("input");
+    pickBox.type = "checkbox";
+    pickBox.addEventListener("change", () => {
+      if (pickBox.checked) selected.set(item.id, item);
+      else selected.delete(item.id);
+      card.classList.toggle("selected", pickBox.checked);
+      updateBulkBar();
+    });
+    pick.appendChild(pickBox);
+    pick.appendChild(document.createTextNode("Select"));
+    card.appendChild(pick);
+
     const title = document.createElement("h3");
     title.textContent = item.title || "(untitled)";
     card.appendChild(title);
@@ -310,8 +388,9 @@ function renderTasks(items) {
     cardsEl.appendChild(card);
   });
 
-  countTotal.textContent = items.length;
-  countOpen.textContent = open;
+  const done = loadedItems.filter((item) => item.status === "Completed").length;
+  countTotal.textContent = loadedItems.length;
+  countOpen.textContent = loadedItems.length - done;
   countDone.textContent = done;
 }
 
@@ -323,6 +402,70 @@ async function updateTask(id, payload) {
   });
 }
 
+function updateBulkBar() {
+  bulkCount.textContent = `${selected.size} selected`;
+  bulkBar.classList.toggle("hidden", selected.size === 0);
+}
+
+function splitTags(value) {
+  return (value || "").split(",").map((t) => t.trim()).filter(Boolean);
+}
+
+// One POST /api/tasks/bulk (one transaction) for the whole selection instead of a PATCH per card.
+async function applyBulk(label, fieldsFor) {
+  const ops = [];
+  selected.forEach((item) => {
+    const fields = fieldsFor(item);
+    if (fields) ops.push({ op: "update", id: item.id, fields });
+  });
+  if (!ops.length) {
+    setStatus(`${label}: nothing to change`);
+    return;
+  }
+  try {
+    setStatus(`${label}: updating ${ops.length} tasks...`);
+    const data = await postJson("/api/tasks/bulk", { ops });
+    await fetchTasks(lastOptions);
+    setStatus(`${label}: ${data.applied} updated${data.failed ? `, ${data.failed} failed` : ""}`);
+  } catch (err) {
+    setStatus(`${label} failed: ${err.message}`);
+  }
+}
+
+bulkSetStatus.addEventListener("click", () => {
+  const status = bulkStatus.value;
+  applyBulk("Set status", (item) => (item.status === status ? null : { status }));
+});
+
+bulkAddTag.addEventListener("click", () => {
+  const tag = bulkTag.value.trim();
+  if (!tag) return;
+  applyBulk("Add tag", (item) => {
+    const tags = splitTags(item.tags);
+    if (tags.some((t) => t.toLowerCase() === tag.toLowerCase())) return null;
+    return { tags: [...tags, tag].join(", ") };
+  });
+});
+
+bulkRemoveTag.addEventListener("click", () => {
+  const tag = bulkTag.value.trim().toLowerCase();
+  if (!tag) return;
+  applyBulk("Remove tag", (item) => {
+    const tags = splitTags(item.tags);
+    const kept = tags.filter((t) => t.toLowerCase() !== tag);
+    return kept.length === tags.length ? null : { tags: kept.join(", ") };
+  });
+});
+
+bulkClear.addEventListener("click", () => {
+  selected.clear();
+  cardsEl.querySelectorAll(".card-select input").forEach((box) => {
+    box.checked = false;
+  });
+  cardsEl.querySelectorAll(".card.selected").forEach((card) => card.classList.remove("selected"));
+  updateBulkBar();
+});
+
 saveNew.addEventListener("click", async () => {
   const payload = {
     title: newTitle.value,
@@ -351,7 +494,13 @@ toggleAddBtn.addEventListener("click", () => {
   addPanel.classList.toggle("hidden");
 });
 
-refreshBtn.addEventListener("click", fetchTasks);
+refreshBtn.addEventListener("click", () => fetchTasks());
+
+let searchTimer = null;
+qEl.addEventListener("input", () => {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(() => fetchTasks({ prefix: true }), 200);
+});
 
 syncExcelBtn.addEventListener("click", async () => {
   const approve = window.prompt("Type APPROVE to sync changes back to Excel:");
@@ -359,7 +508,8 @@ syncExcelBtn.addEventListener("click", async () => {
   try {
     setStatus("Syncing to Excel...");
     const data = await postJson("/api/writeback", { approve });
-    setStatus(data.stdout || "Sync complete.");
+    const job = await waitForJob(data.job, (j) => setStatus(`Syncing to Excel (${j.status})...`));
+    setStatus(job.result.stdout || "Sync complete.");
   } catch (err) {
     setStatus(`Sync failed: ${err.message}`);
   }
@@ -405,7 +555,8 @@ emailCommit.addEventListener("click", async () => {
       commit: true,
       approve: emailApprove.value.trim(),
     });
-    setDraftOutput(JSON.stringify(data, null, 2));
+    const job = await waitForJob(data.job, (j) => setDraftOutput(`Creating Gmail draft (${j.status})...`));
+    setDraftOutput(JSON.stringify({ ...data, job }, null, 2));
   } catch (err) {
     setDraftOutput(`Draft failed: ${err.message}`);
   }
@@ -447,11 +598,21 @@ eventCommit.addEventListener("click", async () => {
       commit: true,
       approve: eventApprove.value.trim(),
     });
-    setDraftOutput(JSON.stringify(data, null, 2));
+    const job = await waitForJob(data.job, (j) => setDraftOutput(`Creating calendar draft (${j.status})...`));
+    setDraftOutput(JSON.stringify({ ...data, job }, null, 2));
   } catch (err) {
     setDraftOutput(`Draft failed: ${err.message}`);
   }
 });
 
+// Infinite scroll: fetch the next page when the sentinel below the cards comes into view.
+const SCROLL_MARGIN_PX = 600;
+const scrollSentinel = document.createElement("div");
+scrollSentinel.className = "scroll-sentinel";
+cardsEl.after(scrollSentinel);
+new IntersectionObserver((entries) => {
+  if (entries.some((entry) => entry.isIntersecting)) fetchMoreTasks();
+}, { rootMargin: `${SCROLL_MARGIN_PX}px` }).observe(scrollSentinel);
+
 fetchTasks();
 fetchTags();
@@ -9,23 +9,17 @@ const setText = (id, value) => {
   if (el) el.textContent = value ?? "";
 };
 
-const loadSprint = async () => {
-  const res = await fetch("/api/sprint");
-  const data = await res.json();
+const renderSprint = (data) => {
   setText("sprint-content", data.content || "No sprint data.");
   setText("sprint-updated", `updated ${fmtTime(data.updated_at)}`);
 };
 
-const loadBacklog = async () => {
-  const res = await fetch("/api/backlog");
-  const data = await res.json();
+const renderBacklog = (data) => {
   setText("backlog-content", data.content || "No backlog data.");
   setText("backlog-updated", `updated ${fmtTime(data.updated_at)}`);
 };
 
-const loadOps = async () => {
-  const res = await fetch("/api/ops");
-  const data = await res.json();
+const renderOps = (data) => {
   setText("ops-dms", data.dms);
   setText("ops-replies", data.replies);
   setText("ops-errors", data.errors);
@@ -36,9 +30,7 @@ const loadOps = async () => {
   setText("ops-last", "live");
 };
 
-const loadMetrics = async () => {
-  const res = await fetch("/api/metrics");
-  const data = await res.json();
+const renderMetrics = (data) => {
   if (data.error) {
     setText("metrics-updated", data.error);
     return;
@@ -100,16 +92,55 @@ const renderApps = (apps) => {
   });
 };
 
-const loadApps = async () => {
-  const res = await fetch("/api/apps");
-  const data = await res.json();
-  renderApps(data.items || []);
+const getJson = async (url) => {
+  const res = await fetch(url);
+  return res.json();
 };
 
+const loadApps = async () => renderApps((await getJson("/api/apps")).items || []);
+const loadSprint = async () => renderSprint(await getJson("/api/sprint"));
+const loadBacklog = async () => renderBacklog(await getJson("/api/backlog"));
+const loadOps = async () => renderOps(await getJson("/api/ops"));
+const loadMetrics = async () => renderMetrics(await getJson("/api/metrics"));
+
 const refreshAll = async () => {
   await Promise.all([loadApps(), loadSprint(), loadBacklog(), loadOps(), loadMetrics()]);
 };
 
+// Live updates: /api/stream sends every panel once, then only panels that changed.
+// Without EventSource (or if the server refuses the stream) fall back to polling.
+const POLL_MS = 30000;
+let pollTimer = null;
+
+const startPolling = () => {
+  if (pollTimer) return;
+  refreshAll();
+  pollTimer = setInterval(refreshAll, POLL_MS);
+};
+
+const handlers = {
+  apps: (data) => renderApps(data.items || []),
+  sprint: renderSprint,
+  backlog: renderBacklog,
+  ops: renderOps,
+  metrics: renderMetrics,
+};
+
+const startStream = () => {
+  if (!window.EventSource) {
+    startPolling();
+    return;
+  }
+  const source = new EventSource("/api/stream");
+  Object.entries(handlers).forEach(([topic, render]) => {
+    source.addEventListener(topic, (event) => render(JSON.parse(event.data)));
+  });
+  source.addEventListener("error", () => {
+    // CONNECTING means the browser is already retrying; CLOSED means it gave up.
+    if (source.readyState === EventSource.CLOSED) startPolling();
+  });
+};
+
 document.getElementById("refresh").addEventListener("click", refreshAll);
 
-refreshAll();
+startStream();